@@ -1,7 +1,10 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-from utils import get_llm_response, calculate_budget_summary
+from utils import get_llm_response
+from budget_ledger import get_budget_ledger
+from goal_ledger import get_goal_ledger
+from figure_cache import cached_figure
 from gamification import award_badge, update_user_progress
 
 def display_affordability_calculator():
@@ -11,13 +14,11 @@ def display_affordability_calculator():
     # Check if budget data exists
     has_budget = False
     budget_summary = None
-    if "user_budget" in st.session_state:
-        if st.session_state.user_budget["income"] and st.session_state.user_budget["expenses"]:
-            has_budget = True
-            budget_summary = calculate_budget_summary(
-                st.session_state.user_budget["income"],
-                st.session_state.user_budget["expenses"]
-            )
+    ledger = get_budget_ledger()
+    if ledger.income_count() and ledger.expense_count():
+        has_budget = True
+        # Dated entries span many months; the analysis needs a typical month
+        budget_summary = ledger.monthly_summary()
     
     # If no budget data, prompt user to create a budget
     if not has_budget:
@@ -53,13 +54,13 @@ def display_affordability_calculator():
         
         # If they have savings goals, ask if this is related
         have_savings_goal = False
-        if "savings_goals" in st.session_state and st.session_state.savings_goals:
+        goal_ledger = get_goal_ledger()
+        if goal_ledger.goal_count():
             have_savings_goal = True
             st.subheader("Savings Goals")
             
             # Get active savings goals
-            active_goals = [goal for goal in st.session_state.savings_goals 
-                            if not goal.get("deleted", False) and not goal.get("completed", False)]
+            active_goals = [goal for goal in goal_ledger.goals if not goal.get("completed", False)]
             
             if active_goals:
                 goal_names = ["Not related to any savings goal"] + [goal["name"] for goal in active_goals]
@@ -104,22 +105,10 @@ def display_affordability_calculator():
                         st.info(f"ℹ️ At your current savings rate, it would take approximately {months_to_save:.1f} months to save for this purchase.")
                     
                     # Create visual comparison
-                    comparison_data = {
-                        "Category": ["Monthly Income", "Monthly Expenses", "Item Cost"],
-                        "Amount": [monthly_income, monthly_income - monthly_surplus, item_cost]
-                    }
-                    
-                    fig = px.bar(
-                        pd.DataFrame(comparison_data),
-                        x="Category",
-                        y="Amount",
-                        title="Purchase Cost vs. Monthly Budget",
-                        color="Category",
-                        color_discrete_map={
-                            "Monthly Income": "#00CC96", 
-                            "Monthly Expenses": "#EF553B",
-                            "Item Cost": "#636EFA"
-                        }
+                    fig = cached_figure(
+                        "affordability_purchase",
+                        [monthly_income, monthly_income - monthly_surplus, item_cost],
+                        create_purchase_chart
                     )
                     st.plotly_chart(fig, use_container_width=True)
                     
@@ -151,38 +140,10 @@ def display_affordability_calculator():
                         st.success(f"✅ This subscription appears affordable, using {impact_percentage:.1f}% of your monthly surplus.")
                     
                     # Create visual for budget impact
-                    current_vs_new = {
-                        "Budget": ["Current Budget", "With New Subscription"],
-                        "Expenses": [monthly_income - monthly_surplus, monthly_income - monthly_surplus + item_cost],
-                        "Surplus": [monthly_surplus, max(0, new_surplus)]
-                    }
-                    
-                    # Reshape data for stacked bar chart
-                    plot_data = []
-                    for budget in current_vs_new["Budget"]:
-                        idx = current_vs_new["Budget"].index(budget)
-                        plot_data.append({
-                            "Budget": budget,
-                            "Category": "Expenses",
-                            "Amount": current_vs_new["Expenses"][idx]
-                        })
-                        plot_data.append({
-                            "Budget": budget,
-                            "Category": "Surplus",
-                            "Amount": current_vs_new["Surplus"][idx]
-                        })
-                    
-                    fig = px.bar(
-                        pd.DataFrame(plot_data),
-                        x="Budget",
-                        y="Amount",
-                        color="Category",
-                        title="Budget Impact of New Subscription",
-                        barmode="stack",
-                        color_discrete_map={
-                            "Expenses": "#EF553B",
-                            "Surplus": "#00CC96"
-                        }
+                    fig = cached_figure(
+                        "affordability_subscription",
+                        [monthly_income - monthly_surplus, monthly_surplus, item_cost],
+                        create_subscription_chart
                     )
                     st.plotly_chart(fig, use_container_width=True)
             
@@ -224,3 +185,60 @@ def display_affordability_calculator():
             # Award badge for using the calculator
             award_badge("Smart Shopper", "🛒")
             update_user_progress(0.1)
+
+def create_purchase_chart(amounts):
+    """Create a bar chart comparing a one-time purchase to the monthly budget"""
+    comparison_data = {
+        "Category": ["Monthly Income", "Monthly Expenses", "Item Cost"],
+        "Amount": amounts
+    }
+    
+    return px.bar(
+        pd.DataFrame(comparison_data),
+        x="Category",
+        y="Amount",
+        title="Purchase Cost vs. Monthly Budget",
+        color="Category",
+        color_discrete_map={
+            "Monthly Income": "#00CC96", 
+            "Monthly Expenses": "#EF553B",
+            "Item Cost": "#636EFA"
+        }
+    )
+
+def create_subscription_chart(amounts):
+    """Create a stacked bar chart of the budget with and without a new subscription"""
+    monthly_expenses, monthly_surplus, item_cost = amounts
+    current_vs_new = {
+        "Budget": ["Current Budget", "With New Subscription"],
+        "Expenses": [monthly_expenses, monthly_expenses + item_cost],
+        "Surplus": [monthly_surplus, max(0, monthly_surplus - item_cost)]
+    }
+    
+    # Reshape data for stacked bar chart
+    plot_data = []
+    for budget in current_vs_new["Budget"]:
+        idx = current_vs_new["Budget"].index(budget)
+        plot_data.append({
+            "Budget": budget,
+            "Category": "Expenses",
+            "Amount": current_vs_new["Expenses"][idx]
+        })
+        plot_data.append({
+            "Budget": budget,
+            "Category": "Surplus",
+            "Amount": current_vs_new["Surplus"][idx]
+        })
+    
+    return px.bar(
+        pd.DataFrame(plot_data),
+        x="Budget",
+        y="Amount",
+        color="Category",
+        title="Budget Impact of New Subscription",
+        barmode="stack",
+        color_discrete_map={
+            "Expenses": "#EF553B",
+            "Surplus": "#00CC96"
+        }
+    )
@@ -8,7 +8,8 @@ from affordability_calculator import display_affordability_calculator
 from finance_tips import display_finance_tips
 from financial_health import display_financial_health_score
 from gamification import get_user_badges, update_user_progress
-from utils import initialize_session_state, load_css
+from utils import initialize_session_state, load_css, get_llm_metrics
+from user_store import load_session_value, save_session
 
 def main():
     # Initialize session state variables
@@ -59,7 +60,7 @@ def main():
             st.write("Complete tasks to earn badges!")
         
         # Progress bar
-        progress = st.session_state.get("user_progress", 0)
+        progress = load_session_value("user_progress")
         st.progress(progress)
         st.caption(f"Level: {int(progress * 10)}/10")
         
@@ -72,29 +73,40 @@ def main():
             if api_key:
                 os.environ["OPENAI_API_KEY"] = api_key
                 st.session_state.openai_api_key = api_key
+                
+                # Let the user know when AI calls are being skipped during an outage
+                breaker = get_llm_metrics()["circuit_breaker"]
+                if breaker["state"] == "open":
+                    st.warning(f"AI service is unavailable right now. Retrying in {breaker['retry_in']:.0f}s; using built-in advice meanwhile.")
+                elif breaker["state"] == "half_open":
+                    st.caption("AI service is recovering...")
             else:
                 st.info("No API key provided. Using built-in financial advice instead of AI responses.")
     
     # Main content area
-    if page == "Chat with FinBuddy":
-        display_chat_interface()
-    elif page == "Budget Planner":
-        display_budget_planner()
-    elif page == "Savings Coach":
-        display_savings_coach()
-    elif page == "Investment 101":
-        display_investment_education()
-    elif page == "Can I Afford It?":
-        display_affordability_calculator()
-    elif page == "Daily Money Tips":
-        display_finance_tips()
-    elif page == "Financial Health Score":
-        display_financial_health_score()
-    
-    # Update user progress (for demo, increment on page views)
-    if st.session_state.get("page_view_count", 0) % 5 == 0:
-        update_user_progress(0.1)  # Increase progress by 10%
-    st.session_state.page_view_count = st.session_state.get("page_view_count", 0) + 1
+    try:
+        if page == "Chat with FinBuddy":
+            display_chat_interface()
+        elif page == "Budget Planner":
+            display_budget_planner()
+        elif page == "Savings Coach":
+            display_savings_coach()
+        elif page == "Investment 101":
+            display_investment_education()
+        elif page == "Can I Afford It?":
+            display_affordability_calculator()
+        elif page == "Daily Money Tips":
+            display_finance_tips()
+        elif page == "Financial Health Score":
+            display_financial_health_score()
+        
+        # Update user progress (for demo, increment on page views)
+        if st.session_state.get("page_view_count", 0) % 5 == 0:
+            update_user_progress(0.1)  # Increase progress by 10%
+        st.session_state.page_view_count = st.session_state.get("page_view_count", 0) + 1
+    finally:
+        # Persist this run's changes in one batch (also runs when a page calls st.rerun())
+        save_session()
 
 if __name__ == "__main__":
     main()
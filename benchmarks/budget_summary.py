@@ -0,0 +1,60 @@
+"""
+Benchmark calculate_budget_summary on large ledgers.
+
+Compares the list-of-dicts path against the columnar NumPy path.
+Run from the repository root:
+
+    python -m benchmarks.budget_summary --rows 1000000
+"""
+import argparse
+import time
+
+import numpy as np
+
+from utils import calculate_budget_summary, summarize_budget_columns
+
+CATEGORIES = ["Housing", "Food", "Transportation", "Utilities", "Entertainment",
+              "Education", "Healthcare", "Personal", "Debt", "Savings", "Other"]
+
+
+def best_of(fn, repeat):
+    """Return the fastest wall time of repeat runs of fn"""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    amounts = rng.uniform(10, 5000, size=args.rows).round(2)
+    codes = rng.integers(0, len(CATEGORIES), size=args.rows)
+    income_amounts = np.array([50000.0, 12000.0])
+
+    income = [{"name": f"Income {i}", "amount": float(a)} for i, a in enumerate(income_amounts)]
+    expenses = [{"name": "Expense", "category": CATEGORIES[c], "amount": float(a)}
+                for c, a in zip(codes.tolist(), amounts.tolist())]
+
+    rows_time = best_of(lambda: calculate_budget_summary(income, expenses), args.repeat)
+    columns_time = best_of(lambda: summarize_budget_columns(income_amounts, amounts, codes, CATEGORIES), args.repeat)
+
+    expected = calculate_budget_summary(income, expenses)
+    actual = summarize_budget_columns(income_amounts, amounts, codes, CATEGORIES)
+    assert set(expected["expense_by_category"]) == set(actual["expense_by_category"])
+    assert abs(expected["total_expenses"] - actual["total_expenses"]) < 1e-6 * expected["total_expenses"]
+
+    print(f"rows: {args.rows:,}")
+    print(f"list of dicts: {rows_time * 1000:9.1f} ms")
+    print(f"columnar:      {columns_time * 1000:9.1f} ms")
+    print(f"speedup:       {rows_time / columns_time:9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
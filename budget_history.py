@@ -0,0 +1,127 @@
+from datetime import date, timedelta
+import pandas as pd
+
+# Rolling windows (in months) shown in the Budget Summary trends
+ROLLING_WINDOWS = (3, 6, 12)
+
+INCOME_COLUMN = "Income"
+
+
+class BudgetHistory:
+    """Time-bucketed totals for dated budget entries.
+
+    Monthly and weekly sums per category (and for income) are adjusted as
+    each entry is added or removed, so the transaction history is never
+    regrouped. Trend tables (rolling means, month-over-month deltas) are
+    derived from the month buckets, which number in the tens even for years
+    of data, and cached until the next change.
+
+    Entries without a "date" field are left out.
+    """
+
+    def __init__(self):
+        self._months = {}  # "YYYY-MM" -> {category: amount}
+        self._weeks = {}   # Monday of the week as "YYYY-MM-DD" -> {category: amount}
+        self._counts = {}  # (bucket, category) -> number of entries, so empty buckets can be dropped
+        self._week_of = {}  # date -> week bucket; statements repeat the same few hundred dates
+        self._cache = {}
+        self.version = 0
+
+    def add(self, kind, entry):
+        self._apply(kind, entry, 1)
+
+    def remove(self, kind, entry):
+        self._apply(kind, entry, -1)
+
+    def clear(self):
+        self.__init__()
+
+    @property
+    def has_data(self):
+        return bool(self._months)
+
+    def monthly_totals(self):
+        """DataFrame of monthly sums, one column per category plus Income
+
+        Months with no entries between the first and last month are included
+        as zeros so trends aren't skewed by gaps.
+        """
+        return self._cached("monthly", lambda: self._frame(self._months, "M"))
+
+    def weekly_totals(self):
+        """DataFrame of weekly sums (weeks start on Monday)"""
+        return self._cached("weekly", lambda: self._frame(self._weeks, "W-SUN"))
+
+    def rolling_means(self, window):
+        """Rolling mean of the monthly totals over the last window months"""
+        return self._cached(("rolling", window),
+                            lambda: self.monthly_totals().rolling(window, min_periods=1).mean())
+
+    def month_over_month(self):
+        """Change in each category between the last two months
+
+        Returns:
+            pd.DataFrame: Previous, current, change and change % per category
+        """
+        def build():
+            monthly = self.monthly_totals()
+            if len(monthly) < 2:
+                return pd.DataFrame(columns=["Previous", "Current", "Change", "Change %"])
+            previous, current = monthly.iloc[-2], monthly.iloc[-1]
+            change = current - previous
+            return pd.DataFrame({
+                "Previous": previous,
+                "Current": current,
+                "Change": change,
+                "Change %": (change / previous.where(previous != 0)) * 100
+            })
+        return self._cached("mom", build)
+
+    def _apply(self, kind, entry, sign):
+        entry_date = entry.get("date")
+        if not entry_date:
+            return
+        week = self._week_of.get(entry_date)
+        if week is None:
+            day = date.fromisoformat(entry_date[:10])
+            week = self._week_of[entry_date] = (day - timedelta(days=day.weekday())).isoformat()
+        category = INCOME_COLUMN if kind == "income" else entry.get("category", "Other")
+        amount = sign * entry["amount"]
+
+        for buckets, bucket in (
+            (self._months, entry_date[:7]),
+            (self._weeks, week)
+        ):
+            totals = buckets.setdefault(bucket, {})
+            count = self._counts.get((bucket, category), 0) + sign
+            if count:
+                self._counts[(bucket, category)] = count
+                totals[category] = totals.get(category, 0) + amount
+            else:
+                # Drop emptied buckets instead of keeping floating point leftovers
+                self._counts.pop((bucket, category), None)
+                totals.pop(category, None)
+                if not totals:
+                    del buckets[bucket]
+
+        self.version += 1
+        self._cache = {}
+
+    def _cached(self, name, build):
+        if name not in self._cache:
+            self._cache[name] = build()
+        return self._cache[name]
+
+    def _frame(self, buckets, freq):
+        if not buckets:
+            return pd.DataFrame()
+        frame = pd.DataFrame.from_dict(buckets, orient="index").fillna(0.0)
+        frame.index = pd.PeriodIndex(pd.to_datetime(frame.index), freq=freq)
+        frame = frame.sort_index()
+        frame = frame.reindex(pd.period_range(frame.index[0], frame.index[-1], freq=freq), fill_value=0.0)
+
+        # Income first, then categories alphabetically
+        columns = sorted(c for c in frame.columns if c != INCOME_COLUMN)
+        if INCOME_COLUMN in frame.columns:
+            columns.insert(0, INCOME_COLUMN)
+        return frame[columns]
@@ -0,0 +1,288 @@
+from itertools import islice
+import streamlit as st
+from user_store import get_user_store, get_user_id
+from budget_history import BudgetHistory, INCOME_COLUMN
+
+
+class BudgetLedger:
+    """Income and expense entries with incrementally maintained aggregates.
+
+    Totals, per-category sums and the saving rate are updated on every add,
+    edit or delete, so reading them costs the same no matter how many entries
+    the ledger holds. Entries are plain dicts (name, amount and, for expenses,
+    category) plus an "id" that stays stable across edits and deletes.
+
+    Dated entries are also bucketed by month and week in self.history (see
+    budget_history.BudgetHistory) as they change.
+
+    Every change is also noted in a change log that the user store drains
+    once per script run, so only touched entries are written to disk.
+    """
+
+    def __init__(self, income=None, expenses=None):
+        self._income = {}    # id -> entry, in insertion order
+        self._expenses = {}  # id -> entry, in insertion order
+        self._next_id = 1
+        self._total_income = 0.0
+        self._total_expenses = 0.0
+        self._category_totals = {}
+        self._category_counts = {}
+        self._changes = {}  # (kind, id) -> True for entries not stored yet; entries are read when drained
+        self.history = BudgetHistory()
+        # Hashes of imported bank transactions, used to skip duplicates on re-import
+        self.transaction_hashes = set()
+
+        self.add_transactions("income", income or [])
+        self.add_transactions("expenses", expenses or [])
+
+    # Entries
+
+    @property
+    def income(self):
+        """List of income entries"""
+        return list(self._income.values())
+
+    @property
+    def expenses(self):
+        """List of expense entries"""
+        return list(self._expenses.values())
+
+    def latest_income(self, limit):
+        """The newest income entries, at most limit of them, oldest first"""
+        return _latest(self._income, limit)
+
+    def latest_expenses(self, limit):
+        """The newest expense entries, at most limit of them, oldest first"""
+        return _latest(self._expenses, limit)
+
+    def income_count(self):
+        return len(self._income)
+
+    def expense_count(self):
+        return len(self._expenses)
+
+    def get_expense(self, entry_id):
+        return self._expenses[entry_id]
+
+    def add_income(self, name, amount, **fields):
+        """Add an income entry and return its id"""
+        entry = {"name": name, "amount": amount, **fields}
+        entry["id"] = self._new_id(entry.get("id"))
+        self._income[entry["id"]] = entry
+        self._changes[("income", entry["id"])] = True
+        self._total_income += amount
+        self.history.add("income", entry)
+        if "txn_hash" in entry:
+            self.transaction_hashes.add(entry["txn_hash"])
+        return entry["id"]
+
+    def add_expense(self, name, category, amount, **fields):
+        """Add an expense entry and return its id"""
+        entry = {"name": name, "category": category, "amount": amount, **fields}
+        entry["id"] = self._new_id(entry.get("id"))
+        self._expenses[entry["id"]] = entry
+        self._changes[("expenses", entry["id"])] = True
+        self._add_expense_totals(category, amount)
+        self.history.add("expenses", entry)
+        if "txn_hash" in entry:
+            self.transaction_hashes.add(entry["txn_hash"])
+        return entry["id"]
+
+    def add_transactions(self, kind, records):
+        """Add many entries at once and return how many were added
+
+        Args:
+            kind (str): "income" or "expenses"
+            records (list): Entry dicts with at least name and amount (and category for expenses)
+        """
+        for record in records:
+            fields = dict(record)
+            if kind == "income":
+                self.add_income(fields.pop("name"), fields.pop("amount"), **fields)
+            else:
+                self.add_expense(fields.pop("name"), fields.pop("category", "Other"), fields.pop("amount"), **fields)
+        return len(records)
+
+    def update_income(self, entry_id, **fields):
+        """Edit fields of an income entry"""
+        entry = self._income[entry_id]
+        if "amount" in fields:
+            self._total_income += fields["amount"] - entry["amount"]
+        self.history.remove("income", entry)
+        entry.update(fields)
+        self.history.add("income", entry)
+        self._changes.setdefault(("income", entry_id), False)
+
+    def update_expense(self, entry_id, **fields):
+        """Edit fields of an expense entry"""
+        entry = self._expenses[entry_id]
+        if "amount" in fields or "category" in fields:
+            self._remove_expense_totals(entry["category"], entry["amount"])
+            self._add_expense_totals(fields.get("category", entry["category"]),
+                                     fields.get("amount", entry["amount"]))
+        self.history.remove("expenses", entry)
+        entry.update(fields)
+        self.history.add("expenses", entry)
+        self._changes.setdefault(("expenses", entry_id), False)
+
+    def remove_income(self, entry_id):
+        """Delete an income entry"""
+        entry = self._income.pop(entry_id)
+        self._total_income -= entry["amount"]
+        self.history.remove("income", entry)
+        self.transaction_hashes.discard(entry.get("txn_hash"))
+        self._note_removal("income", entry_id)
+
+    def remove_expense(self, entry_id):
+        """Delete an expense entry"""
+        entry = self._expenses.pop(entry_id)
+        self._remove_expense_totals(entry["category"], entry["amount"])
+        self.history.remove("expenses", entry)
+        self.transaction_hashes.discard(entry.get("txn_hash"))
+        self._note_removal("expenses", entry_id)
+
+    def _note_removal(self, kind, entry_id):
+        # An entry that was never stored has nothing to delete
+        if not self._changes.pop((kind, entry_id), False):
+            self._changes[(kind, entry_id)] = False
+
+    def drain_changes(self):
+        """Return and forget the entries changed since the last call
+
+        Returns:
+            list: (kind, id, entry, is_new) tuples; entry is None for deleted
+                entries and is_new is True for entries added since the last call
+        """
+        changes = [
+            (kind, entry_id, (self._income if kind == "income" else self._expenses).get(entry_id), is_new)
+            for (kind, entry_id), is_new in self._changes.items()
+        ]
+        self._changes = {}
+        return changes
+
+    # Aggregates
+
+    @property
+    def total_income(self):
+        return self._total_income
+
+    @property
+    def total_expenses(self):
+        return self._total_expenses
+
+    @property
+    def balance(self):
+        return self._total_income - self._total_expenses
+
+    @property
+    def saving_rate(self):
+        return _saving_rate(self._total_income, self._total_expenses)
+
+    @property
+    def expense_by_category(self):
+        return dict(self._category_totals)
+
+    def summary(self):
+        """Budget summary in the same shape as utils.calculate_budget_summary
+
+        Totals cover the whole history; see monthly_summary for a typical month.
+        """
+        return {
+            "total_income": self.total_income,
+            "total_expenses": self.total_expenses,
+            "balance": self.balance,
+            "expense_by_category": self.expense_by_category,
+            "saving_rate": self.saving_rate
+        }
+
+    def monthly_summary(self):
+        """Budget summary for an average month, in the same shape as summary()
+
+        Dated entries are averaged over the months self.history spans (months
+        without entries count as zero). Entries without a date, added as
+        monthly amounts before entries carried one, count in full.
+        """
+        monthly = self.history.monthly_totals()
+        months = max(len(monthly), 1)
+        dated = monthly.sum().to_dict() if len(monthly) else {}
+
+        def per_month(total, column):
+            dated_total = dated.get(column, 0.0)
+            return total - dated_total + dated_total / months
+
+        total_income = per_month(self._total_income, INCOME_COLUMN)
+        expense_by_category = {category: per_month(total, category)
+                               for category, total in self._category_totals.items()}
+        total_expenses = sum(expense_by_category.values(), 0.0)
+        return {
+            "total_income": total_income,
+            "total_expenses": total_expenses,
+            "balance": total_income - total_expenses,
+            "expense_by_category": expense_by_category,
+            "saving_rate": _saving_rate(total_income, total_expenses)
+        }
+
+    def recompute(self):
+        """Rebuild every aggregate from the entries (clears floating point drift)"""
+        self._total_income = sum(entry["amount"] for entry in self._income.values())
+        self._total_expenses = 0.0
+        self._category_totals = {}
+        self._category_counts = {}
+        self.history.clear()
+        for entry in self._income.values():
+            self.history.add("income", entry)
+        for entry in self._expenses.values():
+            self._add_expense_totals(entry["category"], entry["amount"])
+            self.history.add("expenses", entry)
+
+    def _new_id(self, entry_id=None):
+        # Entries loaded from storage keep the id they were saved with
+        if entry_id is None:
+            entry_id = self._next_id
+        self._next_id = max(self._next_id, entry_id + 1)
+        return entry_id
+
+    def _add_expense_totals(self, category, amount):
+        self._total_expenses += amount
+        self._category_totals[category] = self._category_totals.get(category, 0) + amount
+        self._category_counts[category] = self._category_counts.get(category, 0) + 1
+
+    def _remove_expense_totals(self, category, amount):
+        self._total_expenses -= amount
+        self._category_counts[category] -= 1
+        if self._category_counts[category] == 0:
+            # Drop empty categories so summaries only list categories in use
+            del self._category_counts[category]
+            del self._category_totals[category]
+        else:
+            self._category_totals[category] -= amount
+
+
+def _saving_rate(income, expenses):
+    if income > 0:
+        return max(0, income - expenses) / income * 100
+    return 0
+
+
+def _latest(entries, limit):
+    # Walk back from the newest entry so only the rows shown are copied
+    newest = list(islice(reversed(entries.values()), limit))
+    newest.reverse()
+    return newest
+
+
+def get_budget_ledger():
+    """Get the user's budget ledger from session state, creating it if needed"""
+    if "budget_ledger" not in st.session_state:
+        income, expenses = get_user_store().load_budget(get_user_id())
+        ledger = BudgetLedger(income, expenses)
+        # Loaded entries are already stored
+        ledger.drain_changes()
+
+        # Carry over entries from the older list-based budget if a session has one
+        # (once; the ledger is rebuilt from the store when another session saved first)
+        old_budget = st.session_state.pop("user_budget", {})
+        ledger.add_transactions("income", old_budget.get("income", []))
+        ledger.add_transactions("expenses", old_budget.get("expenses", []))
+        st.session_state.budget_ledger = ledger
+    return st.session_state.budget_ledger
@@ -2,33 +2,42 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-from utils import calculate_budget_summary, format_currency, get_llm_response
+from datetime import datetime
+from utils import format_currency, format_currency_many, get_cached_advice
+from budget_ledger import get_budget_ledger
+from budget_history import ROLLING_WINDOWS, INCOME_COLUMN
+from figure_cache import cached_figure
+from chart_data import downsample_series, top_n_with_other, TABLE_MAX_ROWS
+from expense_categorizer import get_expense_categorizer, EXPENSE_CATEGORIES, DEFAULT_CATEGORY
+from statement_import import import_statement, StatementFormatError
 from gamification import award_badge, update_user_progress
 
 def display_budget_planner():
     st.title("📊 Budget Planner")
     st.write("Track your income and expenses to create a smart budget plan with FinBuddy's recommendations.")
     
-    # Initialize or get user budget from session state
-    if "user_budget" not in st.session_state:
-        st.session_state.user_budget = {
-            "income": [],
-            "expenses": []
-        }
+    # Get the user's budget ledger (keeps running totals as entries change)
+    ledger = get_budget_ledger()
+    categorizer = get_expense_categorizer()
     
     # Create tabs for the budget planner
-    tab1, tab2, tab3 = st.tabs(["Income", "Expenses", "Budget Summary"])
+    tab1, tab2, tab3, tab4 = st.tabs(["Income", "Expenses", "Budget Summary", "Import Statement"])
     
     # Income tab
     with tab1:
         st.subheader("Income Sources")
         
         # Display current income sources
-        if st.session_state.user_budget["income"]:
-            income_df = pd.DataFrame(st.session_state.user_budget["income"])
+        if ledger.income_count():
+            # Only the newest entries are shown, so only they are turned into a table
+            income_df = pd.DataFrame(ledger.latest_income(TABLE_MAX_ROWS)).drop(
+                columns=["id", "txn_hash"], errors="ignore"
+            )
+            hidden_rows = ledger.income_count() - len(income_df)
             st.dataframe(income_df, use_container_width=True)
-            total_income = sum(item["amount"] for item in st.session_state.user_budget["income"])
-            st.info(f"Total Income: {format_currency(total_income)}")
+            if hidden_rows:
+                st.caption(f"Showing the latest {len(income_df)} entries ({hidden_rows} older entries hidden).")
+            st.info(f"Total Income: {format_currency(ledger.total_income)}")
         else:
             st.info("No income sources added yet. Add your first income source below.")
         
@@ -36,19 +45,16 @@ def display_budget_planner():
         with st.form("add_income_form"):
             st.subheader("Add Income Source")
             income_name = st.text_input("Description (e.g., Salary, Part-time job)")
-            income_amount = st.number_input("Monthly Amount ($)", min_value=0.0, step=100.0)
+            income_amount = st.number_input("Amount ($)", min_value=0.0, step=100.0)
+            income_date = st.date_input("Date received", value=datetime.now().date())
             
             submitted = st.form_submit_button("Add Income Source")
             if submitted and income_name and income_amount > 0:
-                new_income = {
-                    "name": income_name,
-                    "amount": income_amount
-                }
-                st.session_state.user_budget["income"].append(new_income)
+                ledger.add_income(income_name, income_amount, date=income_date.strftime("%Y-%m-%d"))
                 st.success(f"Added {income_name}: {format_currency(income_amount)}")
                 
                 # Award badge for adding first income
-                if len(st.session_state.user_budget["income"]) == 1:
+                if ledger.income_count() == 1:
                     award_badge("Income Tracker", "💵")
                     update_user_progress(0.1)
                 
@@ -58,12 +64,45 @@ def display_budget_planner():
     with tab2:
         st.subheader("Expenses")
         
-        # Display current expenses
-        if st.session_state.user_budget["expenses"]:
-            expenses_df = pd.DataFrame(st.session_state.user_budget["expenses"])
-            st.dataframe(expenses_df, use_container_width=True)
-            total_expenses = sum(item["amount"] for item in st.session_state.user_budget["expenses"])
-            st.info(f"Total Expenses: {format_currency(total_expenses)}")
+        # Display current expenses; categories can be corrected in place
+        if ledger.expense_count():
+            expenses_df = pd.DataFrame(ledger.latest_expenses(TABLE_MAX_ROWS)).set_index("id").drop(
+                columns=["txn_hash"], errors="ignore"
+            )
+            hidden_rows = ledger.expense_count() - len(expenses_df)
+            edited_df = st.data_editor(
+                expenses_df,
+                use_container_width=True,
+                hide_index=True,
+                disabled=[c for c in expenses_df.columns if c != "category"],
+                column_config={"category": st.column_config.SelectboxColumn("category", options=EXPENSE_CATEGORIES)},
+                # A fresh key after each correction, so stale edits aren't replayed on the updated table
+                key=f"expense_editor_{st.session_state.get('expense_editor_version', 0)}"
+            )
+            if hidden_rows:
+                st.caption(f"Showing the latest {len(expenses_df)} entries ({hidden_rows} older entries hidden).")
+            st.info(f"Total Expenses: {format_currency(ledger.total_expenses)}")
+            
+            # Learn from corrections and apply them to the same merchant's other expenses
+            corrected = edited_df["category"] != expenses_df["category"]
+            if corrected.any():
+                changed = sum(
+                    categorizer.correct(ledger, entry_id, category)
+                    for entry_id, category in edited_df.loc[corrected, "category"].items()
+                )
+                st.session_state.expense_editor_version = st.session_state.get("expense_editor_version", 0) + 1
+                st.toast(f"Updated {changed} expenses. FinBuddy will remember this for future imports.")
+                st.rerun()
+            
+            uncategorized = ledger.expense_by_category.get(DEFAULT_CATEGORY, 0)
+            if uncategorized and st.button("Categorize \"Other\" expenses with AI"):
+                with st.spinner("Sorting your expenses..."):
+                    moved = categorizer.categorize_uncategorized_with_llm(ledger)
+                if moved:
+                    st.success(f"Categorized {moved} expenses.")
+                    st.rerun()
+                else:
+                    st.info("Couldn't categorize any more expenses right now.")
         else:
             st.info("No expenses added yet. Add your first expense below.")
         
@@ -73,23 +112,21 @@ def display_budget_planner():
             expense_name = st.text_input("Description (e.g., Rent, Groceries)")
             expense_category = st.selectbox(
                 "Category",
-                ["Housing", "Food", "Transportation", "Utilities", "Entertainment", 
-                 "Education", "Healthcare", "Personal", "Debt", "Savings", "Other"]
+                ["Auto-detect"] + EXPENSE_CATEGORIES
             )
-            expense_amount = st.number_input("Monthly Amount ($)", min_value=0.0, step=10.0)
+            expense_amount = st.number_input("Amount ($)", min_value=0.0, step=10.0)
+            expense_date = st.date_input("Date paid", value=datetime.now().date())
             
             submitted = st.form_submit_button("Add Expense")
             if submitted and expense_name and expense_amount > 0:
-                new_expense = {
-                    "name": expense_name,
-                    "category": expense_category,
-                    "amount": expense_amount
-                }
-                st.session_state.user_budget["expenses"].append(new_expense)
+                if expense_category == "Auto-detect":
+                    expense_category = categorizer.categorize_one(expense_name) or DEFAULT_CATEGORY
+                ledger.add_expense(expense_name, expense_category, expense_amount,
+                                   date=expense_date.strftime("%Y-%m-%d"))
                 st.success(f"Added {expense_name}: {format_currency(expense_amount)}")
                 
                 # Award badge for adding first expense
-                if len(st.session_state.user_budget["expenses"]) == 1:
+                if ledger.expense_count() == 1:
                     award_badge("Expense Tracker", "📝")
                     update_user_progress(0.1)
                 
@@ -100,27 +137,27 @@ def display_budget_planner():
         st.subheader("Budget Summary")
         
         # Check if both income and expenses have been added
-        if not st.session_state.user_budget["income"]:
+        if not ledger.income_count():
             st.warning("Please add income sources first.")
-        elif not st.session_state.user_budget["expenses"]:
+        elif not ledger.expense_count():
             st.warning("Please add expenses first.")
         else:
-            # Calculate budget summary
-            budget_summary = calculate_budget_summary(
-                st.session_state.user_budget["income"],
-                st.session_state.user_budget["expenses"]
-            )
+            # Figures for an average month, so they line up with the recommendations
+            budget_summary = ledger.monthly_summary()
+            months = len(ledger.history.monthly_totals())
+            if months > 1:
+                st.caption(f"Monthly averages over the {months} months your entries cover.")
             
             # Display income vs. expenses
             col1, col2 = st.columns(2)
             with col1:
                 st.metric(
-                    "Total Income", 
+                    "Monthly Income", 
                     format_currency(budget_summary["total_income"])
                 )
             with col2:
                 st.metric(
-                    "Total Expenses", 
+                    "Monthly Expenses", 
                     format_currency(budget_summary["total_expenses"]),
                     delta=format_currency(budget_summary["balance"]),
                     delta_color="normal" if budget_summary["balance"] >= 0 else "inverse"
@@ -130,44 +167,66 @@ def display_budget_planner():
             st.subheader("Budget Balance")
             balance = budget_summary["balance"]
             if balance >= 0:
-                st.success(f"Surplus: {format_currency(balance)} (Saving rate: {budget_summary['saving_rate']:.1f}%)")
+                st.success(f"Monthly surplus: {format_currency(balance)} (Saving rate: {budget_summary['saving_rate']:.1f}%)")
             else:
-                st.error(f"Deficit: {format_currency(abs(balance))}")
+                st.error(f"Monthly deficit: {format_currency(abs(balance))}")
             
             # Show expense breakdown by category
             st.subheader("Expense Breakdown")
             if budget_summary["expense_by_category"]:
-                # Create a pie chart of expenses by category
-                expense_df = pd.DataFrame([
-                    {"Category": category, "Amount": amount}
-                    for category, amount in budget_summary["expense_by_category"].items()
-                ])
-                
-                fig = px.pie(
-                    expense_df, 
-                    values="Amount", 
-                    names="Category",
-                    title="Expenses by Category"
-                )
+                # Charts are rebuilt only when their numbers change (see figure_cache)
+                # Small categories are merged into "Other" so the pie stays readable
+                fig = cached_figure("budget_expense_pie", top_n_with_other(budget_summary["expense_by_category"]),
+                                    create_expense_pie_chart)
                 st.plotly_chart(fig, use_container_width=True)
                 
-                # Create a bar chart comparing income to total expenses
-                comparison_data = {
-                    "Category": ["Income", "Expenses"],
-                    "Amount": [budget_summary["total_income"], budget_summary["total_expenses"]]
-                }
-                comparison_df = pd.DataFrame(comparison_data)
-                
-                fig2 = px.bar(
-                    comparison_df,
-                    x="Category",
-                    y="Amount",
-                    title="Income vs. Expenses",
-                    color="Category",
-                    color_discrete_map={"Income": "#00CC96", "Expenses": "#EF553B"}
-                )
+                fig2 = cached_figure("budget_income_vs_expenses",
+                                     [budget_summary["total_income"], budget_summary["total_expenses"]],
+                                     create_income_expense_chart)
                 st.plotly_chart(fig2, use_container_width=True)
             
+            # Show trends over time for dated entries (bucketed incrementally by the ledger)
+            history = ledger.history
+            if history.has_data:
+                st.subheader("Spending Trends")
+                granularity = st.radio("View by", ["Month", "Week"], horizontal=True, key="trend_granularity")
+                totals = history.monthly_totals() if granularity == "Month" else history.weekly_totals()
+                fig3 = cached_figure("budget_trend", [granularity, totals], create_trend_chart)
+                st.plotly_chart(fig3, use_container_width=True)
+                
+                # Rolling averages smooth out one-off spikes
+                monthly = history.monthly_totals()
+                monthly_expense_columns = [c for c in monthly.columns if c != INCOME_COLUMN]
+                if monthly_expense_columns:
+                    trend_category = st.selectbox(
+                        "Rolling averages for",
+                        ["All expenses"] + monthly_expense_columns,
+                        key="trend_category"
+                    )
+                    selected = monthly_expense_columns if trend_category == "All expenses" else [trend_category]
+                    fig4 = cached_figure(
+                        "budget_rolling_averages",
+                        [trend_category, monthly[selected].sum(axis=1)],
+                        lambda data: create_rolling_average_chart(
+                            data[0],
+                            data[1],
+                            {window: history.rolling_means(window)[selected].sum(axis=1) for window in ROLLING_WINDOWS}
+                        )
+                    )
+                    st.plotly_chart(fig4, use_container_width=True)
+                
+                # Month-over-month changes
+                changes = history.month_over_month()
+                if len(changes):
+                    latest, previous = monthly.index[-1], monthly.index[-2]
+                    st.write(f"**{latest.strftime('%b %Y')} vs. {previous.strftime('%b %Y')}**")
+                    st.dataframe(pd.DataFrame({
+                        "Previous": format_currency_many(changes["Previous"].to_numpy()),
+                        "Current": format_currency_many(changes["Current"].to_numpy()),
+                        "Change": format_currency_many(changes["Change"].to_numpy()),
+                        "Change %": changes["Change %"].map(lambda pct: "–" if pd.isna(pct) else f"{pct:+.1f}%")
+                    }, index=changes.index), use_container_width=True)
+            
             # Get AI recommendations based on budget
             st.subheader("FinBuddy Recommendations")
             if st.button("Get Budget Recommendations"):
@@ -178,7 +237,8 @@ def display_budget_planner():
                         "expenses": budget_summary["total_expenses"],
                         "balance": budget_summary["balance"],
                         "saving_rate": budget_summary["saving_rate"],
-                        "expense_categories": budget_summary["expense_by_category"]
+                        "expense_categories": {category: round(amount, 2) for category, amount
+                                               in budget_summary["expense_by_category"].items()}
                     }
                     
                     prompt = f"""
@@ -197,10 +257,109 @@ def display_budget_planner():
                     Format each recommendation as a separate bullet point.
                     """
                     
-                    # Get AI recommendations
-                    recommendations = get_llm_response(prompt)
+                    # Get AI recommendations (reused until the budget changes)
+                    recommendations = get_cached_advice("budget_recommendations", budget_data, prompt)
                     st.markdown(recommendations)
                     
                     # Award budget master badge if they got recommendations
                     award_badge("Budget Master", "🏆")
                     update_user_progress(0.15)
+    
+    # Bulk import tab
+    with tab4:
+        st.subheader("Import Bank Statement")
+        st.write("Upload a CSV or OFX statement from your bank. Credits are added as income and debits as expenses; transactions you've already imported are skipped.")
+        
+        statement_file = st.file_uploader("Bank statement", type=["csv", "ofx", "qfx"])
+        if statement_file is not None and st.button("Import Transactions"):
+            progress_bar = st.progress(0.0, text="Importing transactions...")
+            try:
+                stats = import_statement(
+                    statement_file,
+                    ledger,
+                    progress_callback=lambda fraction: progress_bar.progress(fraction, text="Importing transactions..."),
+                    categorizer=categorizer
+                )
+            except StatementFormatError as e:
+                st.error(f"Couldn't read this statement: {str(e)}")
+            else:
+                st.success(
+                    f"Imported {stats['income_added']} income and {stats['expenses_added']} expense transactions "
+                    f"from {stats['rows']} rows ({stats['duplicates']} duplicates skipped, "
+                    f"{stats['skipped']} rows unreadable)."
+                )
+                if stats["uncategorized"]:
+                    st.info(f"{stats['uncategorized']} expenses didn't match any category rule and were filed under "
+                            "\"Other\". Correct them in the Expenses tab and FinBuddy will learn the merchants.")
+                if stats["expenses_added"] and ledger.expense_count() == stats["expenses_added"]:
+                    award_badge("Expense Tracker", "📝")
+                    update_user_progress(0.1)
+
+def create_expense_pie_chart(expense_by_category):
+    """Create a pie chart of expenses by category"""
+    expense_df = pd.DataFrame([
+        {"Category": category, "Amount": amount}
+        for category, amount in expense_by_category.items()
+    ])
+    
+    return px.pie(
+        expense_df, 
+        values="Amount", 
+        names="Category",
+        title="Expenses by Category"
+    )
+
+def create_income_expense_chart(totals):
+    """Create a bar chart comparing income to total expenses"""
+    comparison_df = pd.DataFrame({
+        "Category": ["Income", "Expenses"],
+        "Amount": totals
+    })
+    
+    return px.bar(
+        comparison_df,
+        x="Category",
+        y="Amount",
+        title="Income vs. Expenses",
+        color="Category",
+        color_discrete_map={"Income": "#00CC96", "Expenses": "#EF553B"}
+    )
+
+def create_trend_chart(data):
+    """Create a line chart of income and expenses per month or week"""
+    granularity, totals = data
+    expense_columns = [c for c in totals.columns if c != INCOME_COLUMN]
+    
+    trend_df = pd.DataFrame({
+        "Period": totals.index.to_timestamp(),
+        "Expenses": totals[expense_columns].sum(axis=1).to_numpy()
+    })
+    if INCOME_COLUMN in totals.columns:
+        trend_df["Income"] = totals[INCOME_COLUMN].to_numpy()
+    series = [c for c in ["Income", "Expenses"] if c in trend_df.columns]
+    
+    return px.line(
+        downsample_series(trend_df, "Period", series),
+        x="Period",
+        y=series,
+        title=f"Income and Expenses by {granularity}",
+        color_discrete_map={"Income": "#00CC96", "Expenses": "#EF553B"},
+        markers=True
+    )
+
+def create_rolling_average_chart(label, actual, rolling_means):
+    """Create a line chart of monthly spending with its rolling averages"""
+    rolling_df = pd.DataFrame({
+        "Month": actual.index.to_timestamp(),
+        "Actual": actual.to_numpy()
+    })
+    for window, means in rolling_means.items():
+        rolling_df[f"{window}-month average"] = means.to_numpy()
+    series = ["Actual"] + [f"{window}-month average" for window in rolling_means]
+    
+    return px.line(
+        downsample_series(rolling_df, "Month", series),
+        x="Month",
+        y=series,
+        title=f"{label}: Monthly Spending and Rolling Averages"
+    )
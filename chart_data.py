@@ -0,0 +1,114 @@
+import numpy as np
+import pandas as pd
+
+# Points sent to the browser per chart; about one per horizontal pixel of a
+# wide chart, so payloads depend on screen size rather than history length
+CHART_MAX_POINTS = 800
+# Slices shown in category pies; the rest are merged into "Other"
+PIE_MAX_SLICES = 8
+# Bars shown in per-item bar charts
+BAR_MAX_ITEMS = 12
+# Rows shown in entry tables
+TABLE_MAX_ROWS = 500
+
+OTHER_LABEL = "Other"
+
+
+def lttb_indices(x, y, threshold):
+    """Pick the points that best preserve a series' shape (Largest-Triangle-Three-Buckets)
+
+    The first and last points are always kept. Points in between are split
+    into threshold - 2 equal buckets, and from each bucket the point forming
+    the largest triangle with the previously kept point and the average of
+    the next bucket is kept.
+
+    Args:
+        x (array-like): Numeric, increasing x values
+        y (array-like): y values
+        threshold (int): Number of points to keep
+
+    Returns:
+        np.ndarray: Sorted indices of the kept points
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    # Average of every bucket, computed up front with cumulative sums
+    x_sums = np.concatenate(([0.0], np.cumsum(x)))
+    y_sums = np.concatenate(([0.0], np.cumsum(y)))
+    sizes = np.maximum(edges[1:] - edges[:-1], 1)
+    x_means = (x_sums[edges[1:]] - x_sums[edges[:-1]]) / sizes
+    y_means = (y_sums[edges[1:]] - y_sums[edges[:-1]]) / sizes
+    # The bucket after the last one is the final point
+    x_next = np.append(x_means[1:], x[-1])
+    y_next = np.append(y_means[1:], y[-1])
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], max(edges[i + 1], edges[i] + 1)
+        areas = np.abs(
+            (x[a] - x_next[i]) * (y[start:end] - y[a])
+            - (x[a] - x[start:end]) * (y_next[i] - y[a])
+        )
+        a = start + int(np.argmax(areas))
+        selected[i + 1] = a
+    return np.unique(selected)
+
+
+def downsample_series(frame, x, columns, max_points=CHART_MAX_POINTS):
+    """Downsample the rows of a time series DataFrame for a line chart
+
+    Every plotted column is reduced with LTTB and the union of the kept rows
+    is returned, so each line keeps its peaks and dips. The point budget is
+    shared between the columns.
+
+    Args:
+        frame (pd.DataFrame): Rows sorted by x
+        x (str): Column holding dates or numbers
+        columns (list): Columns that will be plotted
+        max_points (int): Rough cap on points sent for the whole chart
+
+    Returns:
+        pd.DataFrame: The kept rows
+    """
+    if len(frame) * len(columns) <= max_points:
+        return frame
+    x_values = frame[x]
+    if pd.api.types.is_datetime64_any_dtype(x_values):
+        x_values = x_values.astype("int64")
+    per_column = max(3, max_points // len(columns))
+    keep = np.unique(np.concatenate([
+        lttb_indices(x_values.to_numpy(), frame[column].to_numpy(), per_column)
+        for column in columns
+    ]))
+    return frame.iloc[keep]
+
+
+def top_n_with_other(values, n=PIE_MAX_SLICES):
+    """Keep the n - 1 largest values and merge the rest into "Other"
+
+    Args:
+        values (dict): label -> amount
+
+    Returns:
+        dict: At most n labels, largest first
+    """
+    if len(values) <= n:
+        return dict(values)
+    ranked = sorted(values.items(), key=lambda item: item[1], reverse=True)
+    top = {}
+    other = 0.0
+    for label, amount in ranked:
+        if len(top) < n - 1 and label != OTHER_LABEL:
+            top[label] = amount
+        else:
+            other += amount
+    top[OTHER_LABEL] = other
+    return top
@@ -0,0 +1,145 @@
+import streamlit as st
+from utils import try_llm_response
+
+# Messages kept per session; older ones only survive inside the running summary
+MAX_STORED_MESSAGES = 200
+# Messages rendered per "page" of chat history
+RENDER_PAGE_SIZE = 20
+# Approximate token budget for the recent turns sent with each prompt
+CONTEXT_TOKEN_BUDGET = 1500
+# Fold turns into the summary in batches so we don't summarize on every message
+SUMMARY_BATCH_SIZE = 6
+# Upper bound on the running summary length (characters)
+SUMMARY_MAX_CHARS = 1500
+
+SUMMARY_SYSTEM_PROMPT = """
+You maintain a running summary of a conversation between a user and FinBuddy, a financial education assistant.
+Merge the new messages into the existing summary. Keep facts about the user's situation, goals and the topics
+already explained. Write at most 120 words of plain prose.
+"""
+
+
+def estimate_tokens(text):
+    """Rough token count (about 4 characters per token for English text)"""
+    return len(text) // 4 + 1
+
+
+def select_context_window(messages, token_budget=CONTEXT_TOKEN_BUDGET):
+    """Return the index of the oldest message that still fits in the token budget
+
+    Walks backwards from the newest message, so the most recent turns are
+    always kept. Returns len(messages) if not even the newest one fits.
+    """
+    used = 0
+    start = len(messages)
+    for i in range(len(messages) - 1, -1, -1):
+        used += estimate_tokens(messages[i]["content"])
+        if used > token_budget:
+            break
+        start = i
+    return start
+
+
+def summarize_messages(previous_summary, messages):
+    """Fold messages into the running summary
+
+    Uses the model when it is available and otherwise keeps a compact list of
+    the questions the user asked.
+    """
+    transcript = "\n".join(f"{m['role']}: {m['content']}" for m in messages)
+    prompt = f"""
+    Existing summary:
+    {previous_summary or "(none)"}
+
+    New messages:
+    {transcript}
+    """
+    summary = try_llm_response(prompt, SUMMARY_SYSTEM_PROMPT)
+
+    if not summary:
+        questions = [m["content"].strip().replace("\n", " ")[:120] for m in messages if m["role"] == "user"]
+        summary = previous_summary
+        if questions:
+            summary = (summary + " " if summary else "User asked about: ") + "; ".join(questions)
+
+    # Keep the most recent part if the summary grows too long
+    summary = summary.strip()
+    if len(summary) > SUMMARY_MAX_CHARS:
+        summary = "..." + summary[-SUMMARY_MAX_CHARS:]
+    return summary
+
+
+def add_chat_message(role, content):
+    """Append a message to the chat history, keeping the stored history bounded"""
+    messages = st.session_state.messages
+    messages.append({"role": role, "content": content})
+
+    overflow = len(messages) - MAX_STORED_MESSAGES
+    if overflow > 0:
+        summarized = st.session_state.get("chat_summarized_count", 0)
+        # Make sure nothing is dropped before it has made it into the summary
+        if summarized < overflow:
+            st.session_state.chat_summary = summarize_messages(
+                st.session_state.get("chat_summary", ""),
+                messages[summarized:overflow]
+            )
+            summarized = overflow
+        del messages[:overflow]
+        st.session_state.chat_summarized_count = summarized - overflow
+
+
+def build_chat_context(system_prompt):
+    """Build the system prompt and message history to send with the newest user message
+
+    The newest message in st.session_state.messages is treated as the prompt
+    itself and left out of the returned history.
+
+    Returns:
+        tuple: (system prompt including the running summary, list of recent messages)
+    """
+    messages = st.session_state.messages[:-1]
+    summarized = min(st.session_state.get("chat_summarized_count", 0), len(messages))
+    summary = st.session_state.get("chat_summary", "")
+
+    # Recent turns that fit the budget, plus any that haven't been summarized yet
+    # (at most one summary batch, see compact_chat_history)
+    history_start = min(summarized, select_context_window(messages))
+
+    if summary:
+        system_prompt = f"{system_prompt}\nSummary of the earlier conversation:\n{summary}\n"
+    return system_prompt, messages[history_start:]
+
+
+def compact_chat_history():
+    """Fold turns that have scrolled out of the context window into the running summary
+
+    Call this after a reply has been shown so summarizing never delays the
+    first streamed token.
+    """
+    messages = st.session_state.messages
+    summarized = min(st.session_state.get("chat_summarized_count", 0), len(messages))
+    window_start = select_context_window(messages)
+
+    # Summarize in batches rather than on every message
+    if window_start - summarized >= SUMMARY_BATCH_SIZE:
+        st.session_state.chat_summary = summarize_messages(
+            st.session_state.get("chat_summary", ""),
+            messages[summarized:window_start]
+        )
+        st.session_state.chat_summarized_count = window_start
+
+
+def get_visible_messages():
+    """Return the tail of the chat history that should be rendered"""
+    visible = st.session_state.get("chat_visible_count", RENDER_PAGE_SIZE)
+    return st.session_state.messages[-visible:]
+
+
+def has_earlier_messages():
+    """Check whether older messages are hidden behind the "load earlier" control"""
+    return len(st.session_state.messages) > st.session_state.get("chat_visible_count", RENDER_PAGE_SIZE)
+
+
+def show_earlier_messages():
+    """Reveal another page of older chat messages"""
+    st.session_state.chat_visible_count = st.session_state.get("chat_visible_count", RENDER_PAGE_SIZE) + RENDER_PAGE_SIZE
@@ -0,0 +1,117 @@
+import threading
+import time
+from collections import deque
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is refused because the circuit breaker is open"""
+
+
+class CircuitBreaker:
+    """Stop calling a failing dependency until it has had time to recover.
+
+    The breaker watches the outcome of calls made in the last window_seconds.
+    Once at least min_calls have been made and the share of failures reaches
+    failure_threshold it opens, and every call is refused straight away for
+    cooldown_seconds. After the cooldown a single probe call is let through
+    (half-open): success closes the breaker, failure opens it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold=0.5, min_calls=4, window_seconds=60, cooldown_seconds=30):
+        self.failure_threshold = failure_threshold
+        self.min_calls = min_calls
+        self.window_seconds = window_seconds
+        self.cooldown_seconds = cooldown_seconds
+
+        self._state = self.CLOSED
+        self._outcomes = deque()  # (timestamp, succeeded) for recent calls
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+        self._stats = {"successes": 0, "failures": 0, "rejected": 0, "times_opened": 0}
+
+    @property
+    def state(self):
+        with self._lock:
+            self._refresh_locked(time.monotonic())
+            return self._state
+
+    def allow_request(self):
+        """Return True if a call may go ahead right now"""
+        with self._lock:
+            self._refresh_locked(time.monotonic())
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            self._stats["rejected"] += 1
+            return False
+
+    def record_success(self):
+        """Record a successful call"""
+        with self._lock:
+            self._stats["successes"] += 1
+            if self._state == self.HALF_OPEN:
+                self._state = self.CLOSED
+                self._probe_in_flight = False
+                self._outcomes.clear()
+            else:
+                self._add_outcome_locked(time.monotonic(), True)
+
+    def record_failure(self):
+        """Record a failed call, opening the breaker if failures pass the threshold"""
+        now = time.monotonic()
+        with self._lock:
+            self._stats["failures"] += 1
+            if self._state == self.HALF_OPEN:
+                self._open_locked(now)
+                return
+            self._add_outcome_locked(now, False)
+            if len(self._outcomes) >= self.min_calls:
+                failures = sum(1 for _, succeeded in self._outcomes if not succeeded)
+                if failures / len(self._outcomes) >= self.failure_threshold:
+                    self._open_locked(now)
+
+    def reset(self):
+        """Close the breaker and forget recent outcomes"""
+        with self._lock:
+            self._state = self.CLOSED
+            self._probe_in_flight = False
+            self._outcomes.clear()
+
+    def stats(self):
+        """Return the current state together with call counters"""
+        with self._lock:
+            now = time.monotonic()
+            self._refresh_locked(now)
+            stats = dict(self._stats)
+            stats["state"] = self._state
+            stats["recent_calls"] = len(self._outcomes)
+            stats["recent_failures"] = sum(1 for _, succeeded in self._outcomes if not succeeded)
+            if self._state == self.OPEN:
+                stats["retry_in"] = max(0.0, self.cooldown_seconds - (now - self._opened_at))
+        return stats
+
+    def _refresh_locked(self, now):
+        if self._state == self.OPEN and now - self._opened_at >= self.cooldown_seconds:
+            self._state = self.HALF_OPEN
+            self._probe_in_flight = False
+        while self._outcomes and now - self._outcomes[0][0] > self.window_seconds:
+            self._outcomes.popleft()
+
+    def _add_outcome_locked(self, now, succeeded):
+        self._outcomes.append((now, succeeded))
+        while self._outcomes and now - self._outcomes[0][0] > self.window_seconds:
+            self._outcomes.popleft()
+
+    def _open_locked(self, now):
+        self._state = self.OPEN
+        self._opened_at = now
+        self._probe_in_flight = False
+        self._outcomes.clear()
+        self._stats["times_opened"] += 1
@@ -0,0 +1,304 @@
+import json
+import re
+import numpy as np
+import pandas as pd
+import streamlit as st
+from keyword_matcher import KeywordMatcher
+from user_store import load_session_value
+
+# Categories offered for expenses throughout the app
+EXPENSE_CATEGORIES = ["Housing", "Food", "Transportation", "Utilities", "Entertainment",
+                      "Education", "Healthcare", "Personal", "Debt", "Savings", "Other"]
+DEFAULT_CATEGORY = "Other"
+
+# Merchant names, matched against the start of the cleaned-up description
+MERCHANT_CATEGORIES = {
+    # Food
+    "swiggy": "Food", "zomato": "Food", "dominos": "Food", "mcdonalds": "Food", "kfc": "Food",
+    "starbucks": "Food", "pizza hut": "Food", "burger king": "Food", "subway": "Food",
+    "bigbasket": "Food", "blinkit": "Food", "zepto": "Food", "grofers": "Food", "dunzo": "Food",
+    "dmart": "Food", "reliance fresh": "Food", "more retail": "Food", "chaayos": "Food",
+    # Transportation
+    "uber": "Transportation", "ola": "Transportation", "rapido": "Transportation",
+    "irctc": "Transportation", "indigo": "Transportation", "air india": "Transportation",
+    "redbus": "Transportation", "fastag": "Transportation", "indian oil": "Transportation",
+    "iocl": "Transportation", "hpcl": "Transportation", "bpcl": "Transportation",
+    "shell": "Transportation", "metro": "Transportation", "makemytrip": "Transportation",
+    # Utilities
+    "airtel": "Utilities", "jio": "Utilities", "vodafone": "Utilities", "vi prepaid": "Utilities",
+    "bsnl": "Utilities", "tata power": "Utilities", "bescom": "Utilities", "adani electricity": "Utilities",
+    "act fibernet": "Utilities", "tata play": "Utilities", "mahanagar gas": "Utilities",
+    # Entertainment
+    "netflix": "Entertainment", "spotify": "Entertainment", "hotstar": "Entertainment",
+    "prime video": "Entertainment", "bookmyshow": "Entertainment", "pvr": "Entertainment",
+    "inox": "Entertainment", "youtube": "Entertainment", "steam": "Entertainment",
+    # Education
+    "byjus": "Education", "udemy": "Education", "coursera": "Education", "unacademy": "Education",
+    "vedantu": "Education", "upgrad": "Education",
+    # Healthcare
+    "apollo": "Healthcare", "pharmeasy": "Healthcare", "1mg": "Healthcare", "netmeds": "Healthcare",
+    "practo": "Healthcare", "medplus": "Healthcare", "cult fit": "Healthcare",
+    # Personal
+    "amazon": "Personal", "amzn": "Personal", "flipkart": "Personal", "myntra": "Personal",
+    "ajio": "Personal", "nykaa": "Personal", "meesho": "Personal", "decathlon": "Personal",
+    "urban company": "Personal",
+    # Housing
+    "nobroker": "Housing", "nestaway": "Housing", "mygate": "Housing",
+    # Debt
+    "bajaj finserv": "Debt", "bajaj finance": "Debt", "cred": "Debt",
+    # Savings
+    "zerodha": "Savings", "groww": "Savings", "kuvera": "Savings", "coin by zerodha": "Savings",
+}
+
+# Words that give away the category anywhere in the description. They are matched as
+# whole words (so "bus" doesn't match "business"), which means plural and other forms
+# need their own entry, as with "grocery" and "groceries".
+KEYWORD_CATEGORIES = {
+    "rent": "Housing", "house rent": "Housing", "maintenance": "Housing", "society": "Housing",
+    "grocery": "Food", "groceries": "Food", "restaurant": "Food", "cafe": "Food", "food": "Food",
+    "bakery": "Food", "canteen": "Food", "mess": "Food",
+    "fuel": "Transportation", "petrol": "Transportation", "diesel": "Transportation",
+    "parking": "Transportation", "toll": "Transportation", "cab": "Transportation",
+    "taxi": "Transportation", "railway": "Transportation", "bus": "Transportation",
+    "electricity": "Utilities", "water bill": "Utilities", "broadband": "Utilities",
+    "recharge": "Utilities", "postpaid": "Utilities", "prepaid": "Utilities", "gas bill": "Utilities",
+    "movie": "Entertainment", "cinema": "Entertainment", "concert": "Entertainment",
+    "subscription": "Entertainment", "gaming": "Entertainment",
+    "tuition": "Education", "school": "Education", "college": "Education", "university": "Education",
+    "course": "Education", "exam fee": "Education", "books": "Education",
+    "hospital": "Healthcare", "pharmacy": "Healthcare", "medical": "Healthcare", "clinic": "Healthcare",
+    "doctor": "Healthcare", "diagnostic": "Healthcare", "health insurance": "Healthcare", "gym": "Healthcare",
+    "salon": "Personal", "clothing": "Personal", "shopping": "Personal", "apparel": "Personal",
+    "emi": "Debt", "loan": "Debt", "credit card": "Debt", "interest charged": "Debt",
+    "sip": "Savings", "mutual fund": "Savings", "fixed deposit": "Savings", "recurring deposit": "Savings",
+    "ppf": "Savings", "nps": "Savings",
+}
+
+# Payment rails and other noise that banks put in front of the merchant name
+NOISE_TOKENS = {"upi", "pos", "ach", "neft", "imps", "rtgs", "nach", "ecom", "bil", "billpay",
+                "onl", "vps", "ips", "mmt", "txn", "ref", "dr", "cr", "d", "c", "to", "by", "from",
+                "payment", "paid", "purchase", "ltd", "pvt", "private", "limited", "india", "in",
+                # UPI handles
+                "ybl", "ibl", "axl", "okaxis", "oksbi", "okicici", "okhdfcbank", "upi"}
+
+# Number of leading merchant tokens a learned correction applies to
+LEARNED_KEY_TOKENS = 3
+# Unknown descriptions sent to the AI per request
+LLM_BATCH_SIZE = 100
+
+CATEGORIZER_SYSTEM_PROMPT = """You sort bank transaction descriptions into budget categories.
+Reply with JSON only: an object mapping each description, exactly as given, to one of these categories:
+""" + ", ".join(EXPENSE_CATEGORIES) + "."
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+# Noise words plus reference numbers (any word with a run of 4+ digits, or only digits)
+_NOISE = re.compile(r"\b(?:" + "|".join(sorted(NOISE_TOKENS)) + r"|[a-z]*\d{4,}[a-z0-9]*|\d+)\b")
+_SPACES = re.compile(r"\s+")
+
+
+class PrefixTrie:
+    """Character trie that finds the longest stored key the text starts with.
+
+    Matches only count when they end at a word boundary, so "ola" matches
+    "ola cabs" but not "olaf's bakery".
+    """
+
+    _VALUE = object()  # Marker key for the value stored at a node
+
+    def __init__(self, entries=None):
+        self._root = {}
+        self.size = 0
+        for key, value in (entries or {}).items():
+            self.insert(key, value)
+
+    def insert(self, key, value):
+        node = self._root
+        for char in key:
+            node = node.setdefault(char, {})
+        if self._VALUE not in node:
+            self.size += 1
+        node[self._VALUE] = value
+
+    def longest_prefix(self, text):
+        """Return the value of the longest key text starts with, or None"""
+        node = self._root
+        found = None
+        length = len(text)
+        for i, char in enumerate(text):
+            node = node.get(char)
+            if node is None:
+                break
+            if self._VALUE in node and (i + 1 == length or text[i + 1] == " "):
+                found = node[self._VALUE]
+        return found
+
+
+def merchant_key(description):
+    """Reduce a bank description to its merchant words
+
+    "UPI-SWIGGY-8123@ybl" -> "swiggy", "POS 4521 AMAZON PAY INDIA" -> "amazon pay"
+    """
+    text = _NOISE.sub(" ", _NON_ALNUM.sub(" ", str(description).lower()))
+    return _SPACES.sub(" ", text).strip()
+
+
+def merchant_keys(descriptions):
+    """merchant_key for a whole column at once
+
+    Arrow-backed strings run the regexes in native code instead of once per
+    row in Python, which is most of the cost of categorizing a statement.
+    """
+    text = pd.Series(descriptions, dtype=object).fillna("").astype(str).astype("string[pyarrow]").str.lower()
+    text = text.str.replace(_NON_ALNUM.pattern, " ", regex=True).str.replace(_NOISE.pattern, " ", regex=True)
+    return text.str.replace(_SPACES.pattern, " ", regex=True).str.strip().astype(object)
+
+
+class ExpenseCategorizer:
+    """Assign expense categories to transaction descriptions.
+
+    Descriptions are checked against, in order: the user's own corrections,
+    known merchant names (both longest-prefix matches on the merchant words),
+    and category keywords anywhere in the text. Batches are reduced to their
+    distinct merchant words first, so a statement full of repeat merchants
+    with unique reference numbers costs one lookup per merchant.
+    """
+
+    def __init__(self, learned=None):
+        """
+        Args:
+            learned (dict, optional): merchant key -> category corrections, updated in place by learn()
+        """
+        self.learned = learned if learned is not None else {}
+        self._learned_trie = PrefixTrie(self.learned)
+
+    def categorize(self, descriptions):
+        """Return a category (or None when unknown) for every description
+
+        Args:
+            descriptions (array-like): Transaction descriptions
+
+        Returns:
+            np.ndarray: Object array of categories, None where no rule matched
+        """
+        # Distinct descriptions first, then distinct merchants among them
+        codes, uniques = pd.factorize(pd.Series(descriptions, dtype=object), use_na_sentinel=False)
+        key_codes, keys = pd.factorize(merchant_keys(uniques))
+        categories = np.array([self._categorize_key(key) for key in keys], dtype=object)
+        return categories[key_codes][codes]
+
+    def categorize_one(self, description):
+        """Return the category for one description, or None when unknown"""
+        return self._categorize_key(merchant_key(description))
+
+    def _categorize_key(self, key):
+        category = self._learned_trie.longest_prefix(key) or _merchant_trie.longest_prefix(key)
+        if category is None:
+            category = _keyword_matcher.lookup(key)
+        return category
+
+    def learn(self, description, category):
+        """Remember a user's correction for this description's merchant
+
+        Returns:
+            str: The merchant key the correction was stored under
+        """
+        key = " ".join(merchant_key(description).split()[:LEARNED_KEY_TOKENS])
+        if key:
+            self.learned[key] = category
+            self._learned_trie.insert(key, category)
+        return key
+
+    def correct(self, ledger, entry_id, category):
+        """Apply a user's category correction to an expense and learn from it
+
+        The same merchant's other expenses are moved to the new category too.
+
+        Returns:
+            int: Number of expenses changed
+        """
+        entry = ledger.get_expense(entry_id)
+        key = self.learn(entry["name"], category)
+        ledger.update_expense(entry_id, category=category)
+        changed = 1
+        if not key:
+            return changed
+
+        others = [e for e in ledger.expenses if e["id"] != entry_id and e["category"] != category]
+        if others:
+            keys = merchant_keys([e["name"] for e in others])
+            same_merchant = (keys == key) | keys.str.startswith(key + " ")
+            for other, match in zip(others, same_merchant.tolist()):
+                if match:
+                    ledger.update_expense(other["id"], category=category)
+                    changed += 1
+        return changed
+
+    def categorize_uncategorized_with_llm(self, ledger):
+        """Ask the AI to categorize the ledger's expenses filed under "Other"
+
+        Returns:
+            int: Number of expenses moved to a category
+        """
+        uncategorized = [e for e in ledger.expenses if e["category"] == DEFAULT_CATEGORY]
+        answers = self.categorize_with_llm([e["name"] for e in uncategorized])
+        for entry in uncategorized:
+            if entry["name"] in answers:
+                ledger.update_expense(entry["id"], category=answers[entry["name"]])
+        return sum(1 for e in uncategorized if e["name"] in answers)
+
+    def categorize_with_llm(self, descriptions):
+        """Ask the AI about descriptions the rules don't recognise
+
+        Like categorize, descriptions are grouped by merchant words first, so
+        a statement full of one merchant with unique reference numbers is one
+        question. One description per merchant is sent, LLM_BATCH_SIZE at a
+        time, concurrently, and every answer is learned so the merchant isn't
+        asked about again.
+
+        Returns:
+            dict: description -> category for the descriptions the AI could place
+        """
+        # Imported here to keep the rules engine free of the LLM stack
+        from utils import get_llm_responses
+
+        descriptions = list(dict.fromkeys(descriptions))
+        # Descriptions that are all noise keep their own group
+        groups = [key or description for key, description in zip(merchant_keys(descriptions), descriptions)]
+        representative = {}
+        for group, description in zip(groups, descriptions):
+            representative.setdefault(group, description)
+        unknown = list(representative.values())
+        batches = [unknown[i:i + LLM_BATCH_SIZE] for i in range(0, len(unknown), LLM_BATCH_SIZE)]
+        prompts = [json.dumps(batch, ensure_ascii=False) for batch in batches]
+
+        results = {}
+        for batch, response in zip(batches, get_llm_responses(prompts, system_prompt=CATEGORIZER_SYSTEM_PROMPT)):
+            try:
+                answers = json.loads(response[response.find("{"):response.rfind("}") + 1])
+            except ValueError:
+                answers = None
+            if not isinstance(answers, dict):
+                # Fallback text or malformed JSON; leave this batch uncategorized
+                continue
+            for description in batch:
+                category = answers.get(description)
+                if category in EXPENSE_CATEGORIES and category != DEFAULT_CATEGORY:
+                    results[description] = category
+                    self.learn(description, category)
+        # Every description of a merchant gets the answer given for it
+        return {
+            description: results[representative[group]]
+            for group, description in zip(groups, descriptions)
+            if representative[group] in results
+        }
+
+
+_merchant_trie = PrefixTrie(MERCHANT_CATEGORIES)
+_keyword_matcher = KeywordMatcher(KEYWORD_CATEGORIES, whole_words=True)
+
+
+def get_expense_categorizer():
+    """Get this user's categorizer, backed by their saved corrections"""
+    if "expense_categorizer" not in st.session_state:
+        st.session_state.expense_categorizer = ExpenseCategorizer(load_session_value("category_rules"))
+    return st.session_state.expense_categorizer
@@ -0,0 +1,71 @@
+import hashlib
+import json
+from collections import OrderedDict
+import pandas as pd
+import streamlit as st
+
+# Charts remembered per session; the least recently shown chart is dropped first
+FIGURE_CACHE_SIZE = 24
+
+
+def cached_figure(name, data, build):
+    """Return a Plotly figure for data, rebuilding it only when data changes
+
+    Each chart on a page has its own name and keeps only its latest figure,
+    so reruns that don't touch a chart's inputs (typing into a form, switching
+    tabs) reuse the figure instead of rebuilding the DataFrame and calling
+    plotly express again. The cache lives in session state, so it is bounded
+    per session and goes away with it.
+
+    Figure objects are cached rather than their JSON: st.plotly_chart
+    serializes whatever it is given, and a dict or JSON spec is first
+    validated back into a Figure, which costs several times more than
+    serializing the Figure itself.
+
+    Args:
+        name (str): Unique name of the chart within the app
+        data: The chart's inputs (plain Python values or pandas objects)
+        build (callable): Called with data to create the figure on a miss
+
+    Returns:
+        plotly.graph_objects.Figure: The cached or newly built figure
+    """
+    if "figure_cache" not in st.session_state:
+        st.session_state.figure_cache = OrderedDict()
+    cache = st.session_state.figure_cache
+
+    key = content_hash(data)
+    entry = cache.get(name)
+    if entry is not None and entry[0] == key:
+        cache.move_to_end(name)
+        return entry[1]
+
+    figure = build(data)
+    cache[name] = (key, figure)
+    cache.move_to_end(name)
+    while len(cache) > FIGURE_CACHE_SIZE:
+        cache.popitem(last=False)
+    return figure
+
+
+def content_hash(data):
+    """Hash chart inputs by value"""
+    digest = hashlib.sha256()
+    _update_hash(digest, data)
+    return digest.hexdigest()
+
+
+def _update_hash(digest, data):
+    if isinstance(data, (pd.DataFrame, pd.Series)):
+        digest.update(type(data).__name__.encode())
+        labels = data.columns if isinstance(data, pd.DataFrame) else [data.name]
+        digest.update(json.dumps([str(c) for c in labels]).encode())
+        digest.update(pd.util.hash_pandas_object(data, index=True).to_numpy().tobytes())
+    elif isinstance(data, (list, tuple)):
+        digest.update(b"[")
+        for item in data:
+            _update_hash(digest, item)
+        digest.update(b"]")
+    else:
+        digest.update(json.dumps(data, sort_keys=True, default=str).encode())
+        digest.update(b",")
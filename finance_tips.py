@@ -50,6 +50,7 @@ def display_finance_tips():
             Just provide the tip itself, no additional text.
             """
             
+            # Not cached: every click should bring a new tip
             tip = get_llm_response(prompt)
             
             # Display the tip in a styled container
@@ -3,8 +3,13 @@ import plotly.express as px
 import plotly.graph_objects as go
 import pandas as pd
 import numpy as np
-from utils import calculate_budget_summary, calculate_financial_health_score, get_llm_response
+from utils import calculate_financial_health_score, get_cached_advice
+from budget_ledger import get_budget_ledger
+from user_store import load_session_value
+from figure_cache import cached_figure
 from gamification import award_badge, update_user_progress
+from goal_projection import GoalProjection
+from goal_ledger import get_goal_ledger
 
 def display_financial_health_score():
     st.title("🚦 Financial Health Score")
@@ -14,32 +19,27 @@ def display_financial_health_score():
     has_budget = False
     budget_summary = None
     
-    if "user_budget" in st.session_state:
-        if st.session_state.user_budget["income"] and st.session_state.user_budget["expenses"]:
-            has_budget = True
-            budget_summary = calculate_budget_summary(
-                st.session_state.user_budget["income"],
-                st.session_state.user_budget["expenses"]
-            )
+    ledger = get_budget_ledger()
+    if ledger.income_count() and ledger.expense_count():
+        has_budget = True
+        budget_summary = ledger.summary()
     
     # Check for savings goals
     has_savings_goals = False
     active_savings_goals = []
     
-    if "savings_goals" in st.session_state:
-        active_savings_goals = [goal for goal in st.session_state.savings_goals 
-                               if not goal.get("deleted", False)]
-        if active_savings_goals:
-            has_savings_goals = True
+    active_savings_goals = get_goal_ledger().goals
+    if active_savings_goals:
+        has_savings_goals = True
+    goal_projection = GoalProjection.from_goals(active_savings_goals)
     
     # Check for investment progress
     has_investment_progress = False
     investment_progress = None
     
-    if "investment_progress" in st.session_state:
-        if st.session_state.investment_progress["lessons_completed"] > 0:
-            has_investment_progress = True
-            investment_progress = st.session_state.investment_progress
+    if load_session_value("investment_progress")["lessons_completed"] > 0:
+        has_investment_progress = True
+        investment_progress = st.session_state.investment_progress
     
     # Prompt user to complete prerequisites if missing data
     missing_data = []
@@ -94,7 +94,7 @@ def display_financial_health_score():
         st.subheader("Your Financial Health Score")
         
         # Create gauge chart for score
-        fig = create_gauge_chart(score)
+        fig = cached_figure("health_score_gauge", score, create_gauge_chart)
         st.plotly_chart(fig, use_container_width=True)
         
         # Score interpretation
@@ -133,7 +133,8 @@ def display_financial_health_score():
                 
                 if has_savings_goals:
                     financial_data["active_goals"] = len(active_savings_goals)
-                    financial_data["completed_goals"] = sum(1 for goal in active_savings_goals if goal.get("completed", False))
+                    financial_data["completed_goals"] = int(goal_projection.completed.sum())
+                    financial_data["goals_on_track"] = int(goal_projection.on_track.sum())
                 
                 if has_investment_progress:
                     financial_data["investment_lessons"] = investment_progress["lessons_completed"]
@@ -160,7 +161,7 @@ def display_financial_health_score():
                 Format with clear headings and bullet points for readability.
                 """
                 
-                improvement_plan = get_llm_response(prompt)
+                improvement_plan = get_cached_advice("improvement_plan", financial_data, prompt)
                 st.markdown(improvement_plan)
         
         # Show breakdown of score components
@@ -193,8 +194,8 @@ def display_financial_health_score():
         
         # Add debt management as another component (placeholder score if no data)
         if has_budget:
-            debt_expenses = sum(expense["amount"] for expense in st.session_state.user_budget["expenses"] 
-                              if expense.get("category", "").lower() == "debt")
+            debt_expenses = sum(amount for category, amount in budget_summary["expense_by_category"].items()
+                                if category.lower() == "debt")
             if debt_expenses > 0:
                 # Higher score for lower debt ratio
                 debt_ratio = debt_expenses / budget_summary["total_income"]
@@ -207,18 +208,7 @@ def display_financial_health_score():
         components.append({"Category": "Debt Management", "Score": debt_score})
         
         # Create the component breakdown chart
-        component_df = pd.DataFrame(components)
-        fig = px.bar(
-            component_df,
-            x="Category",
-            y="Score",
-            title="Financial Health Components",
-            color="Score",
-            color_continuous_scale=["red", "yellow", "green"],
-            range_color=[0, 100]
-        )
-        
-        fig.update_layout(yaxis_range=[0, 100])
+        fig = cached_figure("health_score_components", components, create_component_chart)
         st.plotly_chart(fig, use_container_width=True)
         
         # Suggest areas for improvement based on lowest components
@@ -296,3 +286,20 @@ def create_gauge_chart(score):
     fig.update_layout(height=300)
     
     return fig
+
+def create_component_chart(components):
+    """Create a bar chart of the financial health score components"""
+    component_df = pd.DataFrame(components)
+    fig = px.bar(
+        component_df,
+        x="Category",
+        y="Score",
+        title="Financial Health Components",
+        color="Score",
+        color_continuous_scale=["red", "yellow", "green"],
+        range_color=[0, 100]
+    )
+    
+    fig.update_layout(yaxis_range=[0, 100])
+    
+    return fig
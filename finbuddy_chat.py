@@ -1,6 +1,25 @@
 import streamlit as st
-from utils import get_llm_response
+from utils import stream_llm_response
 from gamification import award_badge, update_user_progress
+from keyword_matcher import KeywordMatcher
+from chat_context import (add_chat_message, build_chat_context, compact_chat_history,
+                          get_visible_messages, has_earlier_messages, show_earlier_messages)
+
+# Check for common financial topics to help with badge awards
+TOPIC_KEYWORDS = {
+    "budget": "budgeting",
+    "save": "saving", 
+    "saving": "saving",
+    "invest": "investing",
+    "investing": "investing",
+    "stock": "investing",
+    "emergency fund": "saving",
+    "debt": "budgeting",
+    "credit": "budgeting",
+    "retirement": "investing"
+}
+
+_topic_matcher = KeywordMatcher(TOPIC_KEYWORDS)
 
 def display_chat_interface():
     st.title("💬 Chat with FinBuddy")
@@ -23,15 +42,21 @@ def display_chat_interface():
         - Insurance needs
         """)
     
+    # Older messages stay hidden until asked for, so long chats render quickly
+    if has_earlier_messages():
+        if st.button("Load earlier messages"):
+            show_earlier_messages()
+            st.rerun()
+    
     # Display chat messages from history
-    for message in st.session_state.messages:
+    for message in get_visible_messages():
         with st.chat_message(message["role"]):
             st.markdown(message["content"])
     
     # Accept user input
     if prompt := st.chat_input("What would you like to know about finance?"):
         # Add user message to chat history
-        st.session_state.messages.append({"role": "user", "content": prompt})
+        add_chat_message("user", prompt)
         
         # Display user message in chat container
         with st.chat_message("user"):
@@ -50,32 +75,23 @@ def display_chat_interface():
             If asked about specific investment advice, clarify that you provide educational content only, not financial advice.
             """
             
-            # Check for common financial topics to help with badge awards
-            topic_keywords = {
-                "budget": "budgeting",
-                "save": "saving", 
-                "saving": "saving",
-                "invest": "investing",
-                "investing": "investing",
-                "stock": "investing",
-                "emergency fund": "saving",
-                "debt": "budgeting",
-                "credit": "budgeting",
-                "retirement": "investing"
-            }
-            
             # Check if the prompt contains financial topics
-            detected_topics = []
-            for keyword, topic in topic_keywords.items():
-                if keyword.lower() in prompt.lower() and topic not in detected_topics:
-                    detected_topics.append(topic)
+            detected_topics = _topic_matcher.matched_values(prompt)
             
-            # Generate response
-            full_response = get_llm_response(prompt, system_prompt)
+            # Send recent turns and a summary of older ones so follow-ups have context
+            context_prompt, history = build_chat_context(system_prompt)
+            
+            # Stream the response into the placeholder as tokens arrive
+            full_response = ""
+            for chunk in stream_llm_response(prompt, context_prompt, history=history):
+                full_response += chunk
+                message_placeholder.markdown(full_response + "▌")
+            full_response = full_response.strip()
             message_placeholder.markdown(full_response)
             
             # Add assistant response to chat history
-            st.session_state.messages.append({"role": "assistant", "content": full_response})
+            add_chat_message("assistant", full_response)
+            compact_chat_history()
             
             # Award badges for financial topic discussions
             if detected_topics:
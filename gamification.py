@@ -1,16 +1,15 @@
 import streamlit as st
 import random
 from datetime import datetime
+from user_store import load_session_value
 
 def award_badge(badge_name, emoji):
     """Award a badge to the user if they don't already have it"""
     
-    # Initialize user_badges if not exists
-    if "user_badges" not in st.session_state:
-        st.session_state.user_badges = []
+    user_badges = load_session_value("user_badges")
     
     # Check if badge already exists
-    badge_exists = any(badge["name"] == badge_name for badge in st.session_state.user_badges)
+    badge_exists = any(badge["name"] == badge_name for badge in user_badges)
     
     if not badge_exists:
         # Add new badge
@@ -19,7 +18,7 @@ def award_badge(badge_name, emoji):
             "emoji": emoji,
             "date_earned": datetime.now().strftime("%Y-%m-%d")
         }
-        st.session_state.user_badges.append(new_badge)
+        user_badges.append(new_badge)
         
         # Show badge earned message
         st.balloons()
@@ -30,20 +29,13 @@ def award_badge(badge_name, emoji):
 
 def get_user_badges():
     """Get all badges earned by the user"""
-    if "user_badges" not in st.session_state:
-        st.session_state.user_badges = []
-    
-    return st.session_state.user_badges
+    return load_session_value("user_badges")
 
 def update_user_progress(increment):
     """Update the user's progress by the specified increment"""
     
-    # Initialize user_progress if not exists
-    if "user_progress" not in st.session_state:
-        st.session_state.user_progress = 0.0
-    
     # Increment progress and cap at 1.0
-    current_progress = st.session_state.user_progress
+    current_progress = load_session_value("user_progress")
     new_progress = min(1.0, current_progress + increment)
     st.session_state.user_progress = new_progress
     
@@ -120,7 +112,7 @@ def display_achievements_page():
     
     # Show progress
     st.subheader("Overall Progress")
-    progress = st.session_state.get("user_progress", 0)
+    progress = load_session_value("user_progress")
     st.progress(progress)
     current_level = int(progress * 10)
     next_level = current_level + 1
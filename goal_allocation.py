@@ -0,0 +1,150 @@
+import numpy as np
+from goal_projection import DAYS_PER_MONTH
+
+GOAL_PRIORITIES = ["High", "Medium", "Low"]
+DEFAULT_PRIORITY = "Medium"
+# How much meeting a goal's deadline is worth when not every deadline can be met
+# (whole numbers, which the exact solver relies on)
+PRIORITY_WEIGHTS = {"High": 3.0, "Medium": 2.0, "Low": 1.0}
+
+ALLOCATION_METHODS = ("greedy", "exact")
+# Plans are laid out month by month up to this horizon
+MAX_PLAN_MONTHS = 360
+
+
+class ContributionPlan:
+    """Month-by-month split of a monthly surplus across savings goals.
+
+    Goals are funded one after another in funding_order: the whole surplus
+    goes to the first goal until it is fully funded, then to the next, and
+    so on. For a fixed surplus this sequence reaches every deadline that can
+    be reached, as long as the goals kept on time are funded earliest
+    deadline first.
+
+    Attributes, one value per goal in projection order:
+        this_month: Contribution in the first month
+        finish_month: Months until the goal is fully funded (0 when already done)
+        on_time: Fully funded by its target date
+    schedule is a months x goals array of contributions, and funding_order
+    lists goal positions in the order they are funded.
+    """
+
+    def __init__(self, projection, monthly_surplus, funding_order):
+        goals = len(projection)
+        self.monthly_surplus = monthly_surplus
+        self.funding_order = np.asarray(funding_order, dtype=np.int64)
+        self.finish_month = np.zeros(goals)
+        self.schedule = np.zeros((0, goals))
+        self.on_time = projection.completed.copy()
+        if not len(self.funding_order):
+            self.this_month = np.zeros(goals)
+            return
+        if monthly_surplus <= 0:
+            self.finish_month[self.funding_order] = np.inf
+            self.this_month = np.zeros(goals)
+            return
+
+        remaining = projection.remaining[self.funding_order]
+        funded_after = np.cumsum(remaining)
+        funded_before = funded_after - remaining
+        self.finish_month[self.funding_order] = funded_after / monthly_surplus
+        deadline_months = projection.days_remaining / DAYS_PER_MONTH
+        self.on_time |= self.finish_month <= deadline_months + 1e-9
+
+        # Money saved by the end of each month, poured into the goals in order
+        months = min(int(np.ceil(funded_after[-1] / monthly_surplus - 1e-9)), MAX_PLAN_MONTHS)
+        saved = monthly_surplus * np.arange(months + 1)[:, None]
+        funded = np.clip(saved - funded_before, 0.0, remaining)
+        self.schedule = np.zeros((months, goals))
+        self.schedule[:, self.funding_order] = np.diff(funded, axis=0)
+        self.this_month = self.schedule[0] if months else np.zeros(goals)
+
+    @property
+    def missed(self):
+        """Number of goals that won't be funded by their target date"""
+        return int(np.count_nonzero(~self.on_time))
+
+
+def allocate_contributions(projection, monthly_surplus, priorities=None, method="greedy"):
+    """Plan how to split a monthly surplus across goals to miss as few deadlines as possible
+
+    Funding goals one at a time, earliest deadline first, meets every
+    deadline that can be met for a set of goals, so the work is in choosing
+    which goals to keep on time when not all of them fit. Goals that don't
+    make the cut are funded afterwards, still in deadline order.
+
+    Args:
+        projection (GoalProjection): The goals to plan for
+        monthly_surplus (float): Amount available for goals each month
+        priorities (list): "High", "Medium" or "Low" per goal (default: all Medium)
+        method (str): "greedy" drops the goal that frees the most time per unit
+            of priority whenever a deadline is overrun (Moore-Hodgson, optimal
+            when priorities are equal); "exact" maximizes the total priority of
+            goals kept on time with a dynamic program over priority totals
+
+    Returns:
+        ContributionPlan: The schedule and each goal's finishing month
+    """
+    if method not in ALLOCATION_METHODS:
+        raise ValueError(f"Unknown allocation method: {method}")
+
+    open_goals = np.flatnonzero(~projection.completed)
+    deadlines = projection.days_remaining / DAYS_PER_MONTH
+    by_deadline = open_goals[np.argsort(deadlines[open_goals], kind="stable")]
+    if monthly_surplus <= 0:
+        return ContributionPlan(projection, monthly_surplus, by_deadline)
+
+    durations = projection.remaining / monthly_surplus  # Months of surplus each goal takes
+    weights = np.array([PRIORITY_WEIGHTS[p] for p in (priorities or [DEFAULT_PRIORITY] * len(projection))])
+    # Goals whose date has passed can't be met any more
+    candidates = by_deadline[deadlines[by_deadline] > 0]
+    if method == "greedy":
+        kept = _keep_greedy(candidates, durations, deadlines, weights)
+    else:
+        kept = _keep_exact(candidates, durations, deadlines, weights)
+
+    kept_mask = np.zeros(len(projection), dtype=bool)
+    kept_mask[kept] = True
+    funding_order = np.concatenate([by_deadline[kept_mask[by_deadline]], by_deadline[~kept_mask[by_deadline]]])
+    return ContributionPlan(projection, monthly_surplus, funding_order)
+
+
+def _keep_greedy(candidates, durations, deadlines, weights):
+    kept = []
+    used = 0.0
+    for goal in candidates:
+        kept.append(goal)
+        used += durations[goal]
+        while used > deadlines[goal] + 1e-9:
+            dropped = max(kept, key=lambda k: durations[k] / weights[k])
+            kept.remove(dropped)
+            used -= durations[dropped]
+    return kept
+
+
+def _keep_exact(candidates, durations, deadlines, weights):
+    # Lawler-Moore on the priority axis: goals in deadline order, least[w] is
+    # the shortest time in which goals worth exactly w can all be kept on
+    # time. Priority weights are whole numbers, so there are only a few
+    # dozen totals, and durations and deadlines are used as they are.
+    if not len(candidates):
+        return []
+    points = np.rint(weights[candidates]).astype(np.int64)
+    least = np.full(int(points.sum()) + 1, np.inf)
+    least[0] = 0.0
+    took = np.zeros((len(candidates), len(least)), dtype=bool)
+    for j, goal in enumerate(candidates):
+        worth = points[j]
+        with_goal = least[:len(least) - worth] + durations[goal]
+        better = (with_goal <= deadlines[goal] + 1e-9) & (with_goal < least[worth:])
+        least[worth:][better] = with_goal[better]
+        took[j, worth:] = better
+
+    # Walk back from the highest total that fits
+    kept = []
+    w = int(np.flatnonzero(np.isfinite(least))[-1])
+    for j in range(len(candidates) - 1, -1, -1):
+        if took[j, w]:
+            kept.append(candidates[j])
+            w -= points[j]
+    return kept
@@ -0,0 +1,161 @@
+from datetime import datetime
+import streamlit as st
+from user_store import get_user_store, get_user_id
+
+# Contributions recorded on a goal before its balance is folded into a new snapshot
+SNAPSHOT_EVERY = 25
+
+
+class SavingsGoalLedger:
+    """Savings goals with an append-only log of contributions.
+
+    Every change to a goal's balance (the initial savings, each deposit) is
+    recorded as an event with a per-goal sequence number, and events are
+    never rewritten. Every SNAPSHOT_EVERY events the goal's balance is
+    folded into a snapshot, so loading a goal reads its snapshot plus at
+    most a short tail of events, and current_amount is kept up to date on
+    each contribution.
+
+    Goals are plain dicts (name, target_amount, target_date, current_amount
+    and whatever else the page stores) plus an "id" that stays stable for
+    the life of the goal. Deleted goals leave the ledger immediately; their
+    stored rows and events are kept only for history and analytics.
+
+    Like BudgetLedger, goal changes and new events are noted in a change
+    log that the user store drains once per script run.
+    """
+
+    def __init__(self, goals=None, events=None, last_goal_id=0):
+        self._goals = {}      # id -> goal, active goals in creation order
+        self._snapshots = {}  # id -> (seq, balance) of the latest snapshot
+        self._last_seq = {}   # id -> sequence number of the latest event
+        self._tails = {}      # id -> number of events since the snapshot
+        self._next_id = last_goal_id + 1
+        self._changes = {}    # id -> True for goals not stored yet; goals are read when drained
+        self._new_events = []
+
+        for goal in goals or []:
+            goal = dict(goal)
+            snapshot = (goal.pop("snapshot_seq"), goal.pop("snapshot_balance"))
+            goal["current_amount"] = snapshot[1]
+            self._goals[goal["id"]] = goal
+            self._snapshots[goal["id"]] = snapshot
+            self._last_seq[goal["id"]] = snapshot[0]
+            self._tails[goal["id"]] = 0
+            self._next_id = max(self._next_id, goal["id"] + 1)
+        for goal_id, seq, amount in events or []:
+            self._goals[goal_id]["current_amount"] += amount
+            self._last_seq[goal_id] = seq
+            self._tails[goal_id] += 1
+
+    # Goals
+
+    @property
+    def goals(self):
+        """List of active goals"""
+        return list(self._goals.values())
+
+    def goal_count(self):
+        return len(self._goals)
+
+    def get_goal(self, goal_id):
+        return self._goals[goal_id]
+
+    def add_goal(self, name, target_amount, target_date, initial_amount=0.0, **fields):
+        """Add a goal (recording any initial savings as its first event) and return its id"""
+        goal_id = self._next_id
+        self._next_id += 1
+        self._goals[goal_id] = {
+            "name": name,
+            "target_amount": target_amount,
+            "target_date": target_date,
+            "current_amount": 0.0,
+            **fields,
+            "id": goal_id
+        }
+        self._snapshots[goal_id] = (0, 0.0)
+        self._last_seq[goal_id] = 0
+        self._tails[goal_id] = 0
+        self._changes[goal_id] = True
+        if initial_amount:
+            self.contribute(goal_id, initial_amount, kind="initial")
+        return goal_id
+
+    def update_goal(self, goal_id, **fields):
+        """Change a goal's details (name, dates, priority, ...); balances change through contribute"""
+        if "current_amount" in fields:
+            raise ValueError("Use contribute() to change a goal's balance")
+        self._goals[goal_id].update(fields)
+        self._changes.setdefault(goal_id, False)
+
+    def delete_goal(self, goal_id):
+        del self._goals[goal_id]
+        del self._snapshots[goal_id], self._last_seq[goal_id], self._tails[goal_id]
+        if self._changes.pop(goal_id, False):
+            # Never stored, so neither the goal nor its contributions need writing
+            self._new_events = [event for event in self._new_events if event[0] != goal_id]
+        else:
+            self._changes[goal_id] = False
+
+    # Contributions
+
+    def contribute(self, goal_id, amount, kind="deposit"):
+        """Record a contribution to a goal and return its sequence number"""
+        goal = self._goals[goal_id]
+        seq = self._last_seq[goal_id] + 1
+        self._last_seq[goal_id] = seq
+        self._new_events.append((goal_id, seq, kind, amount, datetime.now().isoformat(timespec="seconds")))
+        goal["current_amount"] += amount
+
+        self._tails[goal_id] += 1
+        if self._tails[goal_id] >= SNAPSHOT_EVERY:
+            self._snapshots[goal_id] = (seq, goal["current_amount"])
+            self._tails[goal_id] = 0
+            self._changes.setdefault(goal_id, False)
+        return seq
+
+    def drain_changes(self):
+        """Return and clear the changes since the last call
+
+        Returns:
+            tuple: (goal changes, new events). Goal changes are (id, goal dict
+                or None for a delete, snapshot seq, snapshot balance, is_new)
+                tuples, is_new being True for goals added since the last call;
+                events are (id, seq, kind, amount, created_at) tuples.
+        """
+        goal_changes = []
+        for goal_id, is_new in self._changes.items():
+            goal = self._goals.get(goal_id)
+            if goal is None:
+                goal_changes.append((goal_id, None, None, None, False))
+            else:
+                goal_changes.append((goal_id, goal, *self._snapshots[goal_id], is_new))
+        events = self._new_events
+        self._changes = {}
+        self._new_events = []
+        return goal_changes, events
+
+
+def get_goal_ledger():
+    """Get the user's savings goal ledger from session state, creating it if needed"""
+    if "goal_ledger" not in st.session_state:
+        store = get_user_store()
+        user_id = get_user_id()
+        ledger = SavingsGoalLedger(*store.load_goals(user_id))
+
+        # Carry over goals from the older JSON list, leaving deleted ones behind
+        old_goals = store.load_state(user_id, "savings_goals")
+        if old_goals:
+            for goal in old_goals:
+                if goal.get("deleted", False):
+                    continue
+                goal = {k: v for k, v in goal.items() if k != "deleted"}
+                ledger.add_goal(
+                    goal.pop("name"), goal.pop("target_amount"), goal.pop("target_date"),
+                    initial_amount=goal.pop("current_amount", 0.0), **goal
+                )
+            # Store the migrated goals before dropping the old list
+            store.save_goal_changes(user_id, *ledger.drain_changes())
+            store.delete_state(user_id, "savings_goals")
+        st.session_state.goal_ledger = ledger
+    return st.session_state.goal_ledger
@@ -0,0 +1,117 @@
+from datetime import date
+import numpy as np
+import pandas as pd
+
+# Straight-line monthly contributions assume 30-day months
+DAYS_PER_MONTH = 30
+# How far behind the straight-line schedule (as a share of the target) a goal
+# can fall and still count as on track
+ON_TRACK_TOLERANCE = 0.05
+
+
+class GoalProjection:
+    """Progress and timing for a set of savings goals, computed together.
+
+    Goals are held as parallel typed arrays (amounts as float64, dates as
+    datetime64[D]) and every derived figure is computed for all goals in one
+    vectorized pass, so a page with hundreds of goals, or a batch job
+    scoring every user's goals, costs a handful of NumPy operations instead
+    of a strptime and some arithmetic per goal.
+
+    Derived arrays, one value per goal in input order:
+        progress_pct: Saved share of the target in percent, capped at 100
+        remaining: Amount still to save, never negative
+        days_remaining: Days from today until the target date
+        monthly_needed: Straight-line monthly contribution to finish on time
+            (NaN once the target date has passed)
+        completed: The target amount has been reached
+        overdue: The target date has passed without reaching the target
+        on_track: Completed, or saved at least the share of the target that
+            the time elapsed since start_date calls for
+    """
+
+    def __init__(self, names, target_amount, current_amount, target_date, start_date=None, today=None):
+        self.names = list(names)
+        self.target_amount = np.asarray(target_amount, dtype=np.float64)
+        self.current_amount = np.asarray(current_amount, dtype=np.float64)
+        self.target_date = np.asarray(target_date, dtype="datetime64[D]")
+        if start_date is None:
+            self.start_date = np.full(len(self.names), np.datetime64("NaT"), dtype="datetime64[D]")
+        else:
+            self.start_date = np.asarray(start_date, dtype="datetime64[D]")
+        self.today = np.datetime64(today or date.today(), "D")
+        self._project()
+
+    @classmethod
+    def from_goals(cls, goals, today=None):
+        """Project goal dicts as kept by goal_ledger.SavingsGoalLedger"""
+        count = len(goals)
+        return cls(
+            [goal["name"] for goal in goals],
+            np.fromiter((goal["target_amount"] for goal in goals), np.float64, count),
+            np.fromiter((goal["current_amount"] for goal in goals), np.float64, count),
+            [goal["target_date"] for goal in goals],
+            [goal.get("start_date") or "NaT" for goal in goals],
+            today=today
+        )
+
+    @classmethod
+    def from_frame(cls, frame, today=None):
+        """Project goals held in a DataFrame, one row per goal
+
+        The frame needs name, target_amount, current_amount and target_date
+        columns (start_date is optional), so goals of many users can be
+        stacked and scored in a single pass.
+        """
+        start_date = frame["start_date"].fillna("NaT").to_numpy() if "start_date" in frame else None
+        return cls(
+            frame["name"],
+            frame["target_amount"].to_numpy(),
+            frame["current_amount"].to_numpy(),
+            frame["target_date"].to_numpy().astype("datetime64[D]"),
+            start_date,
+            today=today
+        )
+
+    def __len__(self):
+        return len(self.names)
+
+    def to_frame(self):
+        """DataFrame with the goals' inputs and derived figures"""
+        return pd.DataFrame({
+            "name": self.names,
+            "target_amount": self.target_amount,
+            "current_amount": self.current_amount,
+            "target_date": self.target_date,
+            "progress_pct": self.progress_pct,
+            "remaining": self.remaining,
+            "days_remaining": self.days_remaining,
+            "monthly_needed": self.monthly_needed,
+            "completed": self.completed,
+            "overdue": self.overdue,
+            "on_track": self.on_track
+        })
+
+    def _project(self):
+        target = self.target_amount
+        saved_share = np.divide(self.current_amount, target,
+                                out=np.ones_like(target), where=target > 0)
+        self.progress_pct = np.minimum(saved_share * 100, 100.0)
+        self.remaining = np.maximum(target - self.current_amount, 0.0)
+        self.completed = saved_share >= 1.0
+
+        self.days_remaining = (self.target_date - self.today).astype(np.int64)
+        self.overdue = (self.days_remaining <= 0) & ~self.completed
+        months_left = self.days_remaining / DAYS_PER_MONTH
+        self.monthly_needed = np.divide(self.remaining, months_left,
+                                        out=np.full_like(target, np.nan), where=self.days_remaining > 0)
+
+        # Share of the target the straight-line schedule expects by today;
+        # goals without a start date are only judged by their deadline
+        total_days = (self.target_date - self.start_date).astype(np.float64)
+        elapsed_days = (self.today - self.start_date).astype(np.float64)
+        has_schedule = ~np.isnat(self.start_date) & (total_days > 0)
+        expected_share = np.zeros_like(target)
+        np.divide(elapsed_days, total_days, out=expected_share, where=has_schedule)
+        np.clip(expected_share, 0.0, 1.0, out=expected_share)
+        self.on_track = self.completed | (~self.overdue & (saved_share >= expected_share - ON_TRACK_TOLERANCE))
@@ -0,0 +1,101 @@
+import numpy as np
+import pandas as pd
+from goal_projection import DAYS_PER_MONTH
+
+# Simulated futures per run and their length; 10k monthly paths over five
+# years take well under 100 ms, so the simulation can run on every rerun
+SIMULATION_PATHS = 10_000
+SIMULATION_MONTHS = 60
+# Months simulated past the latest target date, so late finishes still get a date
+SIMULATION_SLACK_MONTHS = 24
+# Goals further away than this are simulated only up to it
+MAX_SIMULATION_MONTHS = 360
+# Fixed seed so reruns show the same numbers for the same plan
+SIMULATION_SEED = 42
+
+# Month-to-month spread of what actually gets saved, relative to the plan
+CONTRIBUTION_VOLATILITY = 0.25
+# Chance that a month's income shock (lost shifts, a big bill) wipes out that month's saving
+SHOCK_PROBABILITY = 0.05
+
+COMPLETION_PERCENTILES = (10, 50, 90)
+
+
+def simulate_goals(projection, monthly_contributions, paths=SIMULATION_PATHS,
+                   months=SIMULATION_MONTHS, seed=SIMULATION_SEED):
+    """Estimate how likely each goal is to be reached on time
+
+    Draws paths of monthly saving multipliers (noise around the plan, with
+    occasional months where a shock leaves nothing to save) and applies them
+    to every goal's planned contribution. All goals share the same paths, as
+    they're funded from the same income. Because the multipliers are never
+    negative, the cumulative saving along a path only grows, and the month a
+    goal completes is the number of months its cumulative saving stays below
+    what the goal still needs.
+
+    Args:
+        projection (GoalProjection): The goals to simulate
+        monthly_contributions (array-like): Planned saving per month for each goal
+        paths (int): Number of simulated futures
+        months (int): Minimum horizon in months; extended past the latest target date
+        seed (int): Random seed
+
+    Returns:
+        pd.DataFrame: One row per goal with the probability of finishing by the
+            target date and the P10/P50/P90 completion dates (NaT when a
+            percentile isn't reached within the horizon)
+    """
+    contributions = np.asarray(monthly_contributions, dtype=np.float64)
+    months_to_deadline = np.floor_divide(projection.days_remaining, DAYS_PER_MONTH)
+    if len(projection):
+        months = max(months, int(months_to_deadline.max()) + SIMULATION_SLACK_MONTHS)
+    months = min(months, MAX_SIMULATION_MONTHS)
+
+    rng = np.random.default_rng(seed)
+    multipliers = 1.0 + CONTRIBUTION_VOLATILITY * rng.standard_normal((paths, months), dtype=np.float32)
+    np.maximum(multipliers, 0.0, out=multipliers)
+    multipliers[rng.random((paths, months), dtype=np.float32) < SHOCK_PROBABILITY] = 0.0
+    saved_months = np.cumsum(multipliers, axis=1)  # Planned contributions saved so far, per path
+
+    goals = len(projection)
+    probability = np.zeros(goals)
+    completion_dates = np.full((goals, len(COMPLETION_PERCENTILES)), np.datetime64("NaT"), dtype="datetime64[D]")
+    for g in range(goals):
+        if projection.completed[g]:
+            probability[g] = 1.0
+            completion_dates[g] = projection.today
+            continue
+        if contributions[g] <= 0:
+            continue
+        # Completion month along each path (months == never within the horizon)
+        needed = projection.remaining[g] / contributions[g]
+        finish = (saved_months < needed).sum(axis=1) + 1
+        probability[g] = np.count_nonzero(finish <= months_to_deadline[g]) / paths
+
+        percentiles = np.percentile(finish, COMPLETION_PERCENTILES, method="higher")
+        reached = percentiles <= months
+        completion_dates[g, reached] = projection.today + (percentiles[reached] * DAYS_PER_MONTH).astype("timedelta64[D]")
+
+    result = pd.DataFrame({"probability": probability})
+    for i, percentile in enumerate(COMPLETION_PERCENTILES):
+        result[f"p{percentile}_date"] = completion_dates[:, i]
+    return result
+
+
+def monthly_need(projection):
+    """What each goal needs this month to stay on schedule
+
+    Goals whose date has passed need their whole remaining amount.
+    """
+    need = np.where(np.isnan(projection.monthly_needed), projection.remaining, projection.monthly_needed)
+    need[projection.completed] = 0.0
+    return need
+
+
+def split_by_need(projection, monthly_amount):
+    """Split a monthly saving amount across unfinished goals in proportion to what each needs"""
+    need = monthly_need(projection)
+    total = need.sum()
+    if total <= 0:
+        return np.zeros(len(projection))
+    return monthly_amount * need / total
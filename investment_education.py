@@ -2,20 +2,17 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import json
-from utils import get_llm_response
+from utils import get_llm_response, get_llm_responses, get_static_response
+from llm_cache import CACHE_TTL_LESSON, CACHE_TTL_QUIZ
 from gamification import award_badge, update_user_progress
+from user_store import load_session_value
 
 def display_investment_education():
     st.title("📚 Investment 101")
     st.write("Learn about stocks, mutual funds, and cryptocurrencies through interactive lessons and quizzes!")
     
-    # Initialize investment progress
-    if "investment_progress" not in st.session_state:
-        st.session_state.investment_progress = {
-            "lessons_completed": 0,
-            "quizzes_taken": 0,
-            "score": 0
-        }
+    # Load the user's saved investment progress
+    load_session_value("investment_progress")
     
     # Investment topics
     investment_topics = [
@@ -63,19 +60,21 @@ def display_investment_education():
                     
                     # Generate lesson content using LLM
                     with st.spinner("Loading lesson content..."):
-                        prompt = f"""
-                        Create an educational lesson on {topic['title']} for a complete beginner.
-                        The lesson should be structured with:
-                        1. An introduction to the concept
-                        2. 3-4 key points with simple explanations
-                        3. A real-world example that illustrates the concept
-                        4. A conclusion summarizing what was learned
-                        
-                        Keep explanations simple and jargon-free. Use analogies when possible.
-                        Format with markdown headings and bullet points for readability.
-                        """
-                        
-                        lesson_content = get_llm_response(prompt)
+                        # Fetch every missing lesson at once so later lessons open
+                        # instantly instead of one slow call each
+                        lesson_contents = st.session_state.setdefault("lesson_contents", {})
+                        if i in lesson_contents:
+                            lesson_content = lesson_contents[i]
+                        else:
+                            prompts = {j: build_lesson_prompt(t) for j, t in enumerate(investment_topics)
+                                       if j not in lesson_contents}
+                            responses = dict(zip(prompts, get_llm_responses(list(prompts.values()),
+                                                                            cache_ttl=CACHE_TTL_LESSON)))
+                            # Only keep AI lessons; static fallbacks are fetched again next time
+                            for j, response in responses.items():
+                                if response != get_static_response(prompts[j]):
+                                    lesson_contents[j] = response
+                            lesson_content = responses[i]
                         
                         # Display the lesson
                         st.markdown(lesson_content)
@@ -130,18 +129,11 @@ def display_investment_education():
                 The correct_answer field should be the index (0-3) of the correct option.
                 """
                 
-                # Get response and parse as JSON
-                response = get_llm_response(prompt)
+                # Get response and parse as JSON; only quizzes that parse are cached
+                response = get_llm_response(prompt, cache_ttl=CACHE_TTL_QUIZ, cache_if=is_valid_quiz)
                 
                 try:
-                    # Extract the JSON part from the response
-                    json_str = response
-                    if "```json" in response:
-                        json_str = response.split("```json")[1].split("```")[0]
-                    elif "```" in response:
-                        json_str = response.split("```")[1].split("```")[0]
-                    
-                    quiz_data = json.loads(json_str)
+                    quiz_data = parse_quiz(response)
                     
                     # Store quiz in session state
                     st.session_state.current_quiz = quiz_data
@@ -289,3 +281,38 @@ def display_investment_education():
             st.write("👉 Continue working through the lessons to expand your knowledge.")
         else:
             st.write("👉 Great progress! Challenge yourself with the advanced topics and quizzes.")
+
+def parse_quiz(response):
+    """Parse a quiz from the AI's reply, which may wrap the JSON in a code block"""
+    json_str = response
+    if "```json" in response:
+        json_str = response.split("```json")[1].split("```")[0]
+    elif "```" in response:
+        json_str = response.split("```")[1].split("```")[0]
+    
+    quiz_data = json.loads(json_str)
+    if not quiz_data.get("questions"):
+        raise ValueError("The quiz has no questions")
+    return quiz_data
+
+def is_valid_quiz(response):
+    """Check whether a reply parses as a quiz (so it's worth caching)"""
+    try:
+        parse_quiz(response)
+        return True
+    except (ValueError, AttributeError, IndexError):
+        return False
+
+def build_lesson_prompt(topic):
+    """Build the LLM prompt for an investment lesson"""
+    return f"""
+    Create an educational lesson on {topic['title']} for a complete beginner.
+    The lesson should be structured with:
+    1. An introduction to the concept
+    2. 3-4 key points with simple explanations
+    3. A real-world example that illustrates the concept
+    4. A conclusion summarizing what was learned
+    
+    Keep explanations simple and jargon-free. Use analogies when possible.
+    Format with markdown headings and bullet points for readability.
+    """
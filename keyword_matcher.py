@@ -0,0 +1,59 @@
+import re
+
+
+class KeywordMatcher:
+    """Find every keyword from a fixed set in a piece of text in a single pass.
+
+    All keywords are compiled into one case-insensitive alternation regex,
+    longest first, so at any position the most specific keyword wins
+    ("stock market" over "stock"). Matching is substring-based, the same as
+    `keyword in text.lower()`, so "save" still matches "savings", unless
+    whole_words is set, in which case "bus" no longer matches "business".
+    """
+
+    def __init__(self, keywords, whole_words=False):
+        """
+        Args:
+            keywords (dict): Mapping of keyword to the value it stands for
+            whole_words (bool): Only match keywords standing as whole words
+        """
+        self._values = {keyword.lower(): value for keyword, value in keywords.items()}
+        # Remember the original order so ties can be broken the same way every time
+        self._order = {keyword: i for i, keyword in enumerate(self._values)}
+        ordered = sorted(self._values, key=len, reverse=True)
+        alternation = "|".join(re.escape(k) for k in ordered)
+        if whole_words:
+            alternation = rf"\b(?:{alternation})\b"
+        self._pattern = re.compile(alternation, re.IGNORECASE) if ordered else None
+
+    def find_all(self, text):
+        """Return the distinct keywords found in text, in order of appearance"""
+        if self._pattern is None or not text:
+            return []
+        found = []
+        for match in self._pattern.finditer(text):
+            keyword = match.group(0).lower()
+            if keyword not in found:
+                found.append(keyword)
+        return found
+
+    def best_match(self, text):
+        """Return the longest keyword found in text, or None"""
+        found = self.find_all(text)
+        if not found:
+            return None
+        return min(found, key=lambda k: (-len(k), self._order[k]))
+
+    def lookup(self, text, default=None):
+        """Return the value of the best matching keyword, or default"""
+        keyword = self.best_match(text)
+        return self._values[keyword] if keyword is not None else default
+
+    def matched_values(self, text):
+        """Return the distinct values of every keyword found, in order of appearance"""
+        values = []
+        for keyword in self.find_all(text):
+            value = self._values[keyword]
+            if value not in values:
+                values.append(value)
+        return values
@@ -0,0 +1,149 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# Where the on-disk cache tier lives (shared by every worker on the machine)
+DEFAULT_CACHE_PATH = os.environ.get("FINBUDDY_LLM_CACHE_PATH", os.path.join(".cache", "llm_cache.sqlite3"))
+# Number of responses kept in the in-memory LRU tier
+DEFAULT_MEMORY_ENTRIES = 512
+
+# Per-call-site time-to-live values, in seconds
+CACHE_TTL_LESSON = 7 * 24 * 3600   # Lesson content rarely needs refreshing
+CACHE_TTL_QUIZ = 24 * 3600         # Rotate quiz questions daily
+
+
+def make_cache_key(system_prompt, prompt, model, temperature):
+    """Build a stable cache key from everything that determines a response"""
+    payload = json.dumps([system_prompt, prompt, model, float(temperature)], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """Two-tier cache for LLM responses.
+
+    Lookups hit an in-memory LRU first and then a SQLite file, so identical
+    prompts are answered without an API call both within a worker and across
+    worker restarts. Every entry carries its own expiry time.
+    """
+
+    def __init__(self, db_path=DEFAULT_CACHE_PATH, max_memory_entries=DEFAULT_MEMORY_ENTRIES):
+        self.db_path = db_path
+        self.max_memory_entries = max_memory_entries
+        self._memory = OrderedDict()  # key -> (response, expires_at)
+        self._lock = threading.Lock()
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0}
+        self._db = self._open_db(db_path)
+
+    def _open_db(self, db_path):
+        if not db_path:
+            return None
+        try:
+            directory = os.path.dirname(db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            db = sqlite3.connect(db_path, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS llm_cache (
+                    key TEXT PRIMARY KEY,
+                    response TEXT NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+            """)
+            db.commit()
+            return db
+        except sqlite3.Error as e:
+            # Fall back to a memory-only cache if the disk tier is unavailable
+            print(f"LLM cache disk tier disabled: {str(e)}")
+            return None
+
+    def get(self, key):
+        """Return the cached response for key, or None on a miss"""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                response, expires_at = entry
+                if expires_at > now:
+                    self._memory.move_to_end(key)
+                    self._stats["memory_hits"] += 1
+                    return response
+                del self._memory[key]
+
+            if self._db is not None:
+                try:
+                    row = self._db.execute(
+                        "SELECT response, expires_at FROM llm_cache WHERE key = ?", (key,)
+                    ).fetchone()
+                except sqlite3.Error as e:
+                    print(f"LLM cache read error: {str(e)}")
+                    row = None
+                if row is not None and row[1] > now:
+                    self._remember_locked(key, row[0], row[1])
+                    self._stats["disk_hits"] += 1
+                    return row[0]
+
+            self._stats["misses"] += 1
+            return None
+
+    def set(self, key, response, ttl):
+        """Store a response for ttl seconds in both tiers"""
+        if not ttl or ttl <= 0:
+            return
+        expires_at = time.time() + ttl
+        with self._lock:
+            self._remember_locked(key, response, expires_at)
+            self._stats["writes"] += 1
+            if self._db is not None:
+                try:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO llm_cache (key, response, expires_at) VALUES (?, ?, ?)",
+                        (key, response, expires_at)
+                    )
+                    # Opportunistically drop expired rows so the file doesn't grow forever
+                    if self._stats["writes"] % 100 == 0:
+                        self._db.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (time.time(),))
+                    self._db.commit()
+                except sqlite3.Error as e:
+                    print(f"LLM cache write error: {str(e)}")
+
+    def clear(self):
+        """Drop every cached response from both tiers"""
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM llm_cache")
+                self._db.commit()
+
+    def stats(self):
+        """Return hit/miss counters and the current memory tier size"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["memory_entries"] = len(self._memory)
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = (stats["memory_hits"] + stats["disk_hits"]) / lookups if lookups else 0.0
+        return stats
+
+    def _remember_locked(self, key, response, expires_at):
+        self._memory[key] = (response, expires_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+
+_response_cache = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache():
+    """Get the process-wide LLM response cache, creating it on first use"""
+    global _response_cache
+    if _response_cache is None:
+        with _response_cache_lock:
+            if _response_cache is None:
+                _response_cache = LLMResponseCache()
+    return _response_cache
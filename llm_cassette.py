@@ -0,0 +1,92 @@
+import json
+import os
+import threading
+import time
+
+# "record" appends every LLM response to the cassette (response-cache hits
+# included), "replay" serves responses from it instead of calling the API.
+# Anything else disables it.
+CASSETTE_MODE = os.environ.get("FINBUDDY_LLM_CASSETTE_MODE", "").lower()
+CASSETTE_PATH = os.environ.get("FINBUDDY_LLM_CASSETTE", os.path.join(".cache", "llm_cassette.jsonl"))
+# Sleep for the recorded latency when replaying, to time pages under realistic API delays
+CASSETTE_REPLAY_LATENCY = os.environ.get("FINBUDDY_LLM_CASSETTE_REPLAY_LATENCY", "") in ("1", "true", "yes")
+
+
+class CassetteMissError(Exception):
+    """Raised in replay mode when a prompt was never recorded"""
+
+
+class LLMCassette:
+    """Record LLM responses to a JSON Lines file and replay them later.
+
+    Each line holds a prompt hash, the response text and how long the live
+    call took. A prompt recorded several times is replayed round-robin, so
+    runs that ask the same question twice see the same sequence of answers.
+    """
+
+    def __init__(self, path, mode, replay_latency=False):
+        self.path = path
+        self.mode = mode
+        self.replay_latency = replay_latency
+        self._entries = None  # key -> list of (response, latency), loaded on first replay
+        self._positions = {}
+        self._lock = threading.Lock()
+
+    @property
+    def recording(self):
+        return self.mode == "record"
+
+    @property
+    def replaying(self):
+        return self.mode == "replay"
+
+    def record(self, key, response, latency):
+        """Append one response to the cassette file"""
+        line = json.dumps({"key": key, "response": response, "latency": round(latency, 4)}, ensure_ascii=False)
+        with self._lock:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+    def replay(self, key):
+        """Return the next recorded response for key
+
+        Returns:
+            tuple: (response, recorded latency in seconds)
+        """
+        with self._lock:
+            if self._entries is None:
+                self._entries = self._load()
+            recordings = self._entries.get(key)
+            if not recordings:
+                raise CassetteMissError(f"No recording for prompt {key[:12]}")
+            position = self._positions.get(key, 0)
+            self._positions[key] = (position + 1) % len(recordings)
+            response, latency = recordings[position]
+
+        if self.replay_latency and latency:
+            time.sleep(latency)
+        return response, latency
+
+    def _load(self):
+        entries = {}
+        if not os.path.exists(self.path):
+            return entries
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                record = json.loads(line)
+                entries.setdefault(record["key"], []).append((record["response"], record.get("latency", 0.0)))
+        return entries
+
+
+_cassette = LLMCassette(CASSETTE_PATH, CASSETTE_MODE, CASSETTE_REPLAY_LATENCY) if CASSETTE_MODE in ("record", "replay") else None
+
+
+def get_cassette():
+    """Get the configured cassette, or None when record/replay is off"""
+    return _cassette
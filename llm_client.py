@@ -0,0 +1,145 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+import httpx
+from langchain_openai import ChatOpenAI
+
+# the newest OpenAI model is "gpt-4o" which was released May 13, 2024.
+# do not change this unless explicitly requested by the user
+DEFAULT_MODEL = "gpt-4o"
+DEFAULT_TEMPERATURE = 0.7
+
+# Optional OpenAI-compatible endpoint, e.g. the local mock_llm_server for load tests
+LLM_BASE_URL = os.environ.get("FINBUDDY_LLM_BASE_URL") or None
+
+# Clients unused for this many seconds are closed and dropped from the pool
+CLIENT_IDLE_TIMEOUT = 600
+# Hard cap on pooled clients (one per api key / model / temperature combination)
+MAX_POOLED_CLIENTS = 32
+
+
+class LLMClientPool:
+    """Process-wide pool of ChatOpenAI clients.
+
+    Streamlit re-executes the page script on every interaction, but imported
+    modules stay loaded, so a pool held at module level survives reruns. Each
+    pooled client owns an httpx.Client whose keep-alive connections are reused
+    between calls instead of opening a new TLS connection per request.
+
+    Clients are borrowed for the length of a request. A client evicted while
+    other threads still hold it leaves the pool at once, but its httpx.Client
+    is only closed when the last borrower gives it back.
+    """
+
+    def __init__(self, idle_timeout=CLIENT_IDLE_TIMEOUT, max_clients=MAX_POOLED_CLIENTS):
+        self.idle_timeout = idle_timeout
+        self.max_clients = max_clients
+        # key -> {"chat": ChatOpenAI, "http": httpx.Client, "last_used": float,
+        #         "borrowers": int, "evicted": bool}
+        self._clients = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def borrow(self, api_key, model=DEFAULT_MODEL, temperature=DEFAULT_TEMPERATURE, **client_kwargs):
+        """Lend a pooled client for (api_key, model, temperature), creating it if needed
+
+        Use as a context manager around the whole request (or stream). Extra
+        keyword arguments are passed to ChatOpenAI when a new client is built
+        and become part of the pool key.
+        """
+        entry = self._checkout(api_key, model, temperature, client_kwargs)
+        try:
+            yield entry["chat"]
+        finally:
+            self._checkin(entry)
+
+    def _checkout(self, api_key, model, temperature, client_kwargs):
+        if LLM_BASE_URL and "openai_api_base" not in client_kwargs:
+            client_kwargs["openai_api_base"] = LLM_BASE_URL
+        key = (api_key, model, float(temperature), tuple(sorted(client_kwargs.items())))
+        now = time.monotonic()
+
+        with self._lock:
+            self._evict_idle_locked(now)
+
+            entry = self._clients.get(key)
+            if entry is None:
+                # Make room by dropping the least recently used client
+                if len(self._clients) >= self.max_clients:
+                    oldest_key = min(self._clients, key=lambda k: self._clients[k]["last_used"])
+                    self._close_locked(oldest_key)
+
+                http_client = httpx.Client(
+                    limits=httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=60),
+                    timeout=httpx.Timeout(60.0, connect=10.0),
+                )
+                chat = ChatOpenAI(
+                    temperature=temperature,
+                    openai_api_key=api_key,
+                    model=model,
+                    http_client=http_client,
+                    **client_kwargs
+                )
+                entry = {"chat": chat, "http": http_client, "last_used": now, "borrowers": 0, "evicted": False}
+                self._clients[key] = entry
+
+            entry["last_used"] = now
+            entry["borrowers"] += 1
+            return entry
+
+    def _checkin(self, entry):
+        with self._lock:
+            entry["borrowers"] -= 1
+            entry["last_used"] = time.monotonic()
+            if entry["evicted"] and not entry["borrowers"]:
+                _close_http(entry)
+
+    def evict_idle(self):
+        """Close clients that have not been used within the idle timeout"""
+        with self._lock:
+            self._evict_idle_locked(time.monotonic())
+
+    def clear(self):
+        """Close and drop every pooled client"""
+        with self._lock:
+            for key in list(self._clients):
+                self._close_locked(key)
+
+    def size(self):
+        with self._lock:
+            return len(self._clients)
+
+    def _evict_idle_locked(self, now):
+        expired = [key for key, entry in self._clients.items()
+                   if not entry["borrowers"] and now - entry["last_used"] > self.idle_timeout]
+        for key in expired:
+            self._close_locked(key)
+
+    def _close_locked(self, key):
+        entry = self._clients.pop(key, None)
+        if entry is not None:
+            entry["evicted"] = True
+            # Clients still in use are closed when they're given back
+            if not entry["borrowers"]:
+                _close_http(entry)
+
+
+def _close_http(entry):
+    try:
+        entry["http"].close()
+    except Exception as e:
+        print(f"Error closing LLM client: {str(e)}")
+
+
+_client_pool = LLMClientPool()
+
+
+def get_client_pool():
+    """Get the process-wide LLM client pool"""
+    return _client_pool
+
+
+def borrow_chat_client(api_key, model=DEFAULT_MODEL, temperature=DEFAULT_TEMPERATURE, **client_kwargs):
+    """Borrow a pooled ChatOpenAI client for the given settings (a context manager)"""
+    return _client_pool.borrow(api_key, model=model, temperature=temperature, **client_kwargs)
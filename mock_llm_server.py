@@ -0,0 +1,295 @@
+"""
+Local stand-in for the OpenAI chat-completions API, for offline load testing.
+
+Run it next to the app and point FinBuddy at it:
+
+    python mock_llm_server.py --port 8001 --latency lognormal:0.8,0.4 --error-rate 0.02
+    FINBUDDY_LLM_BASE_URL=http://localhost:8001/v1 OPENAI_API_KEY=mock streamlit run app.py
+
+Any non-empty API key is accepted. The server supports streaming (SSE),
+configurable latency distributions, error injection and hung requests, and
+answers quiz prompts with canned quiz JSON so the quiz parser is exercised.
+"""
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CANNED_QUIZ = {
+    "questions": [
+        {
+            "question": "What is an index fund?",
+            "options": [
+                "A fund that tracks a market index",
+                "A savings account with a fixed rate",
+                "A loan from a bank",
+                "A single company's stock"
+            ],
+            "correct_answer": 0,
+            "explanation": "Index funds hold the same securities as an index like the Nifty 50 or S&P 500."
+        },
+        {
+            "question": "What does diversification help reduce?",
+            "options": ["Taxes", "Risk", "Fees", "Inflation"],
+            "correct_answer": 1,
+            "explanation": "Spreading money across many investments reduces the impact of any single one failing."
+        },
+        {
+            "question": "What is compound interest?",
+            "options": [
+                "Interest paid only on the original amount",
+                "A penalty for late payments",
+                "Interest earned on both the principal and past interest",
+                "A type of bank fee"
+            ],
+            "correct_answer": 2,
+            "explanation": "Compounding means your returns start earning returns of their own."
+        },
+        {
+            "question": "Which investment usually carries the most risk?",
+            "options": ["Fixed deposit", "Government bond", "Savings account", "Cryptocurrency"],
+            "correct_answer": 3,
+            "explanation": "Cryptocurrencies are highly volatile compared to deposits and bonds."
+        },
+        {
+            "question": "What does SIP stand for in mutual fund investing?",
+            "options": [
+                "Systematic Investment Plan",
+                "Stock Index Portfolio",
+                "Secure Interest Payment",
+                "Single Investment Purchase"
+            ],
+            "correct_answer": 0,
+            "explanation": "A SIP invests a fixed amount at regular intervals."
+        }
+    ]
+}
+
+CANNED_TEXT = (
+    "Here are a few ideas to get you started. Track your spending for a month so you know where "
+    "your money goes. Set up an automatic transfer to savings on payday, even if it's small. "
+    "Build an emergency fund of three to six months of expenses before taking on investment risk. "
+    "When you do invest, low-cost index funds are a simple way to diversify. Review your budget "
+    "every month and adjust as your income and goals change."
+)
+
+
+def parse_latency(spec):
+    """Parse a latency spec into a function returning a delay in seconds
+
+    Supported specs: "fixed:S", "uniform:MIN,MAX", "normal:MEAN,STD" and
+    "lognormal:MEDIAN,SIGMA". A bare number is treated as fixed.
+    """
+    kind, _, params = spec.partition(":")
+    if not params:
+        kind, params = "fixed", spec
+    values = [float(v) for v in params.split(",")]
+
+    if kind == "fixed":
+        return lambda rng: values[0]
+    if kind == "uniform":
+        return lambda rng: rng.uniform(values[0], values[1])
+    if kind == "normal":
+        return lambda rng: max(0.0, rng.gauss(values[0], values[1]))
+    if kind == "lognormal":
+        import math
+        mu = math.log(values[0])
+        return lambda rng: rng.lognormvariate(mu, values[1])
+    raise ValueError(f"Unknown latency distribution: {kind}")
+
+
+class MockLLMConfig:
+    """Behaviour knobs shared by every request handler"""
+
+    def __init__(self, latency="fixed:0.5", token_delay=0.02, error_rate=0.0,
+                 error_codes=(429, 500, 503), hang_rate=0.0, hang_seconds=120.0, seed=None):
+        self.sample_latency = parse_latency(latency)
+        self.token_delay = token_delay
+        self.error_rate = error_rate
+        self.error_codes = list(error_codes)
+        self.hang_rate = hang_rate
+        self.hang_seconds = hang_seconds
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.stats = {"requests": 0, "streamed": 0, "errors": 0, "hung": 0}
+
+    def draw(self):
+        """Decide the fate of one request: (latency, error_code or None, hang)"""
+        with self._lock:
+            self.stats["requests"] += 1
+            latency = self.sample_latency(self._rng)
+            roll = self._rng.random()
+            if roll < self.hang_rate:
+                self.stats["hung"] += 1
+                return latency, None, True
+            if roll < self.hang_rate + self.error_rate:
+                self.stats["errors"] += 1
+                return latency, self._rng.choice(self.error_codes), False
+            return latency, None, False
+
+
+def build_reply(messages):
+    """Pick a canned reply that the calling page can handle"""
+    prompt = next((m.get("content", "") for m in reversed(messages) if m.get("role") == "user"), "")
+    lower_prompt = prompt.lower()
+    if "quiz" in lower_prompt and "json" in lower_prompt:
+        return "```json\n" + json.dumps(CANNED_QUIZ, indent=2) + "\n```"
+    return CANNED_TEXT
+
+
+def tokenize(text):
+    """Split text into word-sized chunks the way a streaming model would emit them"""
+    words = text.split(" ")
+    return [word if i == 0 else " " + word for i, word in enumerate(words)]
+
+
+class MockLLMHandler(BaseHTTPRequestHandler):
+    server_version = "FinBuddyMockLLM/1.0"
+    config = None  # set by make_server
+
+    def log_message(self, format, *args):
+        # Keep load tests quiet; request counts are reported on shutdown
+        pass
+
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/models"):
+            self._send_json(200, {"object": "list", "data": [{"id": "gpt-4o", "object": "model"}]})
+        elif self.path.rstrip("/").endswith("/stats"):
+            self._send_json(200, self.config.stats)
+        else:
+            self._send_json(404, {"error": {"message": "Not found", "type": "invalid_request_error"}})
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": "Not found", "type": "invalid_request_error"}})
+            return
+
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError:
+            self._send_json(400, {"error": {"message": "Invalid JSON body", "type": "invalid_request_error"}})
+            return
+
+        latency, error_code, hang = self.config.draw()
+        if hang:
+            time.sleep(self.config.hang_seconds)
+            return
+        time.sleep(latency)
+        if error_code is not None:
+            self._send_json(error_code, {
+                "error": {"message": f"Injected error {error_code}", "type": "server_error", "code": error_code}
+            })
+            return
+
+        model = body.get("model", "gpt-4o")
+        reply = build_reply(body.get("messages", []))
+        if body.get("stream"):
+            self._stream_reply(model, reply)
+        else:
+            self._send_json(200, {
+                "id": f"chatcmpl-mock-{uuid.uuid4().hex[:12]}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": reply},
+                    "finish_reason": "stop"
+                }],
+                "usage": {
+                    "prompt_tokens": sum(len(m.get("content", "")) // 4 for m in body.get("messages", [])),
+                    "completion_tokens": len(reply) // 4,
+                    "total_tokens": 0
+                }
+            })
+
+    def _stream_reply(self, model, reply):
+        with self.config._lock:
+            self.config.stats["streamed"] += 1
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+
+        completion_id = f"chatcmpl-mock-{uuid.uuid4().hex[:12]}"
+        created = int(time.time())
+
+        def send_chunk(delta, finish_reason=None):
+            chunk = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]
+            }
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        try:
+            send_chunk({"role": "assistant", "content": ""})
+            for token in tokenize(reply):
+                send_chunk({"content": token})
+                if self.config.token_delay:
+                    time.sleep(self.config.token_delay)
+            send_chunk({}, finish_reason="stop")
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            # The client went away mid-stream (e.g. it timed out)
+            pass
+
+    def _send_json(self, status, payload):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def make_server(host="127.0.0.1", port=8001, config=None):
+    """Create (but don't start) a mock server bound to host:port"""
+    handler = type("ConfiguredMockLLMHandler", (MockLLMHandler,), {"config": config or MockLLMConfig()})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock OpenAI chat-completions server for FinBuddy load tests")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--latency", default="fixed:0.5",
+                        help="Time to first byte: fixed:S, uniform:MIN,MAX, normal:MEAN,STD or lognormal:MEDIAN,SIGMA")
+    parser.add_argument("--token-delay", type=float, default=0.02, help="Seconds between streamed tokens")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with an error")
+    parser.add_argument("--error-codes", default="429,500,503", help="Comma-separated HTTP status codes to inject")
+    parser.add_argument("--hang-rate", type=float, default=0.0, help="Fraction of requests that never answer")
+    parser.add_argument("--hang-seconds", type=float, default=120.0)
+    parser.add_argument("--seed", type=int, default=None, help="Seed for reproducible latency and errors")
+    args = parser.parse_args()
+
+    config = MockLLMConfig(
+        latency=args.latency,
+        token_delay=args.token_delay,
+        error_rate=args.error_rate,
+        error_codes=[int(code) for code in args.error_codes.split(",") if code],
+        hang_rate=args.hang_rate,
+        hang_seconds=args.hang_seconds,
+        seed=args.seed
+    )
+    server = make_server(args.host, args.port, config)
+    print(f"Mock LLM server listening on http://{args.host}:{args.port}/v1")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"Served: {config.stats}")
+
+
+if __name__ == "__main__":
+    main()
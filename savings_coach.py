@@ -1,101 +1,154 @@
 import streamlit as st
+import numpy as np
 import pandas as pd
 import plotly.express as px
 from datetime import datetime, timedelta
 import random
-from utils import get_llm_response, format_currency
+from utils import try_llm_response, get_static_response, format_currency, format_currency_many
 from gamification import award_badge, update_user_progress
+from user_store import get_user_store, get_user_id
+from figure_cache import cached_figure
+from chart_data import BAR_MAX_ITEMS
+from goal_projection import GoalProjection, DAYS_PER_MONTH
+from goal_simulation import simulate_goals, split_by_need, monthly_need
+from goal_allocation import allocate_contributions, GOAL_PRIORITIES, DEFAULT_PRIORITY
+from budget_ledger import get_budget_ledger
+from goal_ledger import get_goal_ledger
+from tip_prefetch import get_tip_prefetcher, progress_bucket
 
 def display_savings_coach():
     st.title("🏦 Savings Coach")
     st.write("Set savings goals and get personalized strategies to achieve them.")
     
-    # Initialize savings goals if not in session state
-    if "savings_goals" not in st.session_state:
-        st.session_state.savings_goals = []
+    # Load the user's saved goals
+    ledger = get_goal_ledger()
+    active_goals = ledger.goals
     
-    tab1, tab2 = st.tabs(["My Savings Goals", "Add New Goal"])
+    # Progress and timing for every active goal, computed in one pass
+    projection = GoalProjection.from_goals(active_goals)
+    tip_prefetcher = get_tip_prefetcher()
+    user_id = get_user_id()
+    
+    tab1, tab2, tab3 = st.tabs(["My Savings Goals", "Add New Goal", "Optimize My Plan"])
     
     # View existing savings goals
     with tab1:
-        if not st.session_state.savings_goals:
+        if not active_goals:
             st.info("You haven't set any savings goals yet. Create one in the 'Add New Goal' tab!")
         else:
             st.subheader("Your Savings Goals")
             
+            # Simulation mode: how likely is each goal to finish on time?
+            simulate = st.toggle(
+                "Simulation mode",
+                help="Simulates thousands of possible futures, including months where something comes up and you can't save, to estimate when each goal will really be reached."
+            )
+            if simulate:
+                surplus = get_budget_ledger().monthly_summary()["balance"]
+                default_saving = surplus if surplus > 0 else float(monthly_need(projection).sum())
+                monthly_saving = st.number_input(
+                    "Monthly amount you can put towards your goals",
+                    min_value=0.0,
+                    value=round(default_saving, 2),
+                    step=100.0,
+                    help="Defaults to your budget's average monthly surplus. It's split across your goals according to how much each one needs per month."
+                )
+                simulation = simulate_goals(projection, split_by_need(projection, monthly_saving))
+            
             # Display all goals as cards
-            for i, goal in enumerate(st.session_state.savings_goals):
-                if not goal.get("deleted", False):  # Skip deleted goals
-                    with st.expander(f"Goal: {goal['name']} - {format_currency(goal['target_amount'])}", expanded=True):
-                        col1, col2 = st.columns([3, 1])
+            for j, goal in enumerate(active_goals):
+                goal_id = goal["id"]
+                progress_pct = projection.progress_pct[j]
+                days_remaining = projection.days_remaining[j]
+                
+                # Have tips ready before they're asked for: generated in the background
+                # when the goal is new or its progress reaches a new band
+                tips_key = (user_id, goal_id, progress_bucket(progress_pct))
+                tips_prompt = saving_tips_prompt(goal, progress_pct, days_remaining)
+                tip_prefetcher.prefetch(tips_key, tips_prompt)
+                with st.expander(f"Goal: {goal['name']} - {format_currency(goal['target_amount'])}", expanded=True):
+                    col1, col2 = st.columns([3, 1])
+                    
+                    with col1:
+                        # Display goal details
+                        st.write(f"**Target amount:** {format_currency(goal['target_amount'])}")
+                        st.write(f"**Current savings:** {format_currency(goal['current_amount'])}")
+                        st.write(f"**Target date:** {goal['target_date']}")
+                        
+                        # Display progress
+                        st.progress(progress_pct / 100)
+                        st.write(f"Progress: {progress_pct:.1f}%")
                         
-                        with col1:
-                            # Display goal details
-                            st.write(f"**Target amount:** {format_currency(goal['target_amount'])}")
-                            st.write(f"**Current savings:** {format_currency(goal['current_amount'])}")
-                            st.write(f"**Target date:** {goal['target_date']}")
-                            
-                            # Calculate and display progress
-                            progress_pct = min(100, (goal['current_amount'] / goal['target_amount']) * 100)
-                            st.progress(progress_pct / 100)
-                            st.write(f"Progress: {progress_pct:.1f}%")
-                            
-                            # Time remaining calculation
-                            target_date = datetime.strptime(goal['target_date'], "%Y-%m-%d")
-                            days_remaining = (target_date - datetime.now()).days
-                            if days_remaining > 0:
-                                monthly_needed = (goal['target_amount'] - goal['current_amount']) / (days_remaining / 30)
-                                st.write(f"To reach your goal, save approximately {format_currency(monthly_needed)} per month")
-                            elif days_remaining <= 0 and progress_pct < 100:
-                                st.error("Goal date has passed. Consider adjusting your timeline.")
-                            
-                            # Goal status
-                            if progress_pct >= 100:
-                                st.success("🎉 Goal achieved!")
-                                if not goal.get("completed", False):
-                                    goal["completed"] = True
-                                    award_badge("Goal Achiever", "🎯")
-                                    update_user_progress(0.2)
+                        # Balance over time, from the goal's contribution log
+                        if st.checkbox("Show history", key=f"history_{goal_id}"):
+                            history = get_user_store().load_goal_history(get_user_id(), goal_id)
+                            if len(history) > 1:
+                                fig = cached_figure(f"goal_history_{goal_id}", history, create_goal_history_chart)
+                                st.plotly_chart(fig, use_container_width=True)
                             else:
-                                goal["completed"] = False
+                                st.caption("Add funds to this goal to start its history.")
                         
-                        with col2:
-                            # Add funds to the goal
-                            st.write("Add funds:")
-                            amount_to_add = st.number_input(
-                                "Amount", 
-                                min_value=0.0, 
-                                step=10.0, 
-                                key=f"add_amount_{i}"
+                        # Time remaining
+                        if days_remaining > 0 and not projection.completed[j]:
+                            st.write(f"To reach your goal, save approximately {format_currency(projection.monthly_needed[j])} per month")
+                            if not projection.on_track[j]:
+                                st.caption("You're behind schedule for this goal.")
+                        elif projection.overdue[j]:
+                            st.error("Goal date has passed. Consider adjusting your timeline.")
+                        
+                        if simulate and not projection.completed[j]:
+                            outcome = simulation.iloc[j]
+                            if not projection.overdue[j]:
+                                st.write(f"**Chance of reaching it by the target date:** {outcome['probability']:.0%}")
+                            st.caption(
+                                f"Likely completion: {format_completion_date(outcome['p50_date'])} "
+                                f"(best case {format_completion_date(outcome['p10_date'])}, "
+                                f"worst case {format_completion_date(outcome['p90_date'])})"
                             )
-                            if st.button("Add", key=f"add_btn_{i}"):
-                                st.session_state.savings_goals[i]['current_amount'] += amount_to_add
-                                st.success(f"Added {format_currency(amount_to_add)} to your goal!")
-                                st.rerun()
-                            
-                            # Delete goal
-                            if st.button("Delete Goal", key=f"delete_{i}"):
-                                st.session_state.savings_goals[i]['deleted'] = True
-                                st.success("Goal deleted!")
-                                st.rerun()
-                            
-                            # Get strategy
-                            if st.button("Get Saving Tips", key=f"tips_{i}"):
+                        
+                        # Goal status
+                        if projection.completed[j]:
+                            st.success("🎉 Goal achieved!")
+                            if not goal.get("completed", False):
+                                ledger.update_goal(goal_id, completed=True)
+                                award_badge("Goal Achiever", "🎯")
+                                update_user_progress(0.2)
+                        elif goal.get("completed", False):
+                            ledger.update_goal(goal_id, completed=False)
+                    
+                    with col2:
+                        # Add funds to the goal
+                        st.write("Add funds:")
+                        amount_to_add = st.number_input(
+                            "Amount", 
+                            min_value=0.0, 
+                            step=10.0, 
+                            key=f"add_amount_{goal_id}"
+                        )
+                        if st.button("Add", key=f"add_btn_{goal_id}") and amount_to_add > 0:
+                            ledger.contribute(goal_id, amount_to_add)
+                            st.success(f"Added {format_currency(amount_to_add)} to your goal!")
+                            st.rerun()
+                        
+                        # Delete goal
+                        if st.button("Delete Goal", key=f"delete_{goal_id}"):
+                            ledger.delete_goal(goal_id)
+                            st.success("Goal deleted!")
+                            st.rerun()
+                        
+                        # Get strategy
+                        if st.button("Get Saving Tips", key=f"tips_{goal_id}"):
+                            tips = tip_prefetcher.get(tips_key)
+                            if tips is None:
+                                # Not ready yet; an identical request still in flight is
+                                # joined rather than sent twice (see utils._call_llm)
                                 with st.spinner("Generating personalized tips..."):
-                                    prompt = f"""
-                                    Provide 3 specific, actionable tips for saving money for this goal:
-                                    
-                                    Goal: {goal['name']}
-                                    Target amount: {format_currency(goal['target_amount'])}
-                                    Current progress: {progress_pct:.1f}%
-                                    Time remaining: {days_remaining} days
-                                    
-                                    Focus on practical methods for a student/young adult to save money.
-                                    Format as bullet points.
-                                    """
-                                    
-                                    tips = get_llm_response(prompt)
-                                    st.markdown(tips)
+                                    tips = try_llm_response(tips_prompt)
+                                if tips is not None:
+                                    tip_prefetcher.put(tips_key, tips)
+                                else:
+                                    tips = get_static_response(tips_prompt)
+                            st.markdown(tips)
     
     # Add new savings goal
     with tab2:
@@ -110,58 +163,215 @@ def display_savings_coach():
                 value=(datetime.now() + timedelta(days=180)).date()
             )
             current_amount = st.number_input("Initial Savings ($)", min_value=0.0, step=10.0)
+            priority = st.selectbox(
+                "Priority",
+                GOAL_PRIORITIES,
+                index=GOAL_PRIORITIES.index(DEFAULT_PRIORITY),
+                help="When your savings can't cover every goal on time, higher priority goals are kept on schedule first."
+            )
             
             submitted = st.form_submit_button("Create Goal")
             if submitted and goal_name and goal_amount > 0:
-                new_goal = {
-                    "name": goal_name,
-                    "target_amount": goal_amount,
-                    "target_date": goal_date.strftime("%Y-%m-%d"),
-                    "current_amount": current_amount,
-                    "start_date": datetime.now().strftime("%Y-%m-%d"),
-                    "active": True,
-                    "completed": False,
-                    "deleted": False
-                }
-                
-                st.session_state.savings_goals.append(new_goal)
+                ledger.add_goal(
+                    goal_name,
+                    goal_amount,
+                    goal_date.strftime("%Y-%m-%d"),
+                    initial_amount=current_amount,
+                    start_date=datetime.now().strftime("%Y-%m-%d"),
+                    priority=priority,
+                    active=True,
+                    completed=False
+                )
                 st.success(f"Created new savings goal: {goal_name}")
                 
                 # Award badge for creating first savings goal
-                if len(st.session_state.savings_goals) == 1:
+                if ledger.goal_count() == 1:
                     award_badge("Goal Setter", "🎯")
                     update_user_progress(0.1)
                 
                 st.rerun()
     
+    # Split the monthly surplus across goals
+    with tab3:
+        display_plan_optimizer(ledger, active_goals, projection)
+    
     # Show savings overview visualization if goals exist
-    if st.session_state.savings_goals:
-        active_goals = [g for g in st.session_state.savings_goals if not g.get("deleted", False)]
-        if active_goals:
-            st.subheader("Savings Overview")
-            
-            # Prepare data for visualization
-            goal_data = []
-            for goal in active_goals:
-                goal_data.append({
-                    "Goal": goal["name"],
-                    "Current Amount": goal["current_amount"],
-                    "Remaining": goal["target_amount"] - goal["current_amount"] if goal["current_amount"] < goal["target_amount"] else 0
-                })
-            
-            goal_df = pd.DataFrame(goal_data)
-            
-            # Create stacked bar chart
-            fig = px.bar(
-                goal_df,
-                x="Goal",
-                y=["Current Amount", "Remaining"],
-                title="Progress Towards Savings Goals",
-                labels={"value": "Amount ($)", "variable": ""},
-                color_discrete_map={
-                    "Current Amount": "#00CC96",
-                    "Remaining": "#EF553B"
-                }
-            )
-            
-            st.plotly_chart(fig, use_container_width=True)
+    if len(projection):
+        st.subheader("Savings Overview")
+        
+        # Only rebuild the chart when a goal's numbers change
+        fig = cached_figure(
+            "savings_overview",
+            pd.DataFrame({
+                "Goal": projection.names,
+                "Current Amount": projection.current_amount,
+                "Remaining": projection.remaining
+            }),
+            create_savings_overview_chart
+        )
+        st.plotly_chart(fig, use_container_width=True)
+
+def saving_tips_prompt(goal, progress_pct, days_remaining):
+    """Build the prompt asking for saving tips for a goal"""
+    return f"""
+    Provide 3 specific, actionable tips for saving money for this goal:
+    
+    Goal: {goal['name']}
+    Target amount: {format_currency(goal['target_amount'])}
+    Current progress: {progress_pct:.1f}%
+    Time remaining: {days_remaining} days
+    
+    Focus on practical methods for a student/young adult to save money.
+    Format as bullet points.
+    """
+
+def display_plan_optimizer(ledger, active_goals, projection):
+    """Show how to split the monthly surplus across goals so as few deadlines as possible are missed"""
+    st.subheader("Optimize My Plan")
+    
+    if not len(projection):
+        st.info("Add a savings goal to plan your contributions.")
+        return
+    if projection.completed.all():
+        st.success("Every one of your goals is fully funded. Add a new goal to plan your next contributions.")
+        return
+    
+    st.write("FinBuddy funds your goals one at a time, earliest deadline first. "
+             "If your savings can't cover every goal on time, lower priority and larger goals make way for the rest.")
+    
+    surplus = get_budget_ledger().monthly_summary()["balance"]
+    if surplus <= 0:
+        st.info("Your budget doesn't show a surplus yet. Add your income and expenses in the Budget Planner, or enter an amount below.")
+    monthly_surplus = st.number_input(
+        "Monthly amount available for goals",
+        min_value=0.0,
+        value=round(max(surplus, 0.0), 2),
+        step=100.0,
+        key="plan_monthly_surplus"
+    )
+    exact = st.toggle(
+        "Exact solver",
+        help="Instead of the quick earliest-deadline rule, finds the set of goals that can all be met on time with the most priority between them (High counts 3, Medium 2, Low 1)."
+    )
+    
+    priorities = [goal.get("priority", DEFAULT_PRIORITY) for goal in active_goals]
+    plan = allocate_contributions(projection, monthly_surplus, priorities, method="exact" if exact else "greedy")
+    
+    open_goals = np.flatnonzero(~projection.completed)
+    plan_df = pd.DataFrame({
+        "Goal": [projection.names[j] for j in open_goals],
+        "Priority": [priorities[j] for j in open_goals],
+        "Target date": [active_goals[j]["target_date"] for j in open_goals],
+        "Remaining": format_currency_many(projection.remaining[open_goals]),
+        "This month": format_currency_many(plan.this_month[open_goals]),
+        "Fully funded": [format_plan_month(plan.finish_month[j]) for j in open_goals],
+        "On time": ["✅" if plan.on_time[j] else "❌" for j in open_goals]
+    }, index=open_goals)
+    edited_df = st.data_editor(
+        plan_df,
+        hide_index=True,
+        disabled=[c for c in plan_df.columns if c != "Priority"],
+        column_config={"Priority": st.column_config.SelectboxColumn("Priority", options=GOAL_PRIORITIES, required=True)},
+        # A fresh key after each change, so stale edits aren't replayed on the new plan
+        key=f"plan_editor_{st.session_state.get('plan_editor_version', 0)}"
+    )
+    
+    changed = edited_df["Priority"] != plan_df["Priority"]
+    if changed.any():
+        for j, priority in edited_df.loc[changed, "Priority"].items():
+            ledger.update_goal(active_goals[j]["id"], priority=priority)
+        st.session_state.plan_editor_version = st.session_state.get("plan_editor_version", 0) + 1
+        st.rerun()
+    
+    if monthly_surplus <= 0:
+        return
+    if plan.missed:
+        st.warning(f"{plan.missed} goal(s) can't be reached on time with {format_currency(monthly_surplus)} a month. "
+                   "Consider saving more, moving their target dates or lowering their priority.")
+    else:
+        st.success("All your goals can be reached on time with this plan!")
+    
+    if len(plan.schedule):
+        fig = cached_figure(
+            "contribution_plan",
+            pd.DataFrame(plan.schedule[:, open_goals], columns=[projection.names[j] for j in open_goals]),
+            create_contribution_plan_chart
+        )
+        st.plotly_chart(fig, use_container_width=True)
+
+def create_goal_history_chart(history):
+    """Create a line chart of a goal's balance after each contribution"""
+    history_df = pd.DataFrame({
+        "Date": pd.to_datetime(history["created_at"]),
+        "Balance": history["amount"].cumsum()
+    })
+    
+    return px.line(
+        history_df,
+        x="Date",
+        y="Balance",
+        markers=True,
+        title="Savings History",
+        labels={"Balance": "Amount ($)"}
+    )
+
+def format_plan_month(months):
+    """Format the date a goal is fully funded, months from now"""
+    if not np.isfinite(months):
+        return "Not funded"
+    if months == 0:
+        return "Done"
+    return (datetime.now() + timedelta(days=months * DAYS_PER_MONTH)).strftime("%b %Y")
+
+def create_contribution_plan_chart(schedule_df):
+    """Create a stacked bar chart of planned monthly contributions per goal"""
+    months = pd.period_range(datetime.now(), periods=len(schedule_df), freq="M").strftime("%b %Y")
+    plot_df = pd.DataFrame({
+        "Month": np.repeat(months, schedule_df.shape[1]),
+        "Goal": np.tile(schedule_df.columns, len(schedule_df)),
+        "Contribution": schedule_df.to_numpy().ravel()
+    })
+    plot_df = plot_df[plot_df["Contribution"] > 0]
+    
+    return px.bar(
+        plot_df,
+        x="Month",
+        y="Contribution",
+        color="Goal",
+        title="Monthly Contribution Plan",
+        labels={"Contribution": "Amount ($)"}
+    )
+
+def format_completion_date(value):
+    """Format a simulated completion date, which is NaT when it falls past the simulated period"""
+    if pd.isna(value):
+        return "not in the next few years"
+    return value.strftime("%b %Y")
+
+def create_savings_overview_chart(goal_df):
+    """Create a stacked bar chart of saved vs. remaining amounts per goal"""
+    
+    # Show the largest goals and combine the rest into one bar
+    if len(goal_df) > BAR_MAX_ITEMS:
+        goal_df["Target"] = goal_df["Current Amount"] + goal_df["Remaining"]
+        goal_df = goal_df.sort_values("Target", ascending=False)
+        top_goals = goal_df.iloc[:BAR_MAX_ITEMS - 1]
+        other_goals = goal_df.iloc[BAR_MAX_ITEMS - 1:]
+        goal_df = pd.concat([top_goals, pd.DataFrame([{
+            "Goal": f"{len(other_goals)} other goals",
+            "Current Amount": other_goals["Current Amount"].sum(),
+            "Remaining": other_goals["Remaining"].sum()
+        }])], ignore_index=True)
+    
+    # Create stacked bar chart
+    return px.bar(
+        goal_df,
+        x="Goal",
+        y=["Current Amount", "Remaining"],
+        title="Progress Towards Savings Goals",
+        labels={"value": "Amount ($)", "variable": ""},
+        color_discrete_map={
+            "Current Amount": "#00CC96",
+            "Remaining": "#EF553B"
+        }
+    )
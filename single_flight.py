@@ -0,0 +1,53 @@
+import threading
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    """Coalesce identical concurrent calls into one.
+
+    The first caller for a key runs the function; anyone asking for the same
+    key while that call is still running waits on its future and receives the
+    same result (or exception) instead of starting a call of their own.
+    """
+
+    def __init__(self):
+        self._calls = {}  # key -> Future of the in-flight call
+        self._lock = threading.Lock()
+        self._stats = {"calls": 0, "coalesced": 0}
+
+    def do(self, key, fn, *args, **kwargs):
+        """Run fn(*args, **kwargs) unless a call for key is already in flight"""
+        with self._lock:
+            future = self._calls.get(key)
+            is_leader = future is None
+            if is_leader:
+                future = Future()
+                self._calls[key] = future
+                self._stats["calls"] += 1
+            else:
+                self._stats["coalesced"] += 1
+
+        if not is_leader:
+            return future.result()
+
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    def in_flight(self):
+        """Number of distinct calls currently running"""
+        with self._lock:
+            return len(self._calls)
+
+    def stats(self):
+        """Return how many calls ran and how many were coalesced onto them"""
+        with self._lock:
+            return dict(self._stats)
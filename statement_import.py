@@ -0,0 +1,277 @@
+import io
+import re
+import numpy as np
+import pandas as pd
+
+# Rows parsed per chunk; bounds memory no matter how large the statement is
+IMPORT_CHUNK_ROWS = 20000
+
+# Column names used by common bank statement exports (compared lower-cased)
+DATE_COLUMNS = ["date", "transaction date", "txn date", "value date", "posting date", "value dt", "tran date"]
+DESCRIPTION_COLUMNS = ["description", "narration", "particulars", "details", "remarks", "transaction details", "memo", "payee", "name"]
+AMOUNT_COLUMNS = ["amount", "transaction amount", "amount (inr)", "amt"]
+DEBIT_COLUMNS = ["debit", "withdrawal", "withdrawal amt.", "withdrawal amount", "debit amount", "dr"]
+CREDIT_COLUMNS = ["credit", "deposit", "deposit amt.", "deposit amount", "credit amount", "cr"]
+
+# Characters that are not part of a number (currency symbols, thousands separators, spaces)
+_AMOUNT_JUNK = re.compile(r"[^0-9.\-]")
+# ISO dates (2024-01-31, optionally followed by a time) are read year first.
+# Other statement dates are day first; common layouts are tried as a whole column
+# before falling back to parsing the leftovers one by one
+DAY_FIRST_FORMATS = ["%d/%m/%Y", "%d-%m-%Y", "%d.%m.%Y", "%d/%m/%y", "%d-%m-%y",
+                     "%d %b %Y", "%d-%b-%Y", "%d %b %y", "%d-%b-%y"]
+_OFX_FIELD = re.compile(r"<(\w+)>([^<\r\n]*)")
+
+
+class StatementFormatError(Exception):
+    """Raised when a statement file can't be recognised"""
+
+
+def import_statement(file, ledger, chunksize=IMPORT_CHUNK_ROWS, progress_callback=None, categorizer=None):
+    """Stream a bank statement into the budget ledger
+
+    Credits become income and debits become expenses. Transactions already
+    in the ledger (same date, amount, description and occurrence) are skipped,
+    so importing the same statement twice adds nothing.
+
+    Args:
+        file: Binary file-like object holding a CSV or OFX/QFX statement
+        ledger (BudgetLedger): Ledger to append transactions to
+        chunksize (int): Number of rows parsed at a time
+        progress_callback (callable, optional): Called with the fraction of the file processed
+        categorizer (ExpenseCategorizer, optional): Assigns expense categories; without
+            one (or when no rule matches) expenses are filed under "Other"
+
+    Returns:
+        dict: Counts of rows read, income and expenses added, duplicates, unparseable
+            rows and expenses left uncategorized
+    """
+    stats = {"rows": 0, "income_added": 0, "expenses_added": 0, "duplicates": 0, "skipped": 0,
+             "uncategorized": 0}
+    total_bytes = _file_size(file)
+    seen = {}  # base hash -> occurrences so far in this file
+
+    for chunk in _iter_statement_chunks(file, chunksize):
+        stats["rows"] += len(chunk)
+
+        # Drop rows we couldn't make sense of
+        valid = chunk["date"].notna() & chunk["amount"].notna() & (chunk["amount"] != 0)
+        stats["skipped"] += int((~valid).sum())
+        chunk = chunk[valid]
+
+        if len(chunk):
+            chunk = chunk.assign(txn_hash=_transaction_hashes(chunk, seen))
+            known = ledger.transaction_hashes
+            is_new = np.fromiter((int(h) not in known for h in chunk["txn_hash"]), dtype=bool, count=len(chunk))
+            stats["duplicates"] += int((~is_new).sum())
+            chunk = chunk[is_new]
+
+            credits = chunk[chunk["amount"] > 0]
+            debits = chunk[chunk["amount"] < 0]
+            categories = pd.Series(None, index=debits.index, dtype=object)
+            if categorizer is not None and len(debits):
+                categories[:] = categorizer.categorize(debits["description"])
+            stats["uncategorized"] += int(categories.isna().sum())
+            debits = debits.assign(category=categories.fillna("Other"))
+
+            stats["income_added"] += ledger.add_transactions("income", _to_records(credits))
+            stats["expenses_added"] += ledger.add_transactions("expenses", _to_records(debits))
+
+        if progress_callback is not None and total_bytes:
+            progress_callback(min(1.0, file.tell() / total_bytes))
+
+    if progress_callback is not None:
+        progress_callback(1.0)
+    return stats
+
+
+def _iter_statement_chunks(file, chunksize):
+    """Yield DataFrames with date, description and signed amount columns"""
+    head = file.read(512)
+    file.seek(0)
+    text_head = head.decode("utf-8", errors="ignore").lstrip().upper()
+    if text_head.startswith("OFXHEADER") or text_head.startswith("<?XML") or "<OFX>" in text_head:
+        yield from _iter_ofx_chunks(file, chunksize)
+    else:
+        yield from _iter_csv_chunks(file, chunksize)
+
+
+def _iter_csv_chunks(file, chunksize):
+    columns = None
+    for raw in _read_csv_chunks(file, chunksize):
+        if columns is None:
+            columns = _detect_columns(raw.columns)
+        lowered = raw.rename(columns=lambda c: str(c).strip().lower())
+
+        if columns["amount"] is not None:
+            amount = _parse_amounts(lowered[columns["amount"]])
+        else:
+            debit = _parse_amounts(lowered[columns["debit"]]).fillna(0).abs()
+            credit = _parse_amounts(lowered[columns["credit"]]).fillna(0).abs()
+            amount = credit - debit
+
+        if columns["description"] is not None:
+            description = lowered[columns["description"]].fillna("").str.strip()
+        else:
+            description = pd.Series("Imported transaction", index=lowered.index)
+
+        yield pd.DataFrame({
+            "date": _parse_dates(lowered[columns["date"]]),
+            "description": description,
+            "amount": amount
+        })
+
+
+def _read_csv_chunks(file, chunksize):
+    """Read a CSV in chunks, reporting empty or malformed files as StatementFormatError"""
+    try:
+        reader = pd.read_csv(file, chunksize=chunksize, dtype=str, skipinitialspace=True, on_bad_lines="skip")
+        while True:
+            try:
+                raw = next(reader)
+            except StopIteration:
+                return
+            yield raw
+    except pd.errors.EmptyDataError as e:
+        raise StatementFormatError("The statement file is empty.") from e
+    except pd.errors.ParserError as e:
+        raise StatementFormatError(f"Couldn't read the statement as CSV: {e}") from e
+
+
+def _iter_ofx_chunks(file, chunksize):
+    """Parse <STMTTRN> blocks from an OFX/QFX file line by line"""
+    rows = []
+    current = None
+    for raw_line in file:
+        line = raw_line.decode("utf-8", errors="ignore")
+        for tag, value in _OFX_FIELD.findall(line):
+            tag = tag.upper()
+            if tag == "STMTTRN":
+                current = {}
+            elif current is not None and value.strip():
+                current[tag] = value.strip()
+        if current is not None and "</STMTTRN>" in line.upper():
+            rows.append(current)
+            current = None
+            if len(rows) >= chunksize:
+                yield _ofx_frame(rows)
+                rows = []
+    if rows:
+        yield _ofx_frame(rows)
+
+
+def _ofx_frame(rows):
+    frame = pd.DataFrame(rows)
+    for column in ["DTPOSTED", "TRNAMT", "NAME", "MEMO"]:
+        if column not in frame:
+            frame[column] = None
+    description = frame["NAME"].fillna(frame["MEMO"]).fillna("Imported transaction")
+    return pd.DataFrame({
+        # OFX dates look like 20240131 or 20240131120000[+5.30:IST]
+        "date": pd.to_datetime(frame["DTPOSTED"].str[:8], format="%Y%m%d", errors="coerce"),
+        "description": description.str.strip(),
+        "amount": _parse_amounts(frame["TRNAMT"])
+    })
+
+
+def _detect_columns(columns):
+    """Map the statement's header row onto date / description / amount columns"""
+    lowered = [str(c).strip().lower() for c in columns]
+
+    def find(candidates):
+        for candidate in candidates:
+            if candidate in lowered:
+                return candidate
+        return None
+
+    detected = {
+        "date": find(DATE_COLUMNS),
+        "description": find(DESCRIPTION_COLUMNS),
+        "amount": find(AMOUNT_COLUMNS),
+        "debit": find(DEBIT_COLUMNS),
+        "credit": find(CREDIT_COLUMNS)
+    }
+    if detected["date"] is None:
+        raise StatementFormatError("Couldn't find a date column in the statement.")
+    if detected["amount"] is None and (detected["debit"] is None or detected["credit"] is None):
+        raise StatementFormatError("Couldn't find an amount column (or debit and credit columns) in the statement.")
+    return detected
+
+
+def _parse_amounts(values):
+    """Parse amount strings like "₹1,23,456.00", "(250.00)" or "250.00 Dr" into signed floats"""
+    text = values.fillna("").astype(str).str.strip()
+    negative = text.str.startswith("(") | text.str.upper().str.endswith("DR")
+    numbers = pd.to_numeric(text.str.replace(_AMOUNT_JUNK, "", regex=True), errors="coerce")
+    return numbers.where(~negative, -numbers.abs())
+
+
+def _parse_dates(values):
+    """Parse statement dates row by row: ISO dates year first, anything else day first
+
+    Each row is handled on its own, so a file mixing layouts (an ISO row
+    followed by 05/02/2024) keeps every row.
+    """
+    text = values.fillna("").astype(str).str.strip()
+    dates = pd.Series(pd.NaT, index=text.index, dtype="datetime64[ns]")
+
+    iso = pd.to_datetime(text.str[:10], format="%Y-%m-%d", errors="coerce")
+    dates[iso.notna()] = iso[iso.notna()]
+
+    pending = dates.isna() & (text != "")
+    for date_format in DAY_FIRST_FORMATS:
+        if not pending.any():
+            break
+        parsed = pd.to_datetime(text[pending], format=date_format, errors="coerce")
+        dates[parsed.index[parsed.notna()]] = parsed[parsed.notna()]
+        pending &= dates.isna()
+    if pending.any():
+        dates[pending] = pd.to_datetime(text[pending], dayfirst=True, format="mixed", errors="coerce")
+    return dates
+
+
+def _transaction_hashes(chunk, seen):
+    """Stable per-transaction hashes for deduplication
+
+    Identical transactions on the same day (two coffees) are told apart by
+    their occurrence number within the statement.
+    """
+    key = pd.DataFrame({
+        "date": chunk["date"].dt.strftime("%Y-%m-%d"),
+        "amount": chunk["amount"].round(2),
+        "description": chunk["description"].str.lower().str.replace(r"\s+", " ", regex=True)
+    })
+    base = pd.util.hash_pandas_object(key, index=False)
+
+    occurrence = base.groupby(base).cumcount() + base.map(seen).fillna(0).astype(np.int64)
+    for value, count in base.value_counts().items():
+        seen[value] = seen.get(value, 0) + int(count)
+
+    hashed = pd.util.hash_pandas_object(pd.DataFrame({"base": base, "occurrence": occurrence}), index=False)
+    return hashed.astype(np.uint64).to_numpy()
+
+
+def _to_records(frame):
+    """Convert a chunk into ledger entry dicts (with a category when the chunk has one)"""
+    records = [
+        {"name": description, "amount": abs(amount), "date": date.strftime("%Y-%m-%d"),
+         "txn_hash": int(txn_hash)}
+        for description, amount, date, txn_hash in zip(
+            frame["description"], frame["amount"].tolist(), frame["date"], frame["txn_hash"].tolist()
+        )
+    ]
+    if "category" in frame:
+        for record, category in zip(records, frame["category"]):
+            record["category"] = category
+    return records
+
+
+def _file_size(file):
+    try:
+        position = file.tell()
+        file.seek(0, io.SEEK_END)
+        size = file.tell()
+        file.seek(position)
+        return size
+    except (AttributeError, OSError):
+        return 0
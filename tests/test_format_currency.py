@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+from utils import format_currency, format_currency_many
+
+
+def _baseline_format_currency(amount):
+    """The original manual INR formatter (the path taken when en_IN isn't installed)"""
+    if amount >= 0:
+        is_negative = False
+    else:
+        is_negative = True
+        amount = abs(amount)
+    integer_part, decimal_part = f"{amount:.2f}".split(".")
+
+    if len(integer_part) <= 3:
+        result = integer_part
+    else:
+        result = integer_part[-3:]
+        remaining = integer_part[:-3]
+        while remaining:
+            group = remaining[-2:] if len(remaining) >= 2 else remaining
+            result = group + "," + result
+            remaining = remaining[:-len(group)]
+    result = f"{result}.{decimal_part}"
+    if is_negative:
+        result = "-" + result
+    return f"₹{result}"
+
+
+EDGE_AMOUNTS = [
+    0, 0.0, 0.001, -0.001, 0.005, 0.995, -0.995, 1, -1, 12.5, 99.999,
+    999, 999.995, 1000, -1000, 12345.678, 100000, 123456.78, -123456.78,
+    9999999.99, 10000000, 123456789012.34, -987654321098.76, 1e15, -1e15,
+]
+
+
+def _random_amounts():
+    rng = np.random.default_rng(0)
+    magnitudes = 10.0 ** rng.uniform(-3, 13, 5000)
+    signs = rng.choice([-1.0, 1.0], 5000)
+    return (magnitudes * signs).tolist() + rng.integers(-10**9, 10**9, 1000).astype(float).tolist()
+
+
+@pytest.mark.parametrize("amount", EDGE_AMOUNTS)
+def test_format_currency_matches_baseline_on_edge_cases(amount):
+    assert format_currency(amount) == _baseline_format_currency(amount)
+
+
+def test_format_currency_matches_baseline_on_random_amounts():
+    for amount in _random_amounts():
+        assert format_currency(amount) == _baseline_format_currency(amount), amount
+
+
+def test_format_currency_many_matches_scalar():
+    amounts = EDGE_AMOUNTS + _random_amounts()
+    assert format_currency_many(amounts) == [_baseline_format_currency(amount) for amount in amounts]
+
+
+def test_negative_zero_has_no_sign():
+    # The original printed ₹-0.00 for -0.0; both formatters drop the sign
+    assert format_currency(-0.0) == "₹0.00"
+    assert format_currency_many([-0.0]) == ["₹0.00"]
+
+
+def test_format_currency_many_handles_empty_and_non_finite():
+    assert format_currency_many([]) == []
+    assert format_currency_many([np.nan, np.inf, -np.inf, 5]) == [
+        format_currency(np.nan), format_currency(np.inf), format_currency(-np.inf), "₹5.00"
+    ]
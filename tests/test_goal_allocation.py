@@ -0,0 +1,77 @@
+from datetime import date, timedelta
+from itertools import combinations
+import numpy as np
+import pytest
+from goal_allocation import PRIORITY_WEIGHTS, _keep_exact, _keep_greedy, allocate_contributions
+from goal_projection import DAYS_PER_MONTH, GoalProjection
+
+
+def _fits(goals, durations, deadlines):
+    """Whether funding goals earliest deadline first meets every one of their deadlines"""
+    finished = np.cumsum(durations[goals])
+    return bool(np.all(finished <= deadlines[goals] + 1e-9))
+
+
+def _best_weight(durations, deadlines, weights):
+    """Highest total weight of goals that can all be kept on time, by trying every subset"""
+    by_deadline = np.argsort(deadlines, kind="stable")
+    best = 0.0
+    for size in range(1, len(by_deadline) + 1):
+        for goals in combinations(by_deadline, size):
+            goals = np.array(goals)
+            if _fits(goals, durations, deadlines):
+                best = max(best, weights[goals].sum())
+    return best
+
+
+def _random_goals(rng):
+    count = int(rng.integers(1, 9))
+    durations = rng.uniform(0.5, 12.0, count).round(rng.choice([0, 2]))
+    durations = np.maximum(durations, 0.5)
+    deadlines = rng.uniform(0.5, 30.0, count).round(rng.choice([0, 2]))
+    weights = rng.choice(list(PRIORITY_WEIGHTS.values()), count)
+    return durations, deadlines, weights
+
+
+@pytest.mark.parametrize("seed", range(300))
+def test_exact_solver_matches_brute_force(seed):
+    durations, deadlines, weights = _random_goals(np.random.default_rng(seed))
+    candidates = np.argsort(deadlines, kind="stable")
+
+    kept = np.array(sorted(_keep_exact(candidates, durations, deadlines, weights), key=lambda g: deadlines[g]), dtype=np.int64)
+
+    assert _fits(kept, durations, deadlines)
+    assert weights[kept].sum() == pytest.approx(_best_weight(durations, deadlines, weights))
+
+
+@pytest.mark.parametrize("seed", range(100))
+def test_greedy_solver_is_optimal_with_equal_priorities(seed):
+    durations, deadlines, _ = _random_goals(np.random.default_rng(seed))
+    weights = np.full(len(durations), PRIORITY_WEIGHTS["Medium"])
+    candidates = np.argsort(deadlines, kind="stable")
+
+    kept = _keep_greedy(candidates, durations, deadlines, weights)
+
+    assert _fits(np.array(kept, dtype=np.int64), durations, deadlines)
+    assert weights[kept].sum() == pytest.approx(_best_weight(durations, deadlines, weights))
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_exact_plan_keeps_the_most_valuable_goals_on_time(seed):
+    rng = np.random.default_rng(seed)
+    count = int(rng.integers(1, 8))
+    today = date(2026, 1, 1)
+    remaining = rng.integers(1, 60, count) * 1000.0
+    target_dates = [today + timedelta(days=int(days)) for days in rng.integers(20, 900, count)]
+    priorities = list(rng.choice(list(PRIORITY_WEIGHTS), count))
+    projection = GoalProjection(
+        [f"Goal {i}" for i in range(count)], remaining, np.zeros(count), target_dates, today=today
+    )
+    surplus = 5000.0
+
+    plan = allocate_contributions(projection, surplus, priorities, method="exact")
+
+    weights = np.array([PRIORITY_WEIGHTS[p] for p in priorities])
+    durations = projection.remaining / surplus
+    deadlines = projection.days_remaining / DAYS_PER_MONTH
+    assert weights[plan.on_time].sum() == pytest.approx(_best_weight(durations, deadlines, weights))
@@ -0,0 +1,67 @@
+import pytest
+from streamlit.testing.v1 import AppTest
+import user_store
+from user_store import UserStore, session_token, user_id_from_token
+
+
+def _session_script():
+    import streamlit as st
+    from user_store import get_user_id
+    st.write(get_user_id())
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = UserStore(str(tmp_path / "store.sqlite3"))
+    monkeypatch.setattr(user_store, "_user_store", store)
+    return store
+
+
+def _open(sid=None):
+    at = AppTest.from_function(_session_script)
+    if sid is not None:
+        at.query_params[user_store.SESSION_QUERY_PARAM] = sid
+    at.run()
+    assert not at.exception
+    return at.session_state.user_id, at.query_params[user_store.SESSION_QUERY_PARAM][0]
+
+
+def _user_with_data(store):
+    user_id, token = _open()
+    store.save_state(user_id, {"user_progress": "0.5"})
+    return user_id, token
+
+
+def test_signed_token_resumes_the_same_user(store):
+    user_id, token = _user_with_data(store)
+    assert user_id_from_token(token) == user_id
+    assert _open(token) == (user_id, token)
+
+
+@pytest.mark.parametrize("tamper", [
+    lambda token: token.rpartition(".")[0],
+    lambda token: token[:-1] + ("0" if token[-1] != "0" else "1"),
+    lambda token: "0" * 32 + "." + token.rpartition(".")[2],
+    lambda token: "alice",
+], ids=["signature stripped", "signature edited", "another id", "made-up id"])
+def test_forged_token_gets_a_new_empty_session(store, tamper):
+    user_id, token = _user_with_data(store)
+    new_id, new_token = _open(tamper(token))
+    assert new_id != user_id
+    assert new_token == session_token(new_id)
+    assert store.load_state(new_id, "user_progress") is None
+
+
+def test_unsigned_legacy_id_is_upgraded_once(store):
+    legacy_id = "ab" * 16
+    store.save_state(legacy_id, {"user_progress": "0.5"})
+
+    user_id, token = _open(legacy_id)
+    assert user_id == legacy_id and token == session_token(legacy_id)
+    # The bare link stops working once it has been upgraded
+    assert _open(legacy_id)[0] != legacy_id
+    assert _open(token)[0] == legacy_id
+
+
+def test_unsigned_id_without_data_gets_a_new_session(store):
+    assert _open("cd" * 16)[0] != "cd" * 16
@@ -0,0 +1,55 @@
+import io
+import pytest
+from budget_ledger import BudgetLedger
+from statement_import import StatementFormatError, import_statement
+
+
+def _import(csv_text):
+    ledger = BudgetLedger()
+    stats = import_statement(io.BytesIO(csv_text.encode()), ledger)
+    return ledger, stats
+
+
+def _dates(entries):
+    return [entry["date"] for entry in entries]
+
+
+def test_iso_dates_are_read_year_first():
+    ledger, stats = _import(
+        "Date,Description,Amount\n"
+        "2024-01-05,Coffee,-4.50\n"
+        "2024-01-31,Rent,-900\n"
+        "2024-01-31T09:30:00,Salary,2500\n"
+    )
+    assert stats["skipped"] == 0
+    assert _dates(ledger.expenses) == ["2024-01-05", "2024-01-31"]
+    assert _dates(ledger.income) == ["2024-01-31"]
+
+
+def test_slash_dates_are_read_day_first():
+    ledger, stats = _import(
+        "Date,Description,Amount\n"
+        "05/02/2024,Coffee,-4.50\n"
+        "31/01/2024,Rent,-900\n"
+    )
+    assert stats["skipped"] == 0
+    assert _dates(ledger.expenses) == ["2024-02-05", "2024-01-31"]
+
+
+def test_mixed_date_layouts_keep_every_row():
+    ledger, stats = _import(
+        "Date,Description,Amount\n"
+        "2024-01-05,Coffee,-4.50\n"
+        "05/02/2024,Groceries,-60\n"
+        "31-01-2024,Rent,-900\n"
+        "5 Feb 2024,Books,-20\n"
+        "not a date,Mystery,-1\n"
+    )
+    assert stats["skipped"] == 1
+    assert _dates(ledger.expenses) == ["2024-01-05", "2024-02-05", "2024-01-31", "2024-02-05"]
+
+
+@pytest.mark.parametrize("csv_text", ["", "\n\n"])
+def test_empty_file_is_a_format_error(csv_text):
+    with pytest.raises(StatementFormatError):
+        _import(csv_text)
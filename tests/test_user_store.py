@@ -0,0 +1,83 @@
+from budget_ledger import BudgetLedger
+from goal_ledger import SavingsGoalLedger, SNAPSHOT_EVERY
+from user_store import UserStore
+
+
+def _budget_session(store, user_id):
+    ledger = BudgetLedger(*store.load_budget(user_id))
+    ledger.drain_changes()
+    return ledger
+
+
+def _goal_session(store, user_id):
+    ledger = SavingsGoalLedger(*store.load_goals(user_id))
+    ledger.drain_changes()
+    return ledger
+
+
+def test_new_entries_from_two_sessions_are_all_kept(tmp_path):
+    store = UserStore(str(tmp_path / "store.sqlite3"))
+    first, second = _budget_session(store, "u1"), _budget_session(store, "u1")
+    first.add_expense("Rent", "Housing", 900.0)
+    second.add_expense("Coffee", "Food", 4.5)
+
+    assert store.save_budget_changes("u1", first.drain_changes()) is False
+    assert store.save_budget_changes("u1", second.drain_changes()) is True
+
+    income, expenses = store.load_budget("u1")
+    assert sorted(entry["name"] for entry in expenses) == ["Coffee", "Rent"]
+    assert len({entry["id"] for entry in expenses}) == 2
+
+
+def test_edits_and_deletes_keep_other_sessions_rows(tmp_path):
+    store = UserStore(str(tmp_path / "store.sqlite3"))
+    ledger = BudgetLedger()
+    rent = ledger.add_expense("Rent", "Housing", 900.0)
+    store.save_budget_changes("u1", ledger.drain_changes())
+
+    first, second = _budget_session(store, "u1"), _budget_session(store, "u1")
+    first.remove_expense(rent)
+    store.save_budget_changes("u1", first.drain_changes())
+    # An edit to an entry deleted elsewhere doesn't bring it back
+    second.update_expense(rent, amount=950.0)
+    assert store.save_budget_changes("u1", second.drain_changes()) is False
+    assert store.load_budget("u1") == ([], [])
+
+
+def test_entry_added_and_removed_before_saving_is_not_written(tmp_path):
+    store = UserStore(str(tmp_path / "store.sqlite3"))
+    ledger = BudgetLedger()
+    entry_id = ledger.add_income("Gift", 50.0)
+    ledger.remove_income(entry_id)
+    assert ledger.drain_changes() == []
+
+
+def test_contributions_from_two_sessions_are_all_kept(tmp_path):
+    store = UserStore(str(tmp_path / "store.sqlite3"))
+    ledger = SavingsGoalLedger()
+    goal_id = ledger.add_goal("Bike", 1000.0, "2027-01-01", initial_amount=100.0)
+    store.save_goal_changes("u1", *ledger.drain_changes())
+
+    first, second = _goal_session(store, "u1"), _goal_session(store, "u1")
+    for _ in range(SNAPSHOT_EVERY):
+        first.contribute(goal_id, 10.0)
+    second.contribute(goal_id, 5.0)
+    assert store.save_goal_changes("u1", *first.drain_changes()) is False
+    assert store.save_goal_changes("u1", *second.drain_changes()) is True
+
+    reloaded = _goal_session(store, "u1")
+    assert reloaded.get_goal(goal_id)["current_amount"] == 100.0 + SNAPSHOT_EVERY * 10.0 + 5.0
+    assert len(store.load_goal_history("u1", goal_id)) == SNAPSHOT_EVERY + 2
+
+
+def test_new_goals_from_two_sessions_are_all_kept(tmp_path):
+    store = UserStore(str(tmp_path / "store.sqlite3"))
+    first, second = _goal_session(store, "u1"), _goal_session(store, "u1")
+    first.add_goal("Bike", 1000.0, "2027-01-01", initial_amount=100.0)
+    second.add_goal("Trip", 500.0, "2027-06-01", initial_amount=50.0)
+
+    assert store.save_goal_changes("u1", *first.drain_changes()) is False
+    assert store.save_goal_changes("u1", *second.drain_changes()) is True
+
+    goals = {goal["name"]: goal["current_amount"] for goal in _goal_session(store, "u1").goals}
+    assert goals == {"Bike": 100.0, "Trip": 50.0}
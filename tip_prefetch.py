@@ -0,0 +1,102 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from utils import submit_llm_response
+
+# Background threads generating tips, shared by every session in the process
+TIP_WORKERS = 4
+# Tips are regenerated each time a goal's progress moves into a new band
+PROGRESS_BUCKET_PCT = 10
+# Ready tips kept in memory; the least recently used are dropped first
+MAX_PREFETCHED_TIPS = 2000
+# After a failed request, wait this long before trying the same goal again
+PREFETCH_RETRY_SECONDS = 60
+
+
+class TipPrefetcher:
+    """Generates saving tips for goals on a background thread pool.
+
+    Tips are stored per (user id, goal id, progress bucket), so they are
+    generated once when a goal is created and again whenever its progress
+    moves into a new bucket, and the page can show them without waiting on
+    the model. Requests already queued or in flight are not submitted
+    twice, and failed ones are retried after PREFETCH_RETRY_SECONDS.
+    """
+
+    def __init__(self, workers=TIP_WORKERS, max_entries=MAX_PREFETCHED_TIPS):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="finbuddy-tips")
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+        self._tips = OrderedDict()  # key -> tips
+        self._pending = set()
+        self._failed = {}           # key -> time of the last failure
+
+    def prefetch(self, key, prompt):
+        """Start generating tips for key in the background unless they're ready or on their way
+
+        Must be called from the script thread (it reads the API key from session state).
+        """
+        with self._lock:
+            if key in self._tips or key in self._pending:
+                return
+            failed_at = self._failed.get(key)
+            if failed_at is not None and time.monotonic() - failed_at < PREFETCH_RETRY_SECONDS:
+                return
+            self._pending.add(key)
+
+        future = submit_llm_response(self._executor, prompt)
+        if future is None:
+            # No API key; the page falls back to static tips
+            with self._lock:
+                self._pending.discard(key)
+            return
+        future.add_done_callback(lambda done: self._finish(key, done))
+
+    def get(self, key):
+        """Return ready tips for key, or None"""
+        with self._lock:
+            tips = self._tips.get(key)
+            if tips is not None:
+                self._tips.move_to_end(key)
+            return tips
+
+    def put(self, key, tips):
+        """Store tips generated elsewhere (e.g. by a live call after a miss)"""
+        with self._lock:
+            self._store(key, tips)
+
+    def _finish(self, key, future):
+        with self._lock:
+            self._pending.discard(key)
+            try:
+                self._store(key, future.result())
+            except Exception as e:
+                print(f"Tip prefetch failed: {str(e) or type(e).__name__}")
+                self._failed[key] = time.monotonic()
+
+    def _store(self, key, tips):
+        self._tips[key] = tips
+        self._tips.move_to_end(key)
+        self._failed.pop(key, None)
+        while len(self._tips) > self._max_entries:
+            self._tips.popitem(last=False)
+
+
+def progress_bucket(progress_pct):
+    """Band of a goal's progress that its tips were written for"""
+    return int(progress_pct // PROGRESS_BUCKET_PCT)
+
+
+_tip_prefetcher = None
+_tip_prefetcher_lock = threading.Lock()
+
+
+def get_tip_prefetcher():
+    """Get the process-wide tip prefetcher, creating it on first use"""
+    global _tip_prefetcher
+    if _tip_prefetcher is None:
+        with _tip_prefetcher_lock:
+            if _tip_prefetcher is None:
+                _tip_prefetcher = TipPrefetcher()
+    return _tip_prefetcher
@@ -0,0 +1,608 @@
+"""
+Durable storage for per-user FinBuddy data.
+
+Budget entries and savings goals live in typed SQLite tables (goal
+contributions as an append-only event log) and the smaller per-user values
+(investment progress, badges, level progress) are stored as JSON documents.
+Streamlit pages load what they need lazily, and changes are written once per
+script run in a single transaction.
+
+Export everything to Parquet for analytics:
+
+    python user_store.py --export analytics/
+"""
+import argparse
+import copy
+import hashlib
+import hmac
+import json
+import os
+import re
+import secrets
+import sqlite3
+import threading
+import uuid
+
+import pandas as pd
+import streamlit as st
+
+# Where user data lives (one file shared by every worker on the machine)
+DEFAULT_STORE_PATH = os.environ.get("FINBUDDY_STORE_PATH", os.path.join("data", "finbuddy.sqlite3"))
+# Query parameter that identifies a returning user across reconnects and restarts.
+# It holds a signed token that is the only key to the user's data, so the link
+# must be kept private.
+SESSION_QUERY_PARAM = "sid"
+# Key that session tokens are signed with; when unset, a random key is kept in the store
+SESSION_SECRET = os.environ.get("FINBUDDY_SESSION_SECRET", "")
+# Unsigned ids handed out before tokens were signed (see UserStore.claim_unsigned_session)
+_UNSIGNED_USER_ID = re.compile(r"[0-9a-f]{32}")
+
+# Per-user values persisted as JSON, with the defaults new users start from
+PERSISTED_STATE_DEFAULTS = {
+    "investment_progress": {
+        "lessons_completed": 0,
+        "quizzes_taken": 0,
+        "score": 0
+    },
+    "user_badges": [],
+    "user_progress": 0.1,  # Starting progress (0.0 to 1.0)
+    "category_rules": {},  # Merchant -> category corrections (see expense_categorizer)
+    "advice_cache": {}     # Saved AI advice and the numbers it was based on (see utils.get_cached_advice)
+}
+
+# Budget entry fields that get their own column; anything else goes in "extra"
+BUDGET_COLUMNS = ["name", "category", "amount", "date", "txn_hash"]
+
+# Statements are kept as constants so sqlite3 reuses its prepared statements
+_SELECT_BUDGET = (
+    "SELECT kind, entry_id, name, category, amount, date, txn_hash, extra "
+    "FROM budget_entries WHERE user_id = ? ORDER BY entry_id"
+)
+_INSERT_BUDGET = (
+    "INSERT INTO budget_entries "
+    "(user_id, kind, entry_id, name, category, amount, date, txn_hash, extra) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+_UPDATE_BUDGET = (
+    "UPDATE budget_entries SET name = ?, category = ?, amount = ?, date = ?, txn_hash = ?, extra = ? "
+    "WHERE user_id = ? AND kind = ? AND entry_id = ?"
+)
+# Entry ids are shared by income and expenses, so both kinds count as taken
+_SELECT_BUDGET_IDS_FROM = "SELECT entry_id FROM budget_entries WHERE user_id = ? AND entry_id >= ?"
+_DELETE_BUDGET = "DELETE FROM budget_entries WHERE user_id = ? AND kind = ? AND entry_id = ?"
+_SELECT_STATE = "SELECT value FROM user_state WHERE user_id = ? AND key = ?"
+_UPSERT_STATE = "INSERT OR REPLACE INTO user_state (user_id, key, value) VALUES (?, ?, ?)"
+_DELETE_STATE = "DELETE FROM user_state WHERE user_id = ? AND key = ?"
+
+# Savings goal fields that get their own column; anything else goes in "extra"
+GOAL_COLUMNS = ["name", "target_amount", "target_date"]
+
+_SELECT_GOALS = (
+    "SELECT goal_id, name, target_amount, target_date, snapshot_seq, snapshot_balance, extra "
+    "FROM savings_goals WHERE user_id = ? AND deleted = 0 ORDER BY goal_id"
+)
+# Only the events after each goal's snapshot are needed to rebuild balances
+_SELECT_GOAL_TAILS = (
+    "SELECT e.goal_id, e.seq, e.amount FROM goal_events e "
+    "JOIN savings_goals g ON g.user_id = e.user_id AND g.goal_id = e.goal_id "
+    "WHERE e.user_id = ? AND g.deleted = 0 AND e.seq > g.snapshot_seq ORDER BY e.goal_id, e.seq"
+)
+_SELECT_LAST_GOAL_ID = "SELECT COALESCE(MAX(goal_id), 0) FROM savings_goals WHERE user_id = ?"
+_INSERT_GOAL = (
+    "INSERT INTO savings_goals "
+    "(user_id, goal_id, name, target_amount, target_date, deleted, snapshot_seq, snapshot_balance, extra) "
+    "VALUES (?, ?, ?, ?, ?, 0, ?, ?, ?)"
+)
+_UPDATE_GOAL = (
+    "UPDATE savings_goals SET name = ?, target_amount = ?, target_date = ?, extra = ? "
+    "WHERE user_id = ? AND goal_id = ? AND deleted = 0"
+)
+# A snapshot never moves back to an older sequence number
+_UPDATE_GOAL_SNAPSHOT = (
+    "UPDATE savings_goals SET snapshot_seq = ?, snapshot_balance = ? "
+    "WHERE user_id = ? AND goal_id = ? AND snapshot_seq < ?"
+)
+_SELECT_GOAL_IDS_FROM = "SELECT goal_id FROM savings_goals WHERE user_id = ? AND goal_id >= ?"
+_SELECT_LAST_GOAL_SEQ = "SELECT COALESCE(MAX(seq), 0) FROM goal_events WHERE user_id = ? AND goal_id = ?"
+_DELETE_GOAL = "UPDATE savings_goals SET deleted = 1 WHERE user_id = ? AND goal_id = ?"
+_INSERT_GOAL_EVENT = (
+    "INSERT INTO goal_events (user_id, goal_id, seq, kind, amount, created_at) VALUES (?, ?, ?, ?, ?, ?)"
+)
+_SELECT_GOAL_EVENTS = (
+    "SELECT seq, kind, amount, created_at FROM goal_events WHERE user_id = ? AND goal_id = ? ORDER BY seq"
+)
+
+_INSERT_SIGNED_SESSION = "INSERT OR IGNORE INTO signed_sessions (user_id) VALUES (?)"
+_SELECT_SIGNED_SESSION = "SELECT 1 FROM signed_sessions WHERE user_id = ?"
+_SELECT_HAS_DATA = (
+    "SELECT 1 FROM budget_entries WHERE user_id = ? "
+    "UNION ALL SELECT 1 FROM savings_goals WHERE user_id = ? "
+    "UNION ALL SELECT 1 FROM user_state WHERE user_id = ? LIMIT 1"
+)
+
+# SQLite integers are signed 64-bit; transaction hashes are unsigned
+_UINT64_OFFSET = 1 << 64
+_INT64_MAX = (1 << 63) - 1
+
+
+class UserStore:
+    """SQLite (WAL mode) store for budget entries, savings goals and per-user state.
+
+    Writes go through executemany inside one transaction, so saving a
+    100k-row statement import costs a single commit.
+
+    Entry, goal and contribution ids are handed out by each session's
+    ledger, so two tabs (or workers) resuming the same user can pick the
+    same id. New rows are never written over existing ones: saving checks
+    which ids are already taken inside the write transaction, stores
+    clashing rows under fresh ids and reports it, so the session can reload
+    its ledger with the other session's changes included.
+    """
+
+    def __init__(self, db_path=DEFAULT_STORE_PATH):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._db = self._open_db(db_path)
+
+    def _open_db(self, db_path):
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        db = sqlite3.connect(db_path, check_same_thread=False, cached_statements=32)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        db.execute("""
+            CREATE TABLE IF NOT EXISTS budget_entries (
+                user_id TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                entry_id INTEGER NOT NULL,
+                name TEXT,
+                category TEXT,
+                amount REAL NOT NULL,
+                date TEXT,
+                txn_hash INTEGER,
+                extra TEXT,
+                PRIMARY KEY (user_id, kind, entry_id)
+            )
+        """)
+        db.execute("""
+            CREATE TABLE IF NOT EXISTS savings_goals (
+                user_id TEXT NOT NULL,
+                goal_id INTEGER NOT NULL,
+                name TEXT NOT NULL,
+                target_amount REAL NOT NULL,
+                target_date TEXT NOT NULL,
+                deleted INTEGER NOT NULL DEFAULT 0,
+                snapshot_seq INTEGER NOT NULL DEFAULT 0,
+                snapshot_balance REAL NOT NULL DEFAULT 0,
+                extra TEXT,
+                PRIMARY KEY (user_id, goal_id)
+            )
+        """)
+        db.execute("""
+            CREATE TABLE IF NOT EXISTS goal_events (
+                user_id TEXT NOT NULL,
+                goal_id INTEGER NOT NULL,
+                seq INTEGER NOT NULL,
+                kind TEXT NOT NULL,
+                amount REAL NOT NULL,
+                created_at TEXT NOT NULL,
+                PRIMARY KEY (user_id, goal_id, seq)
+            )
+        """)
+        db.execute("""
+            CREATE TABLE IF NOT EXISTS user_state (
+                user_id TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value TEXT NOT NULL,
+                PRIMARY KEY (user_id, key)
+            )
+        """)
+        db.execute("""
+            CREATE TABLE IF NOT EXISTS signed_sessions (
+                user_id TEXT PRIMARY KEY
+            )
+        """)
+        db.execute("""
+            CREATE TABLE IF NOT EXISTS store_settings (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            )
+        """)
+        db.commit()
+        return db
+
+    def session_secret(self):
+        """Return the key session tokens are signed with, creating it on first use
+
+        Every worker sharing the store file reads the same key, so a token
+        issued by one worker is accepted by all of them.
+        """
+        with self._lock:
+            self._db.execute("INSERT OR IGNORE INTO store_settings (key, value) VALUES ('session_secret', ?)",
+                             (secrets.token_hex(32),))
+            self._db.commit()
+            return self._db.execute("SELECT value FROM store_settings WHERE key = 'session_secret'").fetchone()[0]
+
+    def mark_session_signed(self, user_id):
+        """Note that a signed token was issued for a user, so their bare id no longer opens their data"""
+        with self._lock, self._db:
+            self._db.execute(_INSERT_SIGNED_SESSION, (user_id,))
+
+    def claim_unsigned_session(self, user_id):
+        """Accept a bare id from a link issued before tokens were signed, once
+
+        Only ids that already have stored data and have never been given a
+        signed token qualify. The id is marked as signed in the same
+        transaction, so the bare link stops working once it is upgraded.
+
+        Returns:
+            bool: True when the id may be used and upgraded to a signed token
+        """
+        with self._lock, self._db:
+            self._db.execute("BEGIN IMMEDIATE")
+            if self._db.execute(_SELECT_SIGNED_SESSION, (user_id,)).fetchone() is not None:
+                return False
+            if self._db.execute(_SELECT_HAS_DATA, (user_id,) * 3).fetchone() is None:
+                return False
+            self._db.execute(_INSERT_SIGNED_SESSION, (user_id,))
+            return True
+
+    def load_budget(self, user_id):
+        """Return (income entries, expense entries) for a user"""
+        with self._lock:
+            rows = self._db.execute(_SELECT_BUDGET, (user_id,)).fetchall()
+
+        income, expenses = [], []
+        for kind, entry_id, name, category, amount, date, txn_hash, extra in rows:
+            entry = {"name": name, "amount": amount}
+            if kind == "expenses":
+                entry["category"] = category
+            if date is not None:
+                entry["date"] = date
+            if txn_hash is not None:
+                entry["txn_hash"] = txn_hash + _UINT64_OFFSET if txn_hash < 0 else txn_hash
+            if extra:
+                entry.update(json.loads(extra))
+            entry["id"] = entry_id
+            (income if kind == "income" else expenses).append(entry)
+        return income, expenses
+
+    def save_budget_changes(self, user_id, changes):
+        """Apply ledger changes in one transaction
+
+        Args:
+            user_id (str): Owner of the entries
+            changes (list): (kind, entry id, entry dict or None for a delete,
+                is_new) tuples as returned by BudgetLedger.drain_changes
+
+        Returns:
+            bool: True when another session had already used some of the new
+                entries' ids; those entries were stored under fresh ids, so the
+                ledger no longer matches the store and should be reloaded
+        """
+        inserts, updates, deletes = [], [], []
+        for kind, entry_id, entry, is_new in changes:
+            if entry is None:
+                deletes.append((user_id, kind, entry_id))
+                continue
+            txn_hash = entry.get("txn_hash")
+            if txn_hash is not None and txn_hash > _INT64_MAX:
+                txn_hash -= _UINT64_OFFSET
+            extra = {k: v for k, v in entry.items() if k not in BUDGET_COLUMNS and k != "id"}
+            fields = (entry.get("name"), entry.get("category"), entry["amount"], entry.get("date"), txn_hash,
+                      json.dumps(extra) if extra else None)
+            if is_new:
+                inserts.append((kind, entry_id, fields))
+            else:
+                updates.append((*fields, user_id, kind, entry_id))
+
+        with self._lock, self._db:
+            # Take the write lock before looking for taken ids, so no other worker can take them meanwhile
+            self._db.execute("BEGIN IMMEDIATE")
+            reassigned = False
+            if inserts:
+                requested = [entry_id for _, entry_id, _ in inserts]
+                taken = {row[0] for row in self._db.execute(_SELECT_BUDGET_IDS_FROM, (user_id, min(requested)))}
+                ids = _free_ids(requested, taken)
+                reassigned = ids != requested
+                self._db.executemany(_INSERT_BUDGET, [
+                    (user_id, kind, entry_id, *fields) for (kind, _, fields), entry_id in zip(inserts, ids)
+                ])
+            if updates:
+                self._db.executemany(_UPDATE_BUDGET, updates)
+            if deletes:
+                self._db.executemany(_DELETE_BUDGET, deletes)
+        return reassigned
+
+    def load_goals(self, user_id):
+        """Return a user's active goals, the events after their snapshots and the highest goal id
+
+        Returns:
+            tuple: (goal dicts with snapshot_seq and snapshot_balance,
+                (goal id, seq, amount) tuples, highest goal id ever used)
+        """
+        with self._lock:
+            rows = self._db.execute(_SELECT_GOALS, (user_id,)).fetchall()
+            events = self._db.execute(_SELECT_GOAL_TAILS, (user_id,)).fetchall()
+            last_goal_id = self._db.execute(_SELECT_LAST_GOAL_ID, (user_id,)).fetchone()[0]
+
+        goals = []
+        for goal_id, name, target_amount, target_date, snapshot_seq, snapshot_balance, extra in rows:
+            goal = {"name": name, "target_amount": target_amount, "target_date": target_date}
+            if extra:
+                goal.update(json.loads(extra))
+            goal.update(id=goal_id, snapshot_seq=snapshot_seq, snapshot_balance=snapshot_balance)
+            goals.append(goal)
+        return goals, events, last_goal_id
+
+    def save_goal_changes(self, user_id, goals, events):
+        """Apply goal ledger changes in one transaction
+
+        Args:
+            user_id (str): Owner of the goals
+            goals (list): (goal id, goal dict or None for a delete, snapshot seq,
+                snapshot balance, is_new) tuples
+            events (list): New (goal id, seq, kind, amount, created_at) tuples
+
+        Returns:
+            bool: True when another session had already used some of the new
+                goal ids or contribution sequence numbers; those rows were
+                stored under fresh ids, so the ledger should be reloaded
+        """
+        new_goals, updates, deletes = [], [], []
+        for goal_id, goal, snapshot_seq, snapshot_balance, is_new in goals:
+            if goal is None:
+                deletes.append((user_id, goal_id))
+                continue
+            extra = {k: v for k, v in goal.items() if k not in GOAL_COLUMNS and k not in ("id", "current_amount")}
+            fields = (goal["name"], goal["target_amount"], goal["target_date"], json.dumps(extra) if extra else None)
+            (new_goals if is_new else updates).append((goal_id, fields, snapshot_seq, snapshot_balance))
+
+        with self._lock, self._db:
+            # Take the write lock before looking for taken ids, so no other worker can take them meanwhile
+            self._db.execute("BEGIN IMMEDIATE")
+            goal_ids = {}
+            if new_goals:
+                requested = [goal_id for goal_id, *_ in new_goals]
+                taken = {row[0] for row in self._db.execute(_SELECT_GOAL_IDS_FROM, (user_id, min(requested)))}
+                goal_ids = dict(zip(requested, _free_ids(requested, taken)))
+            reassigned = any(old != new for old, new in goal_ids.items())
+
+            # Contributions to stored goals continue after the last stored sequence number
+            events_by_goal = {}
+            for goal_id, *event in events:
+                events_by_goal.setdefault(goal_ids.get(goal_id, goal_id), []).append(event)
+            stale_snapshots = set()
+            rows = []
+            for goal_id, goal_events in events_by_goal.items():
+                if goal_id not in goal_ids.values():
+                    last_seq = self._db.execute(_SELECT_LAST_GOAL_SEQ, (user_id, goal_id)).fetchone()[0]
+                    if goal_events[0][0] <= last_seq:
+                        # Our balance missed the other session's contributions
+                        goal_events = [(last_seq + i, *event[1:]) for i, event in enumerate(goal_events, 1)]
+                        stale_snapshots.add(goal_id)
+                rows.extend((user_id, goal_id, *event) for event in goal_events)
+            reassigned = reassigned or bool(stale_snapshots)
+
+            if new_goals:
+                self._db.executemany(_INSERT_GOAL, [
+                    (user_id, goal_ids[goal_id], fields[0], fields[1], fields[2], snapshot_seq, snapshot_balance,
+                     fields[3])
+                    for goal_id, fields, snapshot_seq, snapshot_balance in new_goals
+                ])
+            if updates:
+                self._db.executemany(_UPDATE_GOAL, [(*fields, user_id, goal_id) for goal_id, fields, _, _ in updates])
+                self._db.executemany(_UPDATE_GOAL_SNAPSHOT, [
+                    (snapshot_seq, snapshot_balance, user_id, goal_id, snapshot_seq)
+                    for goal_id, _, snapshot_seq, snapshot_balance in updates if goal_id not in stale_snapshots
+                ])
+            if deletes:
+                self._db.executemany(_DELETE_GOAL, deletes)
+            if rows:
+                self._db.executemany(_INSERT_GOAL_EVENT, rows)
+        return reassigned
+
+    def load_goal_history(self, user_id, goal_id):
+        """Return every contribution to a goal as a DataFrame (seq, kind, amount, created_at)"""
+        with self._lock:
+            return pd.read_sql_query(_SELECT_GOAL_EVENTS, self._db, params=(user_id, goal_id))
+
+    def load_state(self, user_id, key):
+        """Return a stored value, or None if the user has never saved it"""
+        with self._lock:
+            row = self._db.execute(_SELECT_STATE, (user_id, key)).fetchone()
+        return json.loads(row[0]) if row is not None else None
+
+    def save_state(self, user_id, values):
+        """Store several JSON-serialized values in one transaction
+
+        Args:
+            user_id (str): Owner of the values
+            values (dict): key -> JSON string
+        """
+        with self._lock, self._db:
+            self._db.executemany(_UPSERT_STATE, [(user_id, key, value) for key, value in values.items()])
+
+    def delete_state(self, user_id, key):
+        with self._lock, self._db:
+            self._db.execute(_DELETE_STATE, (user_id, key))
+
+    def export_parquet(self, directory, user_id=None):
+        """Write budget entries, savings goals and per-user state to Parquet files
+
+        Returns:
+            list: Paths of the files written
+        """
+        os.makedirs(directory, exist_ok=True)
+        where, params = ("WHERE user_id = ?", (user_id,)) if user_id else ("", ())
+        with self._lock:
+            # Hashes are read as text; pandas would turn a nullable integer column into floats
+            entries = pd.read_sql_query(
+                "SELECT user_id, kind, entry_id, name, category, amount, date, "
+                f"CAST(txn_hash AS TEXT) AS txn_hash, extra FROM budget_entries {where}",
+                self._db, params=params
+            )
+            goals = pd.read_sql_query(f"SELECT * FROM savings_goals {where}", self._db, params=params)
+            goal_events = pd.read_sql_query(f"SELECT * FROM goal_events {where}", self._db, params=params)
+            state = pd.read_sql_query(f"SELECT * FROM user_state {where}", self._db, params=params)
+
+        entries["txn_hash"] = pd.array(
+            [None if h is None else int(h) % _UINT64_OFFSET for h in entries["txn_hash"]], dtype="UInt64"
+        )
+        tables = {"budget_entries": entries, "savings_goals": goals, "goal_events": goal_events}
+        for key in PERSISTED_STATE_DEFAULTS:
+            rows = state[state["key"] == key]
+            records = []
+            for owner, value in zip(rows["user_id"], rows["value"]):
+                value = json.loads(value)
+                if PERSISTED_STATE_DEFAULTS[key] == {}:
+                    # Free-form mappings become one row per key
+                    items = [{"key": k, "value": v} for k, v in value.items()]
+                elif isinstance(value, list):
+                    items = value
+                else:
+                    items = [value if isinstance(value, dict) else {key: value}]
+                records.extend({"user_id": owner, **item} for item in items)
+            tables[key] = pd.DataFrame(records)
+
+        paths = []
+        for name, frame in tables.items():
+            path = os.path.join(directory, f"{name}.parquet")
+            frame.to_parquet(path, index=False)
+            paths.append(path)
+        return paths
+
+
+_user_store = None
+_user_store_lock = threading.Lock()
+
+
+def _free_ids(requested, taken):
+    """Keep the requested ids that are free and move the rest past every id in use"""
+    next_free = max(max(requested), max(taken, default=0)) + 1
+    ids = []
+    for entry_id in requested:
+        if entry_id in taken:
+            entry_id, next_free = next_free, next_free + 1
+        ids.append(entry_id)
+    return ids
+
+
+def get_user_store():
+    """Get the process-wide user store, creating it on first use"""
+    global _user_store
+    if _user_store is None:
+        with _user_store_lock:
+            if _user_store is None:
+                _user_store = UserStore()
+    return _user_store
+
+
+def get_user_id():
+    """Get the id that ties this browser session to its stored data
+
+    The id is kept in the page URL as a signed token, so reloading the page or
+    reconnecting to another worker resumes the same data. Tokens that weren't
+    issued by this store (a made-up, edited or unsigned sid) start a new,
+    empty session; the one exception is a bare id from before tokens were
+    signed, which is upgraded once (see UserStore.claim_unsigned_session).
+    Anyone holding the link can open the data, so it must not be shared.
+    """
+    if "user_id" not in st.session_state:
+        store = get_user_store()
+        token = st.query_params.get(SESSION_QUERY_PARAM, "")
+        user_id = user_id_from_token(token)
+        if user_id is None and _UNSIGNED_USER_ID.fullmatch(token) and store.claim_unsigned_session(token):
+            user_id = token
+        if user_id is None:
+            user_id = uuid.uuid4().hex
+        store.mark_session_signed(user_id)
+        if token != session_token(user_id):
+            st.query_params[SESSION_QUERY_PARAM] = session_token(user_id)
+        st.session_state.user_id = user_id
+        st.session_state.persisted_snapshots = {}
+    return st.session_state.user_id
+
+
+def session_token(user_id):
+    """Signed token for a user id, as kept in the page URL"""
+    return f"{user_id}.{_token_signature(user_id)}"
+
+
+def user_id_from_token(token):
+    """Return the user id of a token issued by session_token, or None"""
+    user_id, _, signature = token.rpartition(".")
+    if user_id and hmac.compare_digest(signature, _token_signature(user_id)):
+        return user_id
+    return None
+
+
+def _token_signature(user_id):
+    key = SESSION_SECRET or get_user_store().session_secret()
+    return hmac.new(key.encode(), user_id.encode(), hashlib.sha256).hexdigest()[:32]
+
+
+def load_session_value(key):
+    """Get a persisted value into session state on first use and return it"""
+    if key not in st.session_state:
+        value = get_user_store().load_state(get_user_id(), key)
+        if value is None:
+            value = copy.deepcopy(PERSISTED_STATE_DEFAULTS[key])
+            snapshot = None
+        else:
+            snapshot = json.dumps(value)
+        st.session_state[key] = value
+        st.session_state.persisted_snapshots[key] = snapshot
+    return st.session_state[key]
+
+
+def save_session():
+    """Write everything that changed during this script run to the store
+
+    Called once at the end of every run. Values are compared against what
+    was last loaded or saved, and budget and goal changes come from the
+    ledgers' own change logs, so a run that changes nothing doesn't touch the database.
+    """
+    if "user_id" not in st.session_state:
+        return
+    user_id = st.session_state.user_id
+    store = get_user_store()
+
+    snapshots = st.session_state.persisted_snapshots
+    changed = {}
+    for key, snapshot in snapshots.items():
+        serialized = json.dumps(st.session_state[key])
+        if serialized != snapshot:
+            changed[key] = serialized
+    if changed:
+        store.save_state(user_id, changed)
+        snapshots.update(changed)
+
+    # A ledger that another tab or worker wrote to first is reloaded on the next run
+    ledger = st.session_state.get("budget_ledger")
+    if ledger is not None:
+        changes = ledger.drain_changes()
+        if changes and store.save_budget_changes(user_id, changes):
+            del st.session_state.budget_ledger
+
+    goal_ledger = st.session_state.get("goal_ledger")
+    if goal_ledger is not None:
+        goals, events = goal_ledger.drain_changes()
+        if (goals or events) and store.save_goal_changes(user_id, goals, events):
+            del st.session_state.goal_ledger
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export FinBuddy user data to Parquet")
+    parser.add_argument("--export", required=True, metavar="DIRECTORY", help="Directory to write Parquet files to")
+    parser.add_argument("--db", default=DEFAULT_STORE_PATH, help="Path of the SQLite store")
+    parser.add_argument("--user", default=None, help="Only export this user id")
+    args = parser.parse_args()
+
+    for path in UserStore(args.db).export_parquet(args.export, args.user):
+        print(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,22 @@
 import streamlit as st
 import json
+import hashlib
+import re
 import pandas as pd
+import numpy as np
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from langchain_community.chat_models import ChatOpenAI
 from langchain.schema import SystemMessage, HumanMessage, AIMessage
+from llm_client import borrow_chat_client, get_client_pool, DEFAULT_MODEL, DEFAULT_TEMPERATURE
+from llm_cache import get_response_cache, make_cache_key
+from single_flight import SingleFlight
+from keyword_matcher import KeywordMatcher
+from circuit_breaker import CircuitBreaker, CircuitOpenError
+from llm_cassette import get_cassette
+from user_store import load_session_value
+from goal_projection import GoalProjection
 
 def initialize_session_state():
     """Initialize all session state variables needed for the app"""
@@ -13,30 +25,16 @@ def initialize_session_state():
             {"role": "assistant", "content": "Hi! I'm FinBuddy, your financial education assistant. How can I help you learn about budgeting, saving, and investing today?"}
         ]
     
+    # Rolling summary of chat turns that have left the model's context window
+    if "chat_summary" not in st.session_state:
+        st.session_state.chat_summary = ""
+        st.session_state.chat_summarized_count = 0
+    
     if "openai_api_key" not in st.session_state:
         st.session_state.openai_api_key = os.environ.get("OPENAI_API_KEY", "")
     
-    if "user_budget" not in st.session_state:
-        st.session_state.user_budget = {
-            "income": [],
-            "expenses": []
-        }
-    
-    if "savings_goals" not in st.session_state:
-        st.session_state.savings_goals = []
-    
-    if "investment_progress" not in st.session_state:
-        st.session_state.investment_progress = {
-            "lessons_completed": 0,
-            "quizzes_taken": 0,
-            "score": 0
-        }
-    
-    if "user_badges" not in st.session_state:
-        st.session_state.user_badges = []
-        
-    if "user_progress" not in st.session_state:
-        st.session_state.user_progress = 0.1  # Starting progress (0.0 to 1.0)
+    # Budget entries, savings goals, investment progress and badges are stored
+    # per user and loaded lazily by the pages that need them (see user_store)
     
     if "financial_health_score" not in st.session_state:
         st.session_state.financial_health_score = None
@@ -58,65 +56,83 @@ def load_css():
         </style>
     """, unsafe_allow_html=True)
 
-def get_llm_response(prompt, system_prompt="You are FinBuddy, an AI assistant that helps users learn about personal finance, budgeting, saving, and investing. Your responses should be friendly, informative, and geared toward financial education for beginners."):
+# Limits for concurrent LLM batches
+LLM_MAX_CONCURRENCY = 5
+# Hard limits on a single LLM call so a degraded API can't stall the page
+LLM_REQUEST_TIMEOUT = float(os.environ.get("FINBUDDY_LLM_TIMEOUT", "20"))
+LLM_MAX_RETRIES = int(os.environ.get("FINBUDDY_LLM_MAX_RETRIES", "1"))
+
+# Process-wide coalescing of identical in-flight LLM requests
+_llm_flights = SingleFlight()
+
+# Stop calling the API for a while once most recent calls have failed
+_llm_breaker = CircuitBreaker(
+    failure_threshold=float(os.environ.get("FINBUDDY_LLM_BREAKER_THRESHOLD", "0.5")),
+    min_calls=int(os.environ.get("FINBUDDY_LLM_BREAKER_MIN_CALLS", "4")),
+    window_seconds=60,
+    cooldown_seconds=float(os.environ.get("FINBUDDY_LLM_BREAKER_COOLDOWN", "30"))
+)
+
+DEFAULT_SYSTEM_PROMPT = "You are FinBuddy, an AI assistant that helps users learn about personal finance, budgeting, saving, and investing. Your responses should be friendly, informative, and geared toward financial education for beginners."
+
+# Dictionary of static responses based on keywords in the prompt
+STATIC_RESPONSES = {
+    "budget": "Creating a budget is the foundation of financial wellness! Start by tracking all income sources, then categorize your expenses into needs (rent, food), wants (entertainment), and savings. Aim to save at least 20% of your income using the 50/30/20 rule - 50% for needs, 30% for wants, and 20% for savings and debt repayment.",
+
+    "save": "Saving money is all about small daily habits! Try the 30-day rule (wait 30 days before making non-essential purchases), automate your savings with direct deposits, and challenge yourself to no-spend days. Even saving $5 a day adds up to $1,825 in a year!",
+
+    "invest": "Investing is how your money grows over time! As a beginner, consider starting with a tax-advantaged retirement account like a 401(k) or IRA. Index funds are great for beginners since they provide instant diversification with low fees. Remember, time in the market beats timing the market!",
+
+    "stock": "The stock market is a place where people buy and sell ownership shares in companies. Here's what to know as a beginner:\n\n• Start with index funds that track the entire market (like S&P 500) for instant diversification\n• Only invest money you won't need for at least 5 years\n• Set up automatic contributions to benefit from dollar-cost averaging\n• Understand that market fluctuations are normal - focus on long-term trends\n• Research companies before buying individual stocks or use index funds\n• Consider using a tax-advantaged account like a Roth IRA for your investments",
+
+    "stock market": "The stock market is a place where people buy and sell ownership shares in companies. Here's what to know as a beginner:\n\n• Start with index funds that track the entire market (like S&P 500) for instant diversification\n• Only invest money you won't need for at least 5 years\n• Set up automatic contributions to benefit from dollar-cost averaging\n• Understand that market fluctuations are normal - focus on long-term trends\n• Research companies before buying individual stocks or use index funds\n• Consider using a tax-advantaged account like a Roth IRA for your investments",
+
+    "debt": "Managing debt strategically is crucial! Prioritize high-interest debt like credit cards first (debt avalanche method) or start with small balances for quick wins (debt snowball method). Always pay more than the minimum payment, and consider consolidating high-interest debts to a lower rate.",
+
+    "credit": "Building good credit is essential! Pay bills on time (35% of your score), keep credit utilization below 30%, maintain older accounts, avoid opening too many new accounts, and diversify your credit mix. Check your credit report annually for free at AnnualCreditReport.com.",
+
+    "emergency": "An emergency fund is your financial safety net! Aim to save 3-6 months of essential expenses in an easily accessible account like a high-yield savings account. Start small with $1,000, then build up gradually. This protects you from going into debt when unexpected expenses hit.",
+
+    "retirement": "Retirement planning works best when you start early! If your employer offers a 401(k) match, contribute at least enough to get the full match (it's free money!). Consider opening an IRA for additional tax advantages, and increase your contributions whenever you get a raise.",
+
+    "tax": "Understanding tax basics can save you money! Take advantage of tax-advantaged accounts like 401(k)s and IRAs. Track deductible expenses throughout the year, consider tax-loss harvesting for investments, and remember that tax refunds mean you've been giving the government an interest-free loan!",
+
+    "house": "Buying a home requires preparation! Save for a down payment (aim for 20% to avoid PMI), check your credit score (higher scores get better rates), get pre-approved before house hunting, and remember the true cost includes maintenance, insurance, property taxes, and utilities.",
+
+    "insurance": "Insurance protects your financial future! Essential types include health insurance, auto insurance, renters/homeowners insurance, and eventually life insurance if others depend on your income. Shop around annually for better rates, and choose higher deductibles to lower premiums if you have an emergency fund.",
+}
+
+# Default response if no keywords match
+DEFAULT_STATIC_RESPONSE = "Financial literacy is key to building wealth! Start with creating a budget, build an emergency fund covering 3-6 months of expenses, pay down high-interest debt, save for retirement, and then expand to other investments. Small, consistent steps over time lead to financial freedom."
+
+# Compiled once so each fallback lookup is a single scan of the prompt
+_static_response_matcher = KeywordMatcher(STATIC_RESPONSES)
+
+def _llm_enabled(api_key):
+    """Check whether AI responses are available (an API key, or a cassette being replayed)"""
+    cassette = get_cassette()
+    return bool(api_key and api_key.strip()) or (cassette is not None and cassette.replaying)
+
+def get_llm_response(prompt, system_prompt=DEFAULT_SYSTEM_PROMPT, cache_ttl=None, cache_if=None):
     """
     Get a response from the GPT model via LangChain or fallback to static responses
     
     Args:
         prompt (str): User prompt
         system_prompt (str): System prompt defining the AI assistant's behavior
+        cache_ttl (int, optional): Seconds to cache the AI response for. Only use this
+            for prompts whose answer depends on nothing but the prompt text itself.
+        cache_if (callable, optional): Only cache responses for which this returns
+            True, e.g. ones the caller can parse
     
     Returns:
         str: The AI response or a default response
     """
-    # Dictionary of static responses based on keywords in the prompt
-    static_responses = {
-        "budget": "Creating a budget is the foundation of financial wellness! Start by tracking all income sources, then categorize your expenses into needs (rent, food), wants (entertainment), and savings. Aim to save at least 20% of your income using the 50/30/20 rule - 50% for needs, 30% for wants, and 20% for savings and debt repayment.",
-        
-        "save": "Saving money is all about small daily habits! Try the 30-day rule (wait 30 days before making non-essential purchases), automate your savings with direct deposits, and challenge yourself to no-spend days. Even saving $5 a day adds up to $1,825 in a year!",
-        
-        "invest": "Investing is how your money grows over time! As a beginner, consider starting with a tax-advantaged retirement account like a 401(k) or IRA. Index funds are great for beginners since they provide instant diversification with low fees. Remember, time in the market beats timing the market!",
-        
-        "stock": "The stock market is a place where people buy and sell ownership shares in companies. Here's what to know as a beginner:\n\n• Start with index funds that track the entire market (like S&P 500) for instant diversification\n• Only invest money you won't need for at least 5 years\n• Set up automatic contributions to benefit from dollar-cost averaging\n• Understand that market fluctuations are normal - focus on long-term trends\n• Research companies before buying individual stocks or use index funds\n• Consider using a tax-advantaged account like a Roth IRA for your investments",
-        
-        "stock market": "The stock market is a place where people buy and sell ownership shares in companies. Here's what to know as a beginner:\n\n• Start with index funds that track the entire market (like S&P 500) for instant diversification\n• Only invest money you won't need for at least 5 years\n• Set up automatic contributions to benefit from dollar-cost averaging\n• Understand that market fluctuations are normal - focus on long-term trends\n• Research companies before buying individual stocks or use index funds\n• Consider using a tax-advantaged account like a Roth IRA for your investments",
-        
-        "debt": "Managing debt strategically is crucial! Prioritize high-interest debt like credit cards first (debt avalanche method) or start with small balances for quick wins (debt snowball method). Always pay more than the minimum payment, and consider consolidating high-interest debts to a lower rate.",
-        
-        "credit": "Building good credit is essential! Pay bills on time (35% of your score), keep credit utilization below 30%, maintain older accounts, avoid opening too many new accounts, and diversify your credit mix. Check your credit report annually for free at AnnualCreditReport.com.",
-        
-        "emergency": "An emergency fund is your financial safety net! Aim to save 3-6 months of essential expenses in an easily accessible account like a high-yield savings account. Start small with $1,000, then build up gradually. This protects you from going into debt when unexpected expenses hit.",
-        
-        "retirement": "Retirement planning works best when you start early! If your employer offers a 401(k) match, contribute at least enough to get the full match (it's free money!). Consider opening an IRA for additional tax advantages, and increase your contributions whenever you get a raise.",
-        
-        "tax": "Understanding tax basics can save you money! Take advantage of tax-advantaged accounts like 401(k)s and IRAs. Track deductible expenses throughout the year, consider tax-loss harvesting for investments, and remember that tax refunds mean you've been giving the government an interest-free loan!",
-        
-        "house": "Buying a home requires preparation! Save for a down payment (aim for 20% to avoid PMI), check your credit score (higher scores get better rates), get pre-approved before house hunting, and remember the true cost includes maintenance, insurance, property taxes, and utilities.",
-        
-        "insurance": "Insurance protects your financial future! Essential types include health insurance, auto insurance, renters/homeowners insurance, and eventually life insurance if others depend on your income. Shop around annually for better rates, and choose higher deductibles to lower premiums if you have an emergency fund.",
-    }
-    
-    # Default response if no keywords match
-    default_response = "Financial literacy is key to building wealth! Start with creating a budget, build an emergency fund covering 3-6 months of expenses, pay down high-interest debt, save for retirement, and then expand to other investments. Small, consistent steps over time lead to financial freedom."
-    
     # Try to use the API if available and not empty
-    if st.session_state.get("openai_api_key") and st.session_state.openai_api_key.strip():
+    api_key = st.session_state.get("openai_api_key", "")
+    if _llm_enabled(api_key):
         try:
-            # the newest OpenAI model is "gpt-4o" which was released May 13, 2024.
-            # do not change this unless explicitly requested by the user
-            chat = ChatOpenAI(
-                temperature=0.7,
-                openai_api_key=st.session_state.openai_api_key,
-                model="gpt-4o"
-            )
-            
-            messages = [
-                SystemMessage(content=system_prompt),
-                HumanMessage(content=prompt)
-            ]
-            
-            response = chat(messages)
-            return response.content
+            return _call_llm(api_key, prompt, system_prompt, cache_ttl, cache_if)
         except Exception as e:
             # Fall back to static responses on API error
             st.warning(f"API Error: Using static financial advice instead.")
@@ -124,25 +140,326 @@ def get_llm_response(prompt, system_prompt="You are FinBuddy, an AI assistant th
             print(f"API Error details: {str(e)}")
     
     # Fallback to static responses if no API key or API error
-    # Find the best matching keyword in the prompt
-    lower_prompt = prompt.lower()
-    for keyword, response in static_responses.items():
-        if keyword in lower_prompt:
-            return response
+    return get_static_response(prompt)
+
+def try_llm_response(prompt, system_prompt=DEFAULT_SYSTEM_PROMPT):
+    """
+    Get a response from the GPT model without any static fallback
+    
+    Returns:
+        str or None: The AI response, or None if there is no API key or the call failed
+    """
+    api_key = st.session_state.get("openai_api_key", "")
+    if not _llm_enabled(api_key):
+        return None
+    try:
+        return _call_llm(api_key, prompt, system_prompt)
+    except Exception as e:
+        print(f"API Error details: {str(e)}")
+        return None
+
+def get_cached_advice(name, data, prompt, system_prompt=DEFAULT_SYSTEM_PROMPT):
+    """
+    Get AI advice about the user's own numbers, reusing the last answer while they are unchanged
+    
+    Answers are saved per user with a fingerprint of the rounded numbers they were
+    based on, so asking again returns instantly until the budget actually changes.
+    
+    Args:
+        name (str): Which piece of advice this is (e.g. "budget_recommendations")
+        data (dict): The numbers the prompt is built from
+        prompt (str): User prompt
+        system_prompt (str): System prompt defining the AI assistant's behavior
+    
+    Returns:
+        str: The AI response or a default response
+    """
+    cache = load_session_value("advice_cache")
+    fingerprint = advice_fingerprint(data)
+    entry = cache.get(name)
+    if entry is not None and entry["fingerprint"] == fingerprint:
+        return entry["response"]
+    
+    response = try_llm_response(prompt, system_prompt)
+    if response is None:
+        if _llm_enabled(st.session_state.get("openai_api_key", "")):
+            st.warning(f"API Error: Using static financial advice instead.")
+        # Static advice isn't saved, so the AI is asked again next time
+        return get_static_response(prompt)
+    
+    cache[name] = {"fingerprint": fingerprint, "response": response}
+    return response
+
+def advice_fingerprint(data):
+    """Hash of the numbers behind a piece of advice, rounded so tiny changes don't count"""
+    def rounded(value):
+        if isinstance(value, float):
+            return round(value)
+        if isinstance(value, dict):
+            return {str(k): rounded(v) for k, v in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [rounded(v) for v in value]
+        return value
+    
+    payload = json.dumps(rounded(data), sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+def get_llm_responses(prompts, system_prompt=DEFAULT_SYSTEM_PROMPT, cache_ttl=None,
+                      max_concurrency=LLM_MAX_CONCURRENCY, timeout=LLM_REQUEST_TIMEOUT):
+    """
+    Get responses for several prompts concurrently
+    
+    Args:
+        prompts (list): User prompts to send
+        system_prompt (str): System prompt shared by every request
+        cache_ttl (int, optional): Seconds to cache each AI response for
+        max_concurrency (int): Maximum number of requests in flight at once
+        timeout (float): Per-prompt timeout in seconds
+    
+    Returns:
+        list: Responses in the same order as prompts. Prompts that fail or time out
+            get their static fallback response.
+    """
+    prompts = list(prompts)
+    if not prompts:
+        return []
+    
+    # Session state is only readable from the script thread, so resolve the key here
+    api_key = st.session_state.get("openai_api_key", "")
+    if not _llm_enabled(api_key):
+        return [get_static_response(prompt) for prompt in prompts]
+    
+    results = [None] * len(prompts)
+    workers = max(1, min(max_concurrency, len(prompts)))
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="finbuddy-llm")
+    try:
+        futures = [
+            executor.submit(_call_llm, api_key, prompt, system_prompt, cache_ttl, request_timeout=timeout)
+            for prompt in prompts
+        ]
+        # Requests beyond the concurrency limit queue up, so allow one timeout per wave
+        waves = -(-len(prompts) // workers)
+        deadline = time.monotonic() + timeout * waves
+        
+        failed = False
+        for i, future in enumerate(futures):
+            try:
+                results[i] = future.result(timeout=max(0, deadline - time.monotonic()))
+            except Exception as e:
+                failed = True
+                print(f"API Error details: {str(e) or type(e).__name__}")
+                results[i] = get_static_response(prompts[i])
+        
+        if failed:
+            st.warning(f"API Error: Using static financial advice instead.")
+    finally:
+        # Don't block the page on requests that already timed out
+        executor.shutdown(wait=False, cancel_futures=True)
     
-    # If no keyword matches, return the default response
-    return default_response
+    return results
+
+def submit_llm_response(executor, prompt, system_prompt=DEFAULT_SYSTEM_PROMPT):
+    """
+    Start getting an AI response on a background executor
+    
+    Args:
+        executor (concurrent.futures.Executor): Where to run the request
+        prompt (str): User prompt
+        system_prompt (str): System prompt defining the AI assistant's behavior
+    
+    Returns:
+        concurrent.futures.Future or None: The pending response (raising on API errors),
+            or None if there is no API key
+    """
+    # Session state is only readable from the script thread, so resolve the key here
+    api_key = st.session_state.get("openai_api_key", "")
+    if not _llm_enabled(api_key):
+        return None
+    return executor.submit(_call_llm, api_key, prompt, system_prompt)
+
+def _call_llm(api_key, prompt, system_prompt, cache_ttl=None, cache_if=None, **client_kwargs):
+    """Call the model directly, raising on API errors
+
+    Safe to run off the script thread: it never touches st.session_state.
+    """
+    client_kwargs.setdefault("request_timeout", LLM_REQUEST_TIMEOUT)
+    client_kwargs.setdefault("max_retries", LLM_MAX_RETRIES)
+    request_key = make_cache_key(system_prompt, prompt, DEFAULT_MODEL, DEFAULT_TEMPERATURE)
+    
+    # Replayed runs never touch the cache or the network
+    cassette = get_cassette()
+    if cassette is not None and cassette.replaying:
+        return cassette.replay(request_key)[0]
+    
+    # Serve deterministic prompts from the response cache when possible
+    cache = get_response_cache() if cache_ttl else None
+    if cache is not None:
+        cached_response = cache.get(request_key)
+        if cached_response is not None:
+            # Recordings must cover every prompt the run asked for, or replay misses it
+            if cassette is not None and cassette.recording:
+                cassette.record(request_key, cached_response, 0.0)
+            return cached_response
+    
+    # If another session is already sending this exact prompt with the same key,
+    # wait for its answer instead of making a second API call
+    api_key_hash = hashlib.sha256(api_key.encode("utf-8")).hexdigest()
+    flight_key = (api_key_hash, request_key)
+    return _llm_flights.do(
+        flight_key, _request_llm, api_key, prompt, system_prompt,
+        cache, request_key, cache_ttl, cache_if, **client_kwargs
+    )
+
+def _request_llm(api_key, prompt, system_prompt, cache, cache_key, cache_ttl, cache_if, **client_kwargs):
+    """Send a single request to the model and store the result in the cache"""
+    if not _llm_breaker.allow_request():
+        raise CircuitOpenError("LLM circuit breaker is open")
+    
+    messages = [
+        SystemMessage(content=system_prompt),
+        HumanMessage(content=prompt)
+    ]
+    
+    started = time.monotonic()
+    try:
+        # Reuse a pooled client so repeated calls share keep-alive connections
+        with borrow_chat_client(
+            api_key,
+            model=DEFAULT_MODEL,
+            temperature=DEFAULT_TEMPERATURE,
+            **client_kwargs
+        ) as chat:
+            response = chat.invoke(messages)
+    except Exception:
+        _llm_breaker.record_failure()
+        raise
+    _llm_breaker.record_success()
+    
+    cassette = get_cassette()
+    if cassette is not None and cassette.recording:
+        cassette.record(cache_key, response.content, time.monotonic() - started)
+    
+    if cache is not None and (cache_if is None or cache_if(response.content)):
+        cache.set(cache_key, response.content, cache_ttl)
+    return response.content
+
+def get_static_response(prompt):
+    """Pick the built-in response that best matches the keywords in a prompt"""
+    # Prefer the most specific keyword in the prompt, else the default response
+    return _static_response_matcher.lookup(prompt, DEFAULT_STATIC_RESPONSE)
+
+def get_llm_metrics():
+    """Collect health and efficiency counters for the LLM call path"""
+    return {
+        "circuit_breaker": _llm_breaker.stats(),
+        "cache": get_response_cache().stats(),
+        "single_flight": _llm_flights.stats(),
+        "pooled_clients": get_client_pool().size()
+    }
+
+def stream_llm_response(prompt, system_prompt=DEFAULT_SYSTEM_PROMPT, history=None):
+    """
+    Stream a response from the GPT model token by token, falling back to static responses
+    
+    Args:
+        prompt (str): User prompt
+        system_prompt (str): System prompt defining the AI assistant's behavior
+        history (list, optional): Earlier chat messages ({"role", "content"} dicts)
+            to send ahead of the prompt for conversational context
+    
+    Yields:
+        str: Chunks of the response text as they arrive
+    """
+    cassette = get_cassette()
+    if cassette is not None:
+        # The history is part of what the model saw, so it is part of the key
+        cassette_key = make_cache_key(system_prompt, json.dumps([history or [], prompt]), DEFAULT_MODEL, DEFAULT_TEMPERATURE)
+        if cassette.replaying:
+            try:
+                response, _ = cassette.replay(cassette_key)
+                for word in response.split(" "):
+                    yield word + " "
+                return
+            except Exception as e:
+                print(f"API Error details: {str(e)}")
+    
+    if st.session_state.get("openai_api_key") and st.session_state.openai_api_key.strip():
+        if _llm_breaker.allow_request():
+            received_any = False
+            failed = False
+            started = time.monotonic()
+            chunks = []
+            try:
+                messages = [SystemMessage(content=system_prompt)]
+                for message in history or []:
+                    if message["role"] == "user":
+                        messages.append(HumanMessage(content=message["content"]))
+                    else:
+                        messages.append(AIMessage(content=message["content"]))
+                messages.append(HumanMessage(content=prompt))
+                
+                # The client is held until the stream ends (or the caller stops reading)
+                with borrow_chat_client(
+                    st.session_state.openai_api_key,
+                    model=DEFAULT_MODEL,
+                    temperature=DEFAULT_TEMPERATURE,
+                    request_timeout=LLM_REQUEST_TIMEOUT,
+                    max_retries=LLM_MAX_RETRIES
+                ) as chat:
+                    for chunk in chat.stream(messages):
+                        if chunk.content:
+                            received_any = True
+                            chunks.append(chunk.content)
+                            yield chunk.content
+                
+                if cassette is not None and cassette.recording:
+                    cassette.record(cassette_key, "".join(chunks), time.monotonic() - started)
+                return
+            except Exception as e:
+                failed = True
+                print(f"API Error details: {str(e)}")
+            finally:
+                # Also runs if the caller stops consuming the stream early
+                if failed or not received_any:
+                    _llm_breaker.record_failure()
+                else:
+                    _llm_breaker.record_success()
+            
+            # Once tokens have been shown we can't swap in a different answer
+            if received_any:
+                return
+        st.warning(f"API Error: Using static financial advice instead.")
+    
+    # Static responses are available immediately, so emit them word by word
+    # to keep the same rendering path as a live stream
+    for word in get_static_response(prompt).split(" "):
+        yield word + " "
 
 def calculate_budget_summary(income, expenses):
     """Calculate budget summary statistics
     
     Args:
-        income (list): List of income dictionaries with amount and name
-        expenses (list): List of expense dictionaries with amount, name, and category
+        income (list or DataFrame): List of income dictionaries with amount and name,
+            or a DataFrame with an amount column
+        expenses (list or DataFrame): List of expense dictionaries with amount, name, and
+            category, or a DataFrame with amount and category columns
     
     Returns:
         dict: Summary statistics about the budget
     """
+    # Large imported ledgers arrive as DataFrames; sum them column-wise
+    if isinstance(income, pd.DataFrame) or isinstance(expenses, pd.DataFrame):
+        income_amounts = _frame_amounts(pd.DataFrame(income))
+        expenses = pd.DataFrame(expenses)
+        expense_amounts = _frame_amounts(expenses)
+        if "category" in expenses:
+            categories = expenses["category"].fillna("Other")
+        else:
+            categories = pd.Series("Other", index=expenses.index)
+        # factorize keeps categories in order of first appearance, like the dict loop below
+        category_codes, category_names = pd.factorize(categories)
+        return summarize_budget_columns(income_amounts, expense_amounts, category_codes, list(category_names))
+    
     total_income = sum(item["amount"] for item in income)
     total_expenses = sum(item["amount"] for item in expenses)
     balance = total_income - total_expenses
@@ -156,6 +473,50 @@ def calculate_budget_summary(income, expenses):
         else:
             expense_by_category[category] = expense["amount"]
     
+    return _build_budget_summary(total_income, total_expenses, expense_by_category)
+
+def summarize_budget_columns(income_amounts, expense_amounts, category_codes, categories):
+    """Calculate budget summary statistics from columnar data in one vectorized pass
+    
+    Args:
+        income_amounts (array-like): Amount of each income entry
+        expense_amounts (array-like): Amount of each expense entry
+        category_codes (array-like): Index into categories for each expense
+        categories (list): Category names
+    
+    Returns:
+        dict: Summary statistics about the budget, same shape as calculate_budget_summary
+    """
+    income_amounts = np.asarray(income_amounts, dtype=np.float64)
+    expense_amounts = np.asarray(expense_amounts, dtype=np.float64)
+    category_codes = np.asarray(category_codes, dtype=np.intp)
+    
+    # Group-by-category sums; only report categories that actually have expenses
+    category_totals = np.bincount(category_codes, weights=expense_amounts, minlength=len(categories))
+    present = category_totals != 0
+    if not present.all():
+        # A zero total can still mean zero-amount rows, which the dict loop would report
+        present = np.bincount(category_codes, minlength=len(categories)) > 0
+    
+    total_income = float(income_amounts.sum())
+    # Every expense lands in exactly one category, so reuse the per-category sums
+    total_expenses = float(category_totals.sum())
+    expense_by_category = {
+        categories[i]: float(category_totals[i]) for i in np.flatnonzero(present)
+    }
+    
+    return _build_budget_summary(total_income, total_expenses, expense_by_category)
+
+def _frame_amounts(frame):
+    """Get the amount column of a DataFrame as a float array"""
+    if "amount" not in frame:
+        return np.zeros(0)
+    return frame["amount"].to_numpy(dtype=np.float64)
+
+def _build_budget_summary(total_income, total_expenses, expense_by_category):
+    """Assemble the budget summary dict from its totals"""
+    balance = total_income - total_expenses
+    
     # Calculate saving rate
     saving_rate = 0
     if total_income > 0:
@@ -169,66 +530,73 @@ def calculate_budget_summary(income, expenses):
         "saving_rate": saving_rate
     }
 
+# Matches each digit that needs a comma after it when grouping in pairs (1,23,45)
+_INDIAN_PAIR_GROUPING = re.compile(r"(\d)(?=(\d{2})+$)")
+
 def format_currency(amount):
-    """Format an amount as Indian Rupees (INR)"""
-    import locale
+    """Format an amount as Indian Rupees (INR) using lakh/crore grouping (₹1,23,456.78)"""
+    is_negative = amount < 0
     
-    # Try to set the locale to Indian English
-    try:
-        locale.setlocale(locale.LC_MONETARY, 'en_IN.UTF-8')
-    except locale.Error:
-        # Fallback if the locale is not available
-        pass
+    # Convert to string with 2 decimal places and split into integer and decimal parts
+    integer_part, _, decimal_part = f"{abs(amount):.2f}".partition(".")
     
-    try:
-        # Try to use locale formatting
-        formatted = locale.currency(amount, grouping=True, symbol=True)
-        # If locale formatting doesn't use ₹, replace the symbol
-        if not formatted.startswith('₹'):
-            formatted = '₹' + formatted.lstrip(locale.localeconv()['currency_symbol'])
-        return formatted
-    except:
-        # Fallback to manual formatting with Indian number system
-        if amount >= 0:
-            is_negative = False
-        else:
-            is_negative = True
-            amount = abs(amount)
-            
-        # Convert to string with 2 decimal places
-        amount_str = f"{amount:.2f}"
-        
-        # Split into integer and decimal parts
-        parts = amount_str.split('.')
-        integer_part = parts[0]
-        decimal_part = parts[1] if len(parts) > 1 else "00"
-        
-        # Apply Indian comma system (1,23,456.78)
-        result = ""
-        
-        if len(integer_part) <= 3:
-            result = integer_part
+    # Apply Indian comma system: last group of 3, the rest in groups of 2
+    if len(integer_part) > 3:
+        head = _INDIAN_PAIR_GROUPING.sub(r"\1,", integer_part[:-3])
+        integer_part = f"{head},{integer_part[-3:]}"
+    
+    sign = "-" if is_negative else ""
+    return f"₹{sign}{integer_part}.{decimal_part or '00'}"
+
+def format_currency_many(amounts):
+    """Format a whole column of amounts as Indian Rupees in one vectorized pass
+    
+    Args:
+        amounts (array-like): Amounts to format
+    
+    Returns:
+        list: Formatted strings, identical to calling format_currency on each amount
+    """
+    values = np.asarray(amounts, dtype=np.float64).ravel()
+    if values.size == 0:
+        return []
+    
+    finite = np.isfinite(values)
+    safe_values = np.where(finite, np.abs(values), 0.0)
+    
+    # Right-align the "%.2f" text so every digit position lines up in a character grid
+    text = np.char.mod("%.2f", safe_values)
+    width = text.dtype.itemsize // 4
+    text = np.char.rjust(text, width)
+    grid = text.view(np.uint32).reshape(len(values), width)
+    
+    # Build the output grid: every character keeps its place, and a comma column
+    # follows any digit that has 3, 5, 7... integer digits to its right
+    integer_digits = width - 3
+    columns = []
+    for position in range(width):
+        columns.append(("char", position))
+        digits_to_right = integer_digits - 1 - position
+        if digits_to_right >= 3 and (digits_to_right - 3) % 2 == 0:
+            columns.append(("comma", position))
+    
+    out = np.empty((len(values), len(columns)), dtype=np.uint32)
+    space, comma = ord(" "), ord(",")
+    for j, (kind, position) in enumerate(columns):
+        if kind == "char":
+            out[:, j] = grid[:, position]
         else:
-            # First group of 3 from the right
-            result = integer_part[-3:]
-            remaining = integer_part[:-3]
-            
-            # Rest in groups of 2
-            while remaining:
-                # Get at most 2 digits from the right
-                group = remaining[-2:] if len(remaining) >= 2 else remaining
-                result = group + "," + result
-                remaining = remaining[:-len(group)]
-        
-        # Add decimal part
-        result = f"{result}.{decimal_part}"
-        
-        # Add negative sign if needed
-        if is_negative:
-            result = "-" + result
-            
-        # Add Rupee symbol
-        return f"₹{result}"
+            # Short numbers are padded with spaces here, so only add a comma after a digit
+            out[:, j] = np.where(grid[:, position] != space, comma, space)
+    
+    formatted = np.char.lstrip(out.view(f"<U{len(columns)}").ravel())
+    prefixes = np.where(values < 0, "₹-", "₹")
+    result = np.char.add(prefixes, formatted).tolist()
+    
+    # NaN and infinity can't go through the digit grid; format them one at a time
+    for i in np.flatnonzero(~finite):
+        result[i] = format_currency(values[i])
+    return result
 
 def calculate_financial_health_score(budget_summary, savings_goals, investment_progress):
     """
@@ -259,7 +627,7 @@ def calculate_financial_health_score(budget_summary, savings_goals, investment_p
     # Saving goals (25 points max)
     if savings_goals:
         active_goals = sum(1 for goal in savings_goals if goal.get("active", False))
-        completed_goals = sum(1 for goal in savings_goals if goal.get("completed", False))
+        completed_goals = int(GoalProjection.from_goals(savings_goals).completed.sum())
         
         if active_goals > 0:
             score += 15